@@ -0,0 +1,58 @@
+"""Measurements behind the performance tests from generate_perf_tests.
+
+The generated tests import these functions, and generate_perf_tests uses
+the same functions to calibrate the budgets, so a budget is derived from
+exactly what its test measures::
+
+    from tui_builder.perf import measure_startup_ms
+
+    def test_startup_time():
+        assert asyncio.run(measure_startup_ms(MyApp, (80, 24))) < 250
+"""
+
+import time
+import tracemalloc
+
+MB = 1024 * 1024
+
+
+async def measure_startup_ms(app_class: type, size: tuple[int, int]) -> float:
+    """Time from creating the app until its first screen has settled."""
+    start = time.perf_counter()
+    app = app_class()
+    async with app.run_test(size=size) as pilot:
+        await pilot.pause()
+        return (time.perf_counter() - start) * 1000
+
+
+async def measure_key_ms(app_class: type, size: tuple[int, int], key: str) -> float:
+    """Time from pressing a key until the app has settled."""
+    app = app_class()
+    async with app.run_test(size=size) as pilot:
+        await pilot.pause()
+        start = time.perf_counter()
+        await pilot.press(key)
+        await pilot.pause()
+        return (time.perf_counter() - start) * 1000
+
+
+async def measure_peak_mb(
+    app_class: type, size: tuple[int, int], keys: list[str]
+) -> float:
+    """Peak memory allocated while starting the app and pressing the keys."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        app = app_class()
+        async with app.run_test(size=size) as pilot:
+            await pilot.pause()
+            for key in keys:
+                await pilot.press(key)
+            await pilot.pause()
+        return (tracemalloc.get_traced_memory()[1] - baseline) / MB
+    finally:
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,158 @@
+"""Spans that apps can use to time their own work.
+
+Mark domain-level work with a context manager or a decorator::
+
+    from tui_builder.spans import span
+
+    with span("load rows"):
+        rows = load_rows()
+
+    @span("rebuild chart")
+    def rebuild_chart(self) -> None:
+        ...
+
+Outside runs driven by the tui_builder tools a span only looks up a context
+variable and does nothing else. Under ``run_app_pilot`` and the other pilot
+and benchmark tools, each span is recorded with the action that was running
+and returned in the run's metrics next to the framework's timings. Spans
+around ``await`` include the time spent waiting.
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any
+
+MAX_RECORDED_SPANS = 1000
+
+_recorder: contextvars.ContextVar["SpanRecorder | None"] = contextvars.ContextVar(
+    "tui_builder_span_recorder", default=None
+)
+_parent: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "tui_builder_span_parent", default=None
+)
+
+
+class SpanRecorder:
+    """Collects the spans finished while it is the current recorder.
+
+    Args:
+        position: Called when a span finishes, returning fields that place it
+            in the run (such as the current action).
+    """
+
+    def __init__(self, position: Callable[[], dict[str, Any]] | None = None) -> None:
+        self.position = position or dict
+        self.started_at = perf_counter()
+        self.count = 0
+        self.by_name: dict[str, dict[str, Any]] = {}
+        self.spans: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.count)
+
+    def record(
+        self, name: str, parent: str | None, start: float, elapsed: float
+    ) -> None:
+        """Record a finished span."""
+        with self._lock:
+            self.count += 1
+            totals = self.by_name.get(name)
+            if totals is None:
+                totals = self.by_name[name] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                }
+            totals["count"] += 1
+            totals["total_ms"] += elapsed * 1000
+            totals["max_ms"] = max(totals["max_ms"], elapsed * 1000)
+            if len(self.spans) < MAX_RECORDED_SPANS:
+                self.spans.append(
+                    {
+                        "name": name,
+                        "parent": parent,
+                        **self.position(),
+                        "start_ms": (start - self.started_at) * 1000,
+                        "ms": elapsed * 1000,
+                    }
+                )
+
+    def report(self) -> dict[str, Any]:
+        """Return the recorded spans and per-name totals as plain data."""
+        with self._lock:
+            return {
+                "count": self.count,
+                "by_name": {
+                    name: {**totals, "mean_ms": totals["total_ms"] / totals["count"]}
+                    for name, totals in sorted(
+                        self.by_name.items(), key=lambda item: -item[1]["total_ms"]
+                    )
+                },
+                "spans": list(self.spans),
+            }
+
+
+@contextmanager
+def recording(recorder: SpanRecorder) -> Iterator[SpanRecorder]:
+    """Make `recorder` collect the spans finished inside the block."""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+class span:
+    """Time a block or every call of a function under a name.
+
+    Args:
+        name: What the span measures, such as "load rows".
+    """
+
+    __slots__ = ("name", "_recorder", "_start", "_token")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._recorder: SpanRecorder | None = None
+
+    def __enter__(self) -> "span":
+        recorder = self._recorder = _recorder.get()
+        if recorder is not None:
+            self._token = _parent.set(self.name)
+            self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        recorder = self._recorder
+        if recorder is None:
+            return
+        elapsed = perf_counter() - self._start
+        _parent.reset(self._token)
+        self._recorder = None
+        recorder.record(self.name, _parent.get(), self._start, elapsed)
+
+    def __call__(self, func: Callable) -> Callable:
+        # Each call gets its own span, so recursion and concurrent calls of
+        # a decorated coroutine are timed separately.
+        name = self.name
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
@@ -8,10 +8,28 @@ from mcp.server.fastmcp import FastMCP
 
 def register_tools(mcp: FastMCP) -> None:
     """Register all TUI Builder tools with the MCP server."""
+    from tui_builder.tools.benchmarks import register_benchmark_tools
+    from tui_builder.tools.comparisons import register_comparison_tools
     from tui_builder.tools.generate import register_generate_tools
+    from tui_builder.tools.leaks import register_leak_tools
+    from tui_builder.tools.memory import register_memory_tools
+    from tui_builder.tools.projects import register_project_tools
+    from tui_builder.tools.sessions import register_session_tools
+    from tui_builder.tools.snapshots import register_snapshot_tools
+    from tui_builder.tools.terminal import register_terminal_tools
     from tui_builder.tools.testing import register_testing_tools
     from tui_builder.tools.validate import register_validate_tools
+    from tui_builder.tools.workspaces import register_workspace_tools
 
     register_generate_tools(mcp)
+    register_workspace_tools(mcp)
     register_validate_tools(mcp)
     register_testing_tools(mcp)
+    register_terminal_tools(mcp)
+    register_session_tools(mcp)
+    register_project_tools(mcp)
+    register_memory_tools(mcp)
+    register_leak_tools(mcp)
+    register_benchmark_tools(mcp)
+    register_comparison_tools(mcp)
+    register_snapshot_tools(mcp)
@@ -0,0 +1,688 @@
+"""Frame-level benchmarks for running apps.
+
+Benchmarks drive an app through the pilot with the ``frames`` probe
+attached, along with any others named in ``instrument``, mark each step as
+an action and then group the recorded frames by step. A step's cost is the
+layout and compositing work of every frame it caused, plus how many widgets
+were painted into those frames and how many had to render their content
+again.
+"""
+
+import asyncio
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from statistics import fmean
+from time import perf_counter
+from types import ModuleType
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.memory import memory_monitor
+from tui_builder.tools.probes import ProbeRun, _percentile
+from tui_builder.tools.sessions import _settle
+from tui_builder.tools.testing import (
+    AppLoadError,
+    _extract_app_class_name,
+    _load_app_class,
+    _load_module,
+    _module_app_class,
+    _run_sync,
+)
+from tui_builder.tools.workspaces import WorkspaceError, resolve_files
+
+SCROLL_MODES = ("line", "page", "end")
+MAX_SCROLL_STEPS = 200
+FRAME_TIMEOUT = 1.0
+FRAME_BUDGET_MS = 1000 / 60
+VIRTUALIZATION_RATIO = 10
+MAX_RESIZES = 500
+MAX_VISITS = 20
+
+
+@dataclass
+class ScrollBenchmarkResult:
+    """Result of a scroll benchmark."""
+
+    success: bool = True
+    target: str = ""
+    descendants: int = 0
+    viewport_height: int = 0
+    virtual_height: int = 0
+    phases: list[dict[str, Any]] = field(default_factory=list)
+    needs_virtualization: bool = False
+    spans: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class ResizeBenchmarkResult:
+    """Result of a resize storm benchmark."""
+
+    success: bool = True
+    posted: int = 0
+    received: int = 0
+    applied: int = 0
+    merged: int = 0
+    final_size: list[int] = field(default_factory=list)
+    storm_ms: float = 0.0
+    mean_relayout_ms: float = 0.0
+    mean_repaint_ms: float = 0.0
+    worst_frame: dict[str, Any] = field(default_factory=dict)
+    resizes: list[dict[str, Any]] = field(default_factory=list)
+    spans: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class ScreenBenchmarkResult:
+    """Result of a screen transition benchmark."""
+
+    success: bool = True
+    visits: int = 0
+    screens: list[dict[str, Any]] = field(default_factory=list)
+    recommendations: list[str] = field(default_factory=list)
+    spans: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def _instrumented(report: dict[str, Any], instrument: list[str]) -> dict[str, Any]:
+    """Pick out the reports of the probes the caller asked for."""
+    return {name: report[name] for name in instrument}
+
+
+def _step_costs(frames: list[dict[str, Any]], labels: list[str]) -> list[dict]:
+    """Sum the recorded frames for each marked step."""
+    costs = {
+        label: {
+            "frames": 0,
+            "layout_ms": 0.0,
+            "paint_ms": 0.0,
+            "painted": 0,
+            "rendered": 0,
+        }
+        for label in labels
+    }
+    for frame in frames:
+        cost = costs.get(frame["action"].partition(": ")[2])
+        if cost is None:
+            continue
+        cost["frames"] += 1
+        for key in ("layout_ms", "paint_ms", "painted", "rendered"):
+            cost[key] += frame[key]
+    for cost in costs.values():
+        cost["frame_ms"] = cost["layout_ms"] + cost["paint_ms"]
+    return list(costs.values())
+
+
+def _summarize(mode: str, steps: list[dict[str, Any]]) -> dict[str, Any]:
+    """Summarize the steps of one scroll mode."""
+    measured = [step for step in steps if step["frames"]]
+    frame_ms = [step["frame_ms"] for step in measured] or [0.0]
+    return {
+        "mode": mode,
+        "steps": len(steps),
+        "frames": sum(step["frames"] for step in steps),
+        "mean_ms": fmean(frame_ms),
+        "p95_ms": _percentile(frame_ms, 0.95),
+        "max_ms": max(frame_ms),
+        "over_budget": sum(ms > FRAME_BUDGET_MS for ms in frame_ms),
+        "mean_painted": fmean([step["painted"] for step in measured] or [0]),
+        "mean_rendered": fmean([step["rendered"] for step in measured] or [0]),
+        "step_details": steps,
+    }
+
+
+def _scroll_step(target, mode: str) -> None:
+    """Scroll one step immediately, rather than after the next refresh."""
+    if mode == "line":
+        y = target.scroll_y + 1
+    elif mode == "page":
+        y = target.scroll_y + target.scrollable_content_region.height
+    else:
+        y = target.max_scroll_y
+    target.scroll_to(y=y, animate=False, immediate=True)
+
+
+async def _benchmark_scroll_async(
+    loader: AbstractContextManager[type],
+    selector: str,
+    steps: int,
+    size: tuple[int, int],
+    instrument: list[str],
+) -> ScrollBenchmarkResult:
+    probe_run = ProbeRun(["frames", *instrument])
+    step_labels: dict[str, list[str]] = {}
+    with memory_monitor.track(), loader as app_class:
+        app = app_class()
+        with probe_run.activate(app):
+            async with app.run_test(size=size) as pilot:
+                await pilot.pause()
+                target = app.screen.query_one(selector)
+                if target.max_scroll_y == 0:
+                    raise ValueError(f"'{selector}' has nothing to scroll vertically")
+                for mode in SCROLL_MODES:
+                    probe_run.mark(f"{mode} reset")
+                    target.scroll_home(animate=False, immediate=True)
+                    await _settle(app, app.screen)
+                    labels = step_labels[mode] = []
+                    for index in range(1 if mode == "end" else steps):
+                        if target.is_vertical_scroll_end:
+                            break
+                        labels.append(f"{mode} {index}")
+                        probe_run.mark(labels[-1])
+                        frame = probe_run.frame
+                        _scroll_step(target, mode)
+                        await probe_run.wait_for_frame(frame, FRAME_TIMEOUT)
+                        await _settle(app, app.screen)
+                probe_run.mark("done")
+                probe_run.finish(app)
+                descendants = len(list(target.walk_children()))
+                viewport_height = target.scrollable_content_region.height
+                virtual_height = target.virtual_size.height
+
+    report = probe_run.report()
+    frames = report["frames"]["frames"]
+    phases = [
+        _summarize(mode, _step_costs(frames, labels))
+        for mode, labels in step_labels.items()
+    ]
+    most_painted = max((phase["mean_painted"] for phase in phases), default=0)
+    return ScrollBenchmarkResult(
+        target=selector,
+        descendants=descendants,
+        viewport_height=viewport_height,
+        virtual_height=virtual_height,
+        phases=phases,
+        needs_virtualization=(
+            descendants > VIRTUALIZATION_RATIO * max(most_painted, 1)
+            and any(phase["p95_ms"] > FRAME_BUDGET_MS for phase in phases)
+        ),
+        spans=report.get("spans", {}),
+        metrics=_instrumented(report, instrument),
+    )
+
+
+def benchmark_scroll(
+    code: str,
+    selector: str,
+    steps: int = 50,
+    width: int = 80,
+    height: int = 24,
+    instrument: list[str] | None = None,
+) -> ScrollBenchmarkResult:
+    """Scroll a container by line, by page and to the end, timing each frame.
+
+    The container is scrolled through its own scroll methods with animation
+    off, returning to the top before each mode. For every step the frames it
+    caused are summed: time spent laying out the screen and compositing the
+    update, widgets painted into the frames and widgets whose content was
+    rendered again. Frames over the 60 fps budget are counted.
+
+    A container whose descendants far outnumber the widgets painted per
+    step, and whose frames still go over budget, is flagged as needing
+    virtualization: most of the frame is spent on widgets that are not on
+    screen. Widgets that draw their rows line by line, such as DataTable,
+    are virtualized already: they have no descendants and count as a single
+    rendered widget whenever they draw lines again.
+
+    Args:
+        code: Python code containing a Textual App class.
+        selector: CSS selector for the scrollable widget on the active screen
+            (for example a VerticalScroll, DataTable or ListView).
+        steps: Number of line and page steps. Stops early at the end.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+        instrument: More probes to attach to the run, by name. Their
+            findings are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        ScrollBenchmarkResult with per-mode summaries and per-step costs,
+        plus any spans the app recorded with tui_builder.spans.
+    """
+    if steps < 1 or steps > MAX_SCROLL_STEPS:
+        return ScrollBenchmarkResult(
+            success=False,
+            target=selector,
+            error=f"steps must be between 1 and {MAX_SCROLL_STEPS}",
+        )
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return ScrollBenchmarkResult(success=False, target=selector, error=str(e))
+    except SyntaxError as e:
+        return ScrollBenchmarkResult(
+            success=False, target=selector, error=f"Syntax error: {e}"
+        )
+
+    try:
+        return _run_sync(
+            _benchmark_scroll_async(
+                _load_app_class(code, path, files),
+                selector,
+                steps,
+                (width, height),
+                instrument or [],
+            )
+        )
+    except Exception as e:
+        return ScrollBenchmarkResult(success=False, target=selector, error=str(e))
+
+
+def _drag_sizes(
+    start: tuple[int, int], end: tuple[int, int], steps: int
+) -> list[tuple[int, int]]:
+    """Sizes for a window dragged from start to end and back again."""
+    half = max(steps // 2, 1)
+    out = [
+        (
+            round(start[0] + (end[0] - start[0]) * index / half),
+            round(start[1] + (end[1] - start[1]) * index / half),
+        )
+        for index in range(1, half + 1)
+    ]
+    back = list(reversed(out[:-1])) + [start]
+    return (out + back)[:steps]
+
+
+async def _benchmark_resize_async(
+    loader: AbstractContextManager[type],
+    sizes: list[tuple[int, int]],
+    size: tuple[int, int],
+    interval: float,
+    instrument: list[str],
+) -> ResizeBenchmarkResult:
+    from textual.events import Resize
+    from textual.geometry import Size
+
+    probe_run = ProbeRun(["frames", "resize", *instrument])
+    resize_probe = probe_run.probe("resize")
+    with memory_monitor.track(), loader as app_class:
+        app = app_class()
+        with probe_run.activate(app):
+            async with app.run_test(size=size) as pilot:
+                await pilot.pause()
+                probe_run.mark("storm")
+                received_before = resize_probe.received
+                start = perf_counter()
+                for width, height in sizes:
+                    new_size = Size(width, height)
+                    app._driver._size = new_size
+                    app.post_message(Resize(new_size, new_size))
+                    if interval:
+                        await asyncio.sleep(interval)
+                await pilot.pause()
+                await _settle(app, app.screen)
+                storm_ms = (perf_counter() - start) * 1000
+                probe_run.mark("done")
+                probe_run.finish(app)
+                final_size = list(app.screen.size)
+
+    report = probe_run.report()
+    frames = [
+        {**frame, "frame_ms": frame["layout_ms"] + frame["paint_ms"]}
+        for frame in report["frames"]["frames"]
+        if frame["action"].endswith("storm")
+    ]
+    resizes = [
+        resize
+        for resize in report["resize"]["resizes"]
+        if resize["action"].endswith("storm")
+    ]
+    return ResizeBenchmarkResult(
+        posted=len(sizes),
+        received=report["resize"]["received"] - received_before,
+        applied=len(resizes),
+        merged=len(sizes) - len(resizes),
+        final_size=final_size,
+        storm_ms=storm_ms,
+        mean_relayout_ms=fmean([entry["relayout_ms"] for entry in resizes] or [0.0]),
+        mean_repaint_ms=fmean([entry["repaint_ms"] for entry in resizes] or [0.0]),
+        worst_frame=max(frames, key=lambda frame: frame["frame_ms"], default={}),
+        resizes=resizes,
+        spans=report.get("spans", {}),
+        metrics=_instrumented(report, instrument),
+    )
+
+
+def benchmark_resize(
+    code: str,
+    sizes: list[list[int]] | None = None,
+    steps: int = 20,
+    min_width: int = 40,
+    min_height: int = 12,
+    width: int = 80,
+    height: int = 24,
+    interval_ms: float = 0.0,
+    instrument: list[str] | None = None,
+) -> ResizeBenchmarkResult:
+    """Drive an app through a burst of terminal resizes, as in a window drag.
+
+    Resize events are posted to the app the way a terminal driver would,
+    `interval_ms` apart. Textual merges resizes that queue up behind each
+    other and only relays out the screen for the latest one, so fewer
+    resizes are applied than posted. Each applied resize reports the time
+    to lay the screen out again and to repaint it; the worst frame during
+    the storm is reported with its layout and paint time.
+
+    Args:
+        code: Python code containing a Textual App class.
+        sizes: Explicit [width, height] pairs to resize through. If omitted,
+            the window is dragged from width x height down to min_width x
+            min_height and back over `steps` resizes.
+        steps: Number of resizes in a generated drag.
+        min_width: Smallest width of a generated drag.
+        min_height: Smallest height of a generated drag.
+        width: Starting terminal width in cells.
+        height: Starting terminal height in cells.
+        interval_ms: Delay between resizes. 0 posts the whole storm at once.
+        instrument: More probes to attach to the run, by name. Their
+            findings are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        ResizeBenchmarkResult with merge counts and per-resize timings, plus
+        any spans the app recorded with tui_builder.spans.
+    """
+    if sizes is None:
+        if steps < 1 or steps > MAX_RESIZES:
+            return ResizeBenchmarkResult(
+                success=False, error=f"steps must be between 1 and {MAX_RESIZES}"
+            )
+        storm = _drag_sizes((width, height), (min_width, min_height), steps)
+    else:
+        if not sizes or len(sizes) > MAX_RESIZES:
+            return ResizeBenchmarkResult(
+                success=False, error=f"Give between 1 and {MAX_RESIZES} sizes"
+            )
+        storm = [(int(size[0]), int(size[1])) for size in sizes]
+    if any(size[0] < 1 or size[1] < 1 for size in storm):
+        return ResizeBenchmarkResult(success=False, error="Sizes must be at least 1x1")
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return ResizeBenchmarkResult(success=False, error=str(e))
+    except SyntaxError as e:
+        return ResizeBenchmarkResult(success=False, error=f"Syntax error: {e}")
+
+    try:
+        return _run_sync(
+            _benchmark_resize_async(
+                _load_app_class(code, path, files),
+                storm,
+                (width, height),
+                max(interval_ms, 0.0) / 1000,
+                instrument or [],
+            )
+        )
+    except Exception as e:
+        return ResizeBenchmarkResult(success=False, error=str(e))
+
+
+def _screen_classes(module: ModuleType, names: list[str] | None) -> list[type]:
+    """Find the Screen classes to benchmark."""
+    from textual.screen import Screen
+
+    def is_screen(value: Any) -> bool:
+        return isinstance(value, type) and issubclass(value, Screen)
+
+    if names:
+        missing = [name for name in names if not is_screen(getattr(module, name, None))]
+        if missing:
+            raise AppLoadError(f"Not Screen classes in the code: {', '.join(missing)}")
+        return [getattr(module, name) for name in names]
+    classes = [
+        value
+        for value in vars(module).values()
+        if is_screen(value) and value.__module__ == module.__name__
+    ]
+    if not classes:
+        raise AppLoadError("No Screen classes found to benchmark")
+    return classes
+
+
+async def _timed(app, probe_run: ProbeRun, transition) -> float:
+    """Time a transition until its first frame is painted and the app settles."""
+    frame = probe_run.frame
+    start = perf_counter()
+    await transition()
+    await probe_run.wait_for_frame(frame, FRAME_TIMEOUT)
+    await _settle(app, app.screen)
+    return (perf_counter() - start) * 1000
+
+
+async def _screen_transitions(
+    app, probe_run: ProbeRun, screen_class: type, visits: int
+) -> dict[str, list[float]]:
+    """Run each transition to and from a screen `visits` times."""
+    from textual.screen import Screen
+
+    timings: dict[str, list[float]] = {
+        name: [] for name in ("push", "pop", "switch", "installed")
+    }
+    name = f"_benchmark_{screen_class.__name__}"
+
+    for _ in range(visits):
+        timings["push"].append(
+            await _timed(app, probe_run, lambda: app.push_screen(screen_class()))
+        )
+        timings["pop"].append(await _timed(app, probe_run, app.pop_screen))
+
+    await app.push_screen(Screen())
+    for _ in range(visits):
+        timings["switch"].append(
+            await _timed(app, probe_run, lambda: app.switch_screen(screen_class()))
+        )
+        await app.switch_screen(Screen())
+    await app.pop_screen()
+
+    app.install_screen(screen_class(), name)
+    for _ in range(visits):
+        timings["installed"].append(
+            await _timed(app, probe_run, lambda: app.push_screen(name))
+        )
+        await app.pop_screen()
+    app.uninstall_screen(name)
+
+    return timings
+
+
+async def _mode_transitions(
+    app, probe_run: ProbeRun, screen_class: type, visits: int
+) -> dict[str, list[float]]:
+    """Switch `visits` times to a mode based on a screen, and back out.
+
+    The app's default mode can't be switched back to unless the app defines
+    it, so this leaves the app in a plain home mode.
+    """
+    from textual.screen import Screen
+
+    home = "_benchmark_home"
+    if home not in app._modes:
+        app.add_mode(home, Screen)
+        await app.switch_mode(home)
+    name = f"_benchmark_{screen_class.__name__}"
+    app.add_mode(name, screen_class)
+    timings = []
+    for _ in range(visits):
+        timings.append(await _timed(app, probe_run, lambda: app.switch_mode(name)))
+        await app.switch_mode(home)
+    await app.remove_mode(name)
+    return {"mode": timings}
+
+
+async def _measure_screen(
+    app, probe_run: ProbeRun, screen_class: type, visits: int, transitions
+) -> dict[str, Any]:
+    """Run a set of transitions and summarize first and later visits."""
+    entry: dict[str, Any] = {"screen": screen_class.__name__}
+    try:
+        timings = await transitions(app, probe_run, screen_class, visits)
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+        return entry
+    entry["transitions"] = {
+        transition: {
+            "first_ms": times[0],
+            "later_ms": fmean(times[1:] or times),
+            "max_ms": max(times),
+        }
+        for transition, times in timings.items()
+    }
+    return entry
+
+
+def _recommend(screen: dict[str, Any]) -> str | None:
+    """Suggest how to make transitions to a screen cheaper, if needed."""
+    push = screen["transitions"]["push"]
+    installed = screen["transitions"]["installed"]
+    name = screen["screen"]
+    if push["later_ms"] > FRAME_BUDGET_MS and installed["later_ms"] < (
+        push["later_ms"] / 2
+    ):
+        return (
+            f"{name}: pushing a new instance takes {push['later_ms']:.1f} ms on "
+            f"every visit but {installed['later_ms']:.1f} ms when installed; "
+            "install it (or give it a mode) so it is composed once"
+        )
+    if push["first_ms"] > FRAME_BUDGET_MS and push["later_ms"] <= FRAME_BUDGET_MS:
+        return (
+            f"{name}: the first visit takes {push['first_ms']:.1f} ms; install "
+            "it at startup to pay that cost before it is shown"
+        )
+    return None
+
+
+async def _benchmark_screens_async(
+    code: str,
+    loader: AbstractContextManager[ModuleType],
+    names: list[str] | None,
+    visits: int,
+    size: tuple[int, int],
+    instrument: list[str],
+) -> ScreenBenchmarkResult:
+    from textual.app import App
+
+    probe_run = ProbeRun(["frames", *instrument])
+    screens = []
+    with memory_monitor.track(), loader as module:
+        screen_classes = _screen_classes(module, names)
+        if _extract_app_class_name(code):
+            app_class = _module_app_class(module, code)
+        else:
+            app_class = type("BenchmarkHostApp", (App,), {"__module__": __name__})
+        app = app_class()
+        with probe_run.activate(app):
+            async with app.run_test(size=size) as pilot:
+                await pilot.pause()
+                for screen_class in screen_classes:
+                    probe_run.mark(screen_class.__name__)
+                    screens.append(
+                        await _measure_screen(
+                            app, probe_run, screen_class, visits, _screen_transitions
+                        )
+                    )
+                # Modes go last as they leave the app outside its default mode.
+                for screen_class, screen in zip(screen_classes, screens, strict=True):
+                    if "transitions" not in screen:
+                        continue
+                    probe_run.mark(f"{screen_class.__name__} mode")
+                    modes = await _measure_screen(
+                        app, probe_run, screen_class, visits, _mode_transitions
+                    )
+                    if "error" in modes:
+                        screen["error"] = modes["error"]
+                    else:
+                        screen["transitions"].update(modes["transitions"])
+                probe_run.finish(app)
+
+    recommendations = [
+        recommendation
+        for screen in screens
+        if "transitions" in screen and (recommendation := _recommend(screen))
+    ]
+    report = probe_run.report()
+    return ScreenBenchmarkResult(
+        visits=visits,
+        screens=screens,
+        recommendations=recommendations,
+        spans=report.get("spans", {}),
+        metrics=_instrumented(report, instrument),
+    )
+
+
+def benchmark_screens(
+    code: str,
+    screens: list[str] | None = None,
+    visits: int = 3,
+    width: int = 80,
+    height: int = 24,
+    instrument: list[str] | None = None,
+) -> ScreenBenchmarkResult:
+    """Measure transition latency to and from each screen in an app.
+
+    Every screen is visited `visits` times with each transition: push a new
+    instance, pop back, switch the top screen to a new instance, push an
+    installed instance by name, and switch to a mode whose base screen it
+    is. A transition is timed until its first frame is painted and the app
+    has processed the messages it caused. The first visit, which also pays
+    one-off costs such as parsing the screen's CSS, is reported apart from
+    the mean of later visits.
+
+    Screens whose later pushes still go over the 60 fps frame budget, but
+    are much cheaper when installed, are recommended for caching. Screens
+    whose first visit alone is slow are recommended for installing at
+    startup.
+
+    Args:
+        code: Python code defining the screens, and optionally the App to
+            host them.
+        screens: Names of the Screen classes to measure. Defaults to every
+            Screen class defined in the code. Each must be constructible
+            without arguments.
+        visits: Number of times to run each transition per screen.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+        instrument: More probes to attach to the run, by name. Their
+            findings are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        ScreenBenchmarkResult with timings per screen and transition, plus
+        any spans the app recorded with tui_builder.spans.
+    """
+    if visits < 1 or visits > MAX_VISITS:
+        return ScreenBenchmarkResult(
+            success=False, error=f"visits must be between 1 and {MAX_VISITS}"
+        )
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return ScreenBenchmarkResult(success=False, error=str(e))
+    except SyntaxError as e:
+        return ScreenBenchmarkResult(success=False, error=f"Syntax error: {e}")
+
+    try:
+        return _run_sync(
+            _benchmark_screens_async(
+                code,
+                _load_module(code, path, files),
+                screens,
+                visits,
+                (width, height),
+                instrument or [],
+            )
+        )
+    except Exception as e:
+        return ScreenBenchmarkResult(success=False, error=str(e))
+
+
+def register_benchmark_tools(mcp: FastMCP) -> None:
+    """Register benchmark tools."""
+    mcp.tool()(benchmark_scroll)
+    mcp.tool()(benchmark_resize)
+    mcp.tool()(benchmark_screens)
@@ -0,0 +1,318 @@
+"""A/B performance comparisons between two versions of an app.
+
+Both versions run the same key script, alternating which goes first on each
+iteration so drift in the machine's load affects them equally. Every
+iteration pairs one run of each version, and the comparison is made on the
+paired differences: the mean change from A to B with a 95% confidence
+interval from Student's t distribution. A change is significant when the
+interval excludes zero.
+
+Memory is measured in separate runs with tracemalloc, which slows the code
+it traces too much to share runs with the timings. Probes named in
+``instrument`` are attached to one more untimed run of each version, for
+the same reason.
+"""
+
+import tracemalloc
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from math import sqrt
+from statistics import fmean, stdev
+from time import perf_counter
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.memory import memory_monitor
+from tui_builder.tools.probes import ProbeRun, action_label, check_probe_names
+from tui_builder.tools.sessions import _settle
+from tui_builder.tools.testing import (
+    KeyScriptError,
+    _load_app_class,
+    _perform_action,
+    _run_sync,
+    parse_key_script,
+)
+from tui_builder.tools.workspaces import WorkspaceError, resolve_files
+
+MIN_ITERATIONS = 2
+MAX_ITERATIONS = 100
+MEMORY_RUNS = 4
+KB = 1024
+
+# Two-sided 95% critical values of Student's t for 1 to 30 degrees of
+# freedom; larger samples use the normal value.
+_T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)  # fmt: skip
+_Z_95 = 1.960
+
+
+@dataclass
+class PerformanceComparison:
+    """Result of an A/B performance comparison."""
+
+    success: bool = True
+    iterations: int = 0
+    scenario: list[str] = field(default_factory=list)
+    comparisons: list[dict[str, Any]] = field(default_factory=list)
+    improved: list[str] = field(default_factory=list)
+    regressed: list[str] = field(default_factory=list)
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def _t_critical(degrees_of_freedom: int) -> float:
+    if degrees_of_freedom <= len(_T_95):
+        return _T_95[degrees_of_freedom - 1]
+    return _Z_95
+
+
+def _compare_paired(metric: str, a: list[float], b: list[float]) -> dict[str, Any]:
+    """Compare paired samples where lower values are better."""
+    deltas = [after - before for before, after in zip(a, b, strict=True)]
+    delta = fmean(deltas)
+    margin = _t_critical(len(deltas) - 1) * stdev(deltas) / sqrt(len(deltas))
+    low, high = delta - margin, delta + margin
+    if high < 0:
+        verdict = "improved"
+    elif low > 0:
+        verdict = "regressed"
+    else:
+        verdict = "not significant"
+    a_mean = fmean(a)
+    return {
+        "metric": metric,
+        "a_mean": a_mean,
+        "b_mean": fmean(b),
+        "delta": delta,
+        "delta_pct": delta / a_mean * 100 if a_mean else None,
+        "ci_low": low,
+        "ci_high": high,
+        "significant": verdict != "not significant",
+        "verdict": verdict,
+    }
+
+
+async def _run_scenario(
+    app_class: type,
+    actions: list[tuple[str, ...]],
+    size: tuple[int, int],
+    probe_run: ProbeRun | None = None,
+) -> dict[str, Any]:
+    """Run the scenario once, timing startup and every action.
+
+    With a probe run, its probes are attached and each action is marked.
+    """
+    app = app_class()
+    start = perf_counter()
+    with probe_run.activate(app) if probe_run else nullcontext():
+        async with app.run_test(size=size) as pilot:
+            await _settle(app, app.screen)
+            mount = perf_counter() - start
+            timings = []
+            for action in actions:
+                if probe_run:
+                    probe_run.mark(action_label(action))
+                start = perf_counter()
+                await _perform_action(app, pilot, action)
+                await _settle(app, app.screen)
+                timings.append(perf_counter() - start)
+            if probe_run:
+                probe_run.finish(app)
+    return {
+        "mount_ms": mount * 1000,
+        "interaction_ms": sum(timings) * 1000,
+        "actions_ms": [timing * 1000 for timing in timings],
+    }
+
+
+async def _traced_scenario(
+    app_class: type, actions: list[tuple[str, ...]], size: tuple[int, int]
+) -> dict[str, Any]:
+    """Run the scenario once, measuring the memory Python allocated for it."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await _run_scenario(app_class, actions, size)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if started:
+            tracemalloc.stop()
+    return {"peak_kb": (peak - baseline) / KB}
+
+
+async def _interleaved(
+    run: Callable, classes: tuple[type, type], iterations: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Run both versions `iterations` times, alternating which goes first."""
+    results: tuple[list, list] = ([], [])
+    for iteration in range(iterations):
+        order = (0, 1) if iteration % 2 == 0 else (1, 0)
+        for version in order:
+            results[version].append(await run(classes[version]))
+    return results
+
+
+async def _compare_async(
+    loader_a: AbstractContextManager[type],
+    loader_b: AbstractContextManager[type],
+    actions: list[tuple[str, ...]],
+    iterations: int,
+    warmup: int,
+    size: tuple[int, int],
+    instrument: list[str],
+) -> PerformanceComparison:
+    def timed(app_class):
+        return _run_scenario(app_class, actions, size)
+
+    def traced(app_class):
+        return _traced_scenario(app_class, actions, size)
+
+    async def probed(app_class):
+        probe_run = ProbeRun(instrument)
+        await _run_scenario(app_class, actions, size, probe_run)
+        return probe_run.report()
+
+    with (
+        memory_monitor.track(),
+        loader_a as class_a,
+        loader_b as class_b,
+    ):
+        classes = (class_a, class_b)
+        # The first runs pay one-off costs such as parsing CSS and imports.
+        await _interleaved(timed, classes, warmup)
+        runs_a, runs_b = await _interleaved(timed, classes, iterations)
+        # Tracing has one-off costs of its own, which a pair of runs absorbs.
+        await _interleaved(traced, classes, 1)
+        memory_a, memory_b = await _interleaved(
+            traced, classes, min(iterations, MEMORY_RUNS)
+        )
+        metrics = {}
+        if instrument:
+            (metrics["A"],), (metrics["B"],) = await _interleaved(probed, classes, 1)
+
+    def paired(metric: str, a: list[dict], b: list[dict], key: Callable):
+        return _compare_paired(metric, [key(run) for run in a], [key(run) for run in b])
+
+    labels = [action_label(action) for action in actions]
+    comparisons = [
+        paired("mount_ms", runs_a, runs_b, lambda run: run["mount_ms"]),
+        paired("interaction_ms", runs_a, runs_b, lambda run: run["interaction_ms"]),
+        *(
+            paired(
+                f"action {index}: {label} ms",
+                runs_a,
+                runs_b,
+                lambda run, index=index: run["actions_ms"][index],
+            )
+            for index, label in enumerate(labels)
+        ),
+    ]
+    if len(memory_a) >= MIN_ITERATIONS:
+        comparisons.append(
+            paired("peak_kb", memory_a, memory_b, lambda run: run["peak_kb"])
+        )
+    return PerformanceComparison(
+        iterations=iterations,
+        scenario=labels,
+        comparisons=comparisons,
+        improved=[c["metric"] for c in comparisons if c["verdict"] == "improved"],
+        regressed=[c["metric"] for c in comparisons if c["verdict"] == "regressed"],
+        metrics=metrics,
+    )
+
+
+def compare_performance(
+    code_a: str,
+    code_b: str,
+    script: str = "",
+    iterations: int = 10,
+    warmup: int = 1,
+    width: int = 80,
+    height: int = 24,
+    instrument: list[str] | None = None,
+) -> PerformanceComparison:
+    """Measure whether version B of an app is faster or leaner than version A.
+
+    Both versions run the key script, one after the other, for every
+    iteration. Measured for each run:
+
+    - mount_ms: from starting the app until its first screen has mounted
+      and settled.
+    - interaction_ms: the whole script, from each action until the app has
+      processed the messages it caused, and the same for every action.
+    - peak_kb: peak memory Python allocated during the run, from up to
+      four extra runs of each version traced with tracemalloc.
+
+    Each metric is reported as B's mean change from A, with a 95%
+    confidence interval and a verdict: "improved" or "regressed" when the
+    interval excludes zero, otherwise "not significant". Other runs on the
+    shared pilot loop add noise, which widens the intervals.
+
+    Args:
+        code_a: The baseline version of the app.
+        code_b: The changed version of the app.
+        script: Key script to run against both (see run_key_script).
+        iterations: Timed runs of each version, at least 2.
+        warmup: Untimed runs of each version before measuring.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+        instrument: Probes to attach to an extra, untimed run of each
+            version, by name. Their findings are returned in metrics under
+            "A" and "B"; see tui_builder.tools.probes.
+
+    Returns:
+        PerformanceComparison with a comparison per metric and the metrics
+        B improved or regressed.
+    """
+    if not MIN_ITERATIONS <= iterations <= MAX_ITERATIONS:
+        return PerformanceComparison(
+            success=False,
+            error=(f"iterations must be between {MIN_ITERATIONS} and {MAX_ITERATIONS}"),
+        )
+    loaders = []
+    for label, code in (("A", code_a), ("B", code_b)):
+        try:
+            code, path, files = resolve_files(code)
+            compile(code, "<string>", "exec")
+        except WorkspaceError as e:
+            return PerformanceComparison(success=False, error=f"Version {label}: {e}")
+        except SyntaxError as e:
+            return PerformanceComparison(
+                success=False, error=f"Syntax error in version {label}: {e}"
+            )
+        loaders.append(_load_app_class(code, path, files))
+    try:
+        actions = parse_key_script(script)
+    except KeyScriptError as e:
+        return PerformanceComparison(success=False, error=f"Invalid key script: {e}")
+    try:
+        check_probe_names(instrument or [])
+    except ValueError as e:
+        return PerformanceComparison(success=False, error=str(e))
+
+    try:
+        return _run_sync(
+            _compare_async(
+                *loaders,
+                actions,
+                iterations,
+                max(warmup, 0),
+                (width, height),
+                instrument or [],
+            )
+        )
+    except Exception as e:
+        return PerformanceComparison(success=False, error=str(e))
+
+
+def register_comparison_tools(mcp: FastMCP) -> None:
+    """Register A/B comparison tools."""
+    mcp.tool()(compare_performance)
@@ -0,0 +1,236 @@
+"""Isolated executors for pilot runs.
+
+Pilot runs execute user code. Running them on the shared pilot loop is cheap
+but lets that code touch the server's global state. The executors here run
+each job somewhere else:
+
+- ``subinterpreter``: a fresh subinterpreter per job with its own GIL, on
+  Pythons that ship ``concurrent.interpreters`` (3.14+).
+- ``process``: a pool of spawned worker processes.
+
+``auto`` and ``subinterpreter`` fall back to ``process`` when the running
+interpreter doesn't support subinterpreters. Large results come back through
+shared memory rather than being pickled through a pipe.
+"""
+
+import atexit
+import sys
+import threading
+import weakref
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+
+from tui_builder.tools.memory import memory_monitor
+from tui_builder.tools.pilot_loop import DEFAULT_PILOT_CONCURRENCY
+from tui_builder.tools.testing import PilotJob, SnapshotResult
+from tui_builder.tools.transport import SharedResult, export_result, import_result
+
+BACKENDS = ("auto", "subinterpreter", "process")
+
+
+def subinterpreters_supported() -> bool:
+    """Check whether this Python can run code in isolated subinterpreters."""
+    try:
+        from concurrent import interpreters  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(backend: str) -> str:
+    """Resolve a requested backend to the one that will actually be used.
+
+    Args:
+        backend: One of BACKENDS.
+
+    Returns:
+        "subinterpreter" or "process".
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown executor backend '{backend}', expected one of {BACKENDS}"
+        )
+    if backend == "process" or not subinterpreters_supported():
+        return "process"
+    return "subinterpreter"
+
+
+def _prepare_worker(sys_path: list[str]) -> None:
+    """Give a worker the same import path as the server."""
+    sys.path[:] = sys_path
+
+
+def _run_job(job: PilotJob) -> SnapshotResult | SharedResult:
+    """Run a pilot job to completion on a private event loop."""
+    import asyncio
+
+    from tui_builder.tools.testing import _run_pilot_job
+
+    return export_result(asyncio.run(_run_pilot_job(job)))
+
+
+def _run_job_in_subinterpreter(job: PilotJob) -> SnapshotResult | SharedResult:
+    """Run a pilot job in a new subinterpreter that is destroyed afterwards."""
+    from concurrent import interpreters
+
+    interpreter = interpreters.create()
+    try:
+        interpreter.exec(f"import sys; sys.path[:] = {sys.path!r}")
+        return interpreter.call(_run_job, job)
+    finally:
+        interpreter.close()
+
+
+class PilotExecutor:
+    """Runs pilot jobs outside the server's interpreter."""
+
+    def __init__(self, backend: str = "auto", max_workers: int | None = None) -> None:
+        self.backend = resolve_backend(backend)
+        self.max_workers = max_workers or DEFAULT_PILOT_CONCURRENCY
+        self._lock = threading.Lock()
+        self._pool = self._create_pool()
+        self._pools: weakref.WeakKeyDictionary[Future, Executor] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._shutting_down = False
+
+    def _create_pool(self) -> Executor:
+        if self.backend == "subinterpreter":
+            return ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="pilot-interpreter"
+            )
+        import multiprocessing
+
+        return ProcessPoolExecutor(
+            self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_prepare_worker,
+            initargs=(list(sys.path),),
+            max_tasks_per_child=memory_monitor.limits.max_jobs_per_worker,
+        )
+
+    def submit(self, job: PilotJob) -> "Future[SnapshotResult | SharedResult]":
+        """Start a job and return a future for its result.
+
+        Pass the finished future to ``result`` to get the SnapshotResult:
+        large results arrive as handles to shared memory, which it reads and
+        frees.
+        """
+        target = (
+            _run_job_in_subinterpreter if self.backend == "subinterpreter" else _run_job
+        )
+        with self._lock:
+            future = self._pool.submit(target, job)
+            self._pools[future] = self._pool
+            return future
+
+    def run_all(
+        self, jobs: list[PilotJob], max_in_flight: int | None = None
+    ) -> list[SnapshotResult]:
+        """Run jobs, keeping at most `max_in_flight` submitted at once.
+
+        Args:
+            jobs: The jobs to run.
+            max_in_flight: Optional limit on concurrently submitted jobs.
+
+        Returns:
+            A SnapshotResult for each job, in the order given.
+        """
+        limit = max_in_flight or len(jobs) or 1
+        results: list[SnapshotResult | None] = [None] * len(jobs)
+        pending: dict[Future, int] = {}
+        for index, job in enumerate(jobs):
+            if len(pending) >= limit:
+                self._collect(pending, results, FIRST_COMPLETED)
+            pending[self.submit(job)] = index
+        self._collect(pending, results)
+        return [
+            result
+            or SnapshotResult(
+                success=False, error="Worker died before returning a result"
+            )
+            for result in results
+        ]
+
+    def _collect(
+        self,
+        pending: dict[Future, int],
+        results: list[SnapshotResult | None],
+        return_when: str = "ALL_COMPLETED",
+    ) -> None:
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            results[pending.pop(future)] = self.result(future)
+
+    def result(self, future: Future) -> SnapshotResult:
+        """Return the result of a finished future from ``submit``."""
+        try:
+            value = future.result()
+            result = import_result(value)
+        except BrokenProcessPool as e:
+            self._replace_pool(self._pools.get(future))
+            return SnapshotResult(success=False, error=f"Worker crashed: {e}")
+        except CancelledError:
+            return SnapshotResult(
+                success=False, error="Cancelled before it ran: the executor stopped"
+            )
+        except Exception as e:
+            return SnapshotResult(success=False, error=str(e))
+        if isinstance(value, SharedResult):
+            result.metrics["shared_memory_bytes"] = value.size
+        return result
+
+    def _replace_pool(self, broken: Executor | None) -> None:
+        """Swap a broken pool for a fresh one.
+
+        Every job that was on the pool fails with it, so only the first
+        failure to be collected replaces it, and none does once the executor
+        is shutting down.
+        """
+        with self._lock:
+            if self._shutting_down or broken is not self._pool:
+                return
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._create_pool()
+
+    def shutdown(self) -> None:
+        """Stop all workers. Results of finished jobs can still be read."""
+        with self._lock:
+            self._shutting_down = True
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_executors: dict[str, PilotExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_pilot_executor(backend: str = "auto") -> PilotExecutor:
+    """Return the shared executor for a backend, creating it on first use."""
+    resolved = resolve_backend(backend)
+    with _executors_lock:
+        if resolved not in _executors:
+            _executors[resolved] = PilotExecutor(resolved)
+        return _executors[resolved]
+
+
+def shutdown_pilot_executors() -> None:
+    """Stop every shared executor."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
+
+
+atexit.register(shutdown_pilot_executors)
@@ -0,0 +1,426 @@
+"""Leak detection for repeated screen and widget cycles.
+
+A leak that costs one screen per push/pop is invisible in a single run but
+grows without bound over a long session. These tools repeat a cycle many
+times in a running app, sample live objects as they go and report the types
+whose counts grow in step with the number of cycles.
+"""
+
+import gc
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from types import FrameType, ModuleType
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.memory import memory_monitor
+from tui_builder.tools.probes import ProbeRun
+from tui_builder.tools.testing import (
+    AppLoadError,
+    _extract_app_class_name,
+    _load_module,
+    _module_app_class,
+    _run_sync,
+)
+from tui_builder.tools.workspaces import WorkspaceError, resolve_files
+
+LEAK_MODES = ("screen", "widget")
+MAX_LEAK_CYCLES = 1000
+LEAK_SAMPLES = 5
+LEAK_OBJECTS_PER_CYCLE = 0.5
+MAX_REPORTED_TYPES = 20
+MAX_TRACED_TYPES = 3
+MAX_CHAIN_DEPTH = 12
+MAX_REFERRER_LOOKUPS = 500
+
+
+@dataclass
+class LeakReport:
+    """Result of a leak detection run."""
+
+    success: bool = True
+    target: str = ""
+    cycles: int = 0
+    leaking: bool = False
+    retained_bytes_per_cycle: float | None = None
+    samples: list[dict[str, Any]] = field(default_factory=list)
+    growth: list[dict[str, Any]] = field(default_factory=list)
+    referrers: dict[str, list[str]] = field(default_factory=dict)
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _find_target(module: ModuleType, mode: str, target: str | None) -> type:
+    """Find the Screen or Widget class to cycle."""
+    from textual.screen import Screen
+    from textual.widget import Widget
+
+    base = Screen if mode == "screen" else Widget
+
+    def is_target(value: Any) -> bool:
+        return (
+            isinstance(value, type)
+            and issubclass(value, base)
+            and not (mode == "widget" and issubclass(value, Screen))
+        )
+
+    if target:
+        value = getattr(module, target, None)
+        if not is_target(value):
+            raise AppLoadError(f"{target} is not a {base.__name__} class in the code")
+        return value
+
+    for value in vars(module).values():
+        if is_target(value) and value.__module__ == module.__name__:
+            return value
+    raise AppLoadError(f"No {base.__name__} class found to cycle")
+
+
+async def _screen_cycle(app, pilot, target: type) -> None:
+    await app.push_screen(target())
+    await pilot._wait_for_screen()
+    await app.pop_screen()
+    await pilot._wait_for_screen()
+
+
+async def _widget_cycle(app, pilot, target: type) -> None:
+    widget = target()
+    await app.screen.mount(widget)
+    await pilot._wait_for_screen()
+    await widget.remove()
+    await pilot._wait_for_screen()
+
+
+def _count_objects() -> Counter:
+    """Collect garbage, then count the live objects tracked by gc by type."""
+    gc.collect()
+    return Counter(map(type, gc.get_objects()))
+
+
+def _leaking_types(
+    counts: list[Counter], cycles: int, module: ModuleType
+) -> list[dict[str, Any]]:
+    """Find types whose counts never drop and grow at least steadily with N.
+
+    DOM nodes, messages and classes from the user's code are marked as
+    leaks. Growth in other types is reported too, but may be caches that
+    are still filling up.
+    """
+    from textual.dom import DOMNode
+    from textual.message import Message
+
+    first, last = counts[0], counts[-1]
+    growth = []
+    for cls, end in last.items():
+        start = first.get(cls, 0)
+        if end - start < cycles * LEAK_OBJECTS_PER_CYCLE:
+            continue
+        series = [sample.get(cls, 0) for sample in counts]
+        if any(
+            later < earlier for earlier, later in zip(series, series[1:], strict=False)
+        ):
+            continue
+        growth.append(
+            {
+                "type": _type_name(cls),
+                "start": start,
+                "end": end,
+                "per_cycle": (end - start) / cycles,
+                "leak": issubclass(cls, DOMNode | Message)
+                or cls.__module__ == module.__name__,
+                "class": cls,
+            }
+        )
+    growth.sort(key=lambda entry: (not entry["leak"], -entry["per_cycle"]))
+    return growth[:MAX_REPORTED_TYPES]
+
+
+def _edge(container: Any, child: Any) -> str:
+    """Describe how a container refers to a child."""
+    if isinstance(container, dict):
+        for key, value in container.items():
+            if value is child:
+                return f"[{key!r}]"
+    elif isinstance(container, list | tuple):
+        for index, value in enumerate(container):
+            if value is child:
+                return f"[{index}]"
+    else:
+        for name, value in (
+            vars(container).items() if hasattr(container, "__dict__") else ()
+        ):
+            if value is child:
+                return f".{name}"
+    return ""
+
+
+def _referrer_chain(obj: Any, roots: set[int]) -> list[str]:
+    """Find a chain of references from a root object down to obj.
+
+    Roots are modules, classes and the given objects (such as the app).
+    Returns lines from the root to the object, or an empty list if no root
+    is found within MAX_CHAIN_DEPTH steps and MAX_REFERRER_LOOKUPS searches.
+    """
+    nodes = {id(obj): obj}
+    parents: dict[int, int] = {}
+    depth = {id(obj): 0}
+    frontier = [id(obj)]
+    bookkeeping = {id(nodes), id(frontier)}
+
+    lookups = 0
+    while frontier and lookups < MAX_REFERRER_LOOKUPS:
+        node_id = frontier.pop(0)
+        if depth[node_id] >= MAX_CHAIN_DEPTH:
+            continue
+        lookups += 1
+        for referrer in gc.get_referrers(nodes[node_id]):
+            referrer_id = id(referrer)
+            if (
+                referrer_id in nodes
+                or referrer_id in bookkeeping
+                or isinstance(referrer, FrameType)
+            ):
+                continue
+            nodes[referrer_id] = referrer
+            parents[referrer_id] = node_id
+            depth[referrer_id] = depth[node_id] + 1
+            if referrer_id in roots or isinstance(referrer, ModuleType | type):
+                return _describe_chain(referrer_id, nodes, parents)
+            frontier.append(referrer_id)
+    return []
+
+
+def _describe_chain(
+    root_id: int, nodes: dict[int, Any], parents: dict[int, int]
+) -> list[str]:
+    path = [nodes[root_id]]
+    while (child_id := parents.get(id(path[-1]))) is not None:
+        path.append(nodes[child_id])
+
+    # Fold namespaces into their owners, so "obj.attr" reads as such.
+    lines = []
+    index = 0
+    while index < len(path):
+        node = path[index]
+        child = path[index + 1] if index + 1 < len(path) else None
+        if _is_namespace(node, child) and index + 2 < len(path):
+            child = path[index + 2]
+            index += 1
+        edge = _edge(node, child) if child is not None else ""
+        lines.append(f"{_object_name(node)}{edge}")
+        index += 1
+    return lines
+
+
+def _is_namespace(owner: Any, child: Any) -> bool:
+    """Check whether child is the attribute dict of owner."""
+    if not isinstance(child, dict):
+        return False
+    namespace = getattr(owner, "__dict__", None)
+    # A class's __dict__ is a read-only proxy over its namespace dict.
+    return namespace is child or (isinstance(owner, type) and namespace == child)
+
+
+def _object_name(obj: Any) -> str:
+    if isinstance(obj, ModuleType):
+        return f"module {obj.__name__}"
+    if isinstance(obj, type):
+        return f"class {_type_name(obj)}"
+    return _type_name(type(obj))
+
+
+def _trace_referrers(
+    growth: list[dict[str, Any]], app: Any, module: ModuleType
+) -> dict[str, list[str]]:
+    """Find referrer chains for the most suspicious leaking types."""
+    # Types from the user's code are the most telling.
+    suspects = sorted(
+        (entry for entry in growth if entry["leak"]),
+        key=lambda entry: entry["class"].__module__ != module.__name__,
+    )[:MAX_TRACED_TYPES]
+    chains = {}
+    for entry in suspects:
+        cls = entry["class"]
+        instances = [obj for obj in gc.get_objects() if type(obj) is cls]
+        if not instances:
+            continue
+        newest = instances[-1]
+        del instances
+        chains[entry["type"]] = _referrer_chain(newest, {id(app)})
+    return chains
+
+
+@contextmanager
+def _tracing(enabled: bool) -> Iterator[None]:
+    """Trace allocations for the block unless something else already is."""
+    started = enabled and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+async def _sample_cycles(
+    app, pilot, cycle, target_class: type, cycles: int, trace_memory: bool
+) -> tuple[list[Counter], list[dict[str, Any]]]:
+    """Run the measured cycles, sampling objects at LEAK_SAMPLES points."""
+    checkpoints = {
+        round(index * cycles / LEAK_SAMPLES) for index in range(LEAK_SAMPLES + 1)
+    }
+    counts: list[Counter] = []
+    samples: list[dict[str, Any]] = []
+    with _tracing(trace_memory):
+        for completed in range(cycles + 1):
+            if completed:
+                await cycle(app, pilot, target_class)
+            if completed in checkpoints:
+                counts.append(_count_objects())
+                sample = {"cycle": completed, "objects": sum(counts[-1].values())}
+                if trace_memory:
+                    sample["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+                samples.append(sample)
+    return counts, samples
+
+
+async def _detect_leaks_async(
+    code: str,
+    loader: AbstractContextManager[ModuleType],
+    mode: str,
+    target: str | None,
+    cycles: int,
+    warmup: int,
+    trace_memory: bool,
+    instrument: list[str],
+) -> LeakReport:
+    from textual.app import App
+
+    probe_run = ProbeRun(instrument)
+    with memory_monitor.track(), loader as module:
+        target_class = _find_target(module, mode, target)
+        if _extract_app_class_name(code):
+            app_class = _module_app_class(module, code)
+        else:
+            app_class = type("LeakHostApp", (App,), {"__module__": __name__})
+        cycle = _screen_cycle if mode == "screen" else _widget_cycle
+
+        app = app_class()
+        with probe_run.activate(app):
+            async with app.run_test() as pilot:
+                probe_run.mark("warmup")
+                for _ in range(warmup):
+                    await cycle(app, pilot, target_class)
+                probe_run.mark("cycles")
+                counts, samples = await _sample_cycles(
+                    app, pilot, cycle, target_class, cycles, trace_memory
+                )
+                probe_run.finish(app)
+                growth = _leaking_types(counts, cycles, module)
+                referrers = _trace_referrers(growth, app, module)
+
+    retained = None
+    if trace_memory:
+        retained = (samples[-1]["traced_bytes"] - samples[0]["traced_bytes"]) / cycles
+    for entry in growth:
+        del entry["class"]
+    return LeakReport(
+        target=_type_name(target_class),
+        cycles=cycles,
+        leaking=any(entry["leak"] for entry in growth),
+        retained_bytes_per_cycle=retained,
+        samples=samples,
+        growth=growth,
+        referrers=referrers,
+        metrics=probe_run.report(),
+    )
+
+
+def detect_leaks(
+    code: str,
+    mode: str = "screen",
+    target: str | None = None,
+    cycles: int = 100,
+    warmup: int = 5,
+    trace_memory: bool = True,
+    instrument: list[str] | None = None,
+) -> LeakReport:
+    """Repeat a screen push/pop or widget mount/remove cycle and look for leaks.
+
+    After a few warmup cycles (which fill caches), live objects and, with
+    ``trace_memory``, traced memory are sampled at regular points while the
+    cycle repeats. Types whose counts never drop and grow by at least half
+    an object per cycle are reported. The run is marked as leaking when DOM
+    nodes, messages or classes from the code accumulate, and for those a
+    referrer chain from a module, class or the app down to a recent instance
+    shows what keeps it alive. Growth in other types may be caches that are
+    still filling up.
+
+    Counts cover the whole process, so concurrent pilot runs can add noise.
+    Probes attached with ``instrument`` keep records of what they see, which
+    add to the counts too.
+
+    Args:
+        code: Python code defining the Screen or Widget to cycle, and
+            optionally the App to host it.
+        mode: "screen" to push and pop a screen, "widget" to mount and
+            remove a widget on the current screen.
+        target: Name of the class to cycle. Defaults to the first Screen or
+            Widget class defined in the code.
+        cycles: Number of measured cycles.
+        warmup: Cycles to run before measuring.
+        trace_memory: Trace allocations with tracemalloc to report retained
+            bytes per cycle. Tracing slows the cycles down several times.
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        LeakReport with samples, growing types and referrer chains.
+    """
+    if mode not in LEAK_MODES:
+        return LeakReport(
+            success=False, error=f"mode must be one of {', '.join(LEAK_MODES)}"
+        )
+    if cycles < 1 or cycles > MAX_LEAK_CYCLES:
+        return LeakReport(
+            success=False, error=f"cycles must be between 1 and {MAX_LEAK_CYCLES}"
+        )
+    if warmup < 0:
+        return LeakReport(success=False, error="warmup must not be negative")
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return LeakReport(success=False, error=str(e))
+    except SyntaxError as e:
+        return LeakReport(success=False, error=f"Syntax error: {e}")
+
+    try:
+        return _run_sync(
+            _detect_leaks_async(
+                code,
+                _load_module(code, path, files),
+                mode,
+                target,
+                cycles,
+                warmup,
+                trace_memory,
+                instrument or [],
+            )
+        )
+    except Exception as e:
+        return LeakReport(success=False, error=str(e))
+
+
+def register_leak_tools(mcp: FastMCP) -> None:
+    """Register leak detection tools."""
+    mcp.tool()(detect_leaks)
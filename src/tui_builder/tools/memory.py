@@ -0,0 +1,372 @@
+"""Memory accounting for in-process pilot runs.
+
+Pilot runs execute user code inside the server process. Each run records the
+modules it imported, the threads it left running and the server's resident
+memory before and after. Imports are attributed to the run whose context
+made them, so concurrent runs on the shared pilot loop don't see each
+other's modules. Thread and memory figures can only be measured for the
+whole process: when other runs were in flight at the same time the run is
+marked ``overlapped`` and reports neither.
+
+Modules imported from outside the Python installation (for example, a
+user's own helpers) are dropped from ``sys.modules`` once no tracked run is
+in flight, so a run never loses a module another run is still using.
+Modules of projects whose imports are kept warm between runs stay. When
+resident memory grows past the configured limit the server collects garbage
+and returns freed heap pages to the operating system.
+"""
+
+import contextvars
+import gc
+import os
+import sys
+import sysconfig
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+MB = 1024 * 1024
+
+
+@dataclass
+class MemoryLimits:
+    """Thresholds that trigger cleanup for in-process runs."""
+
+    max_rss_growth_mb: float = 256.0
+    max_leaked_threads: int = 8
+    cleanup_modules: bool = True
+    max_jobs_per_worker: int = 100
+
+
+@dataclass
+class RunMemory:
+    """Memory accounting for a single pilot run.
+
+    ``new_modules`` are the modules the run imported and ``removed_modules``
+    those of them dropped from ``sys.modules``, which happens once no other
+    tracked run is in flight. ``rss_before`` and ``rss_after`` are readings of
+    the whole process. With ``overlapped`` set, other runs were in flight at
+    the same time, so ``rss_delta`` is None and ``leaked_threads`` is not
+    checked.
+    """
+
+    rss_before: int = 0
+    rss_after: int = 0
+    new_modules: list[str] = field(default_factory=list)
+    removed_modules: list[str] = field(default_factory=list)
+    leaked_threads: list[str] = field(default_factory=list)
+    overlapped: bool = False
+    recycled: bool = False
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def rss_delta(self) -> int | None:
+        """Change in resident memory over the run in bytes, if it ran alone."""
+        if self.overlapped:
+            return None
+        return self.rss_after - self.rss_before
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the accounting as plain data, including rss_delta."""
+        return {**asdict(self), "rss_delta": self.rss_delta}
+
+
+@dataclass
+class MemoryStatus:
+    """Memory state of the server process."""
+
+    rss: int = 0
+    baseline_rss: int = 0
+    recycle_rss: int = 0
+    runs: int = 0
+    recycles: int = 0
+    removed_modules: int = 0
+    live_threads: list[str] = field(default_factory=list)
+    limits: MemoryLimits = field(default_factory=MemoryLimits)
+
+
+def rss_bytes() -> int:
+    """Return the resident set size of this process in bytes.
+
+    Uses /proc on Linux. Elsewhere falls back to the peak resident size, which
+    never decreases, or 0 if that isn't available either.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _trusted_roots() -> tuple[str, ...]:
+    """Directories whose modules are part of the installation, not user code."""
+    paths = sysconfig.get_paths()
+    roots = {paths[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")}
+    roots.add(str(Path(__file__).resolve().parents[1]))
+    return tuple(os.path.join(os.path.realpath(root), "") for root in roots)
+
+
+_TRUSTED_ROOTS = _trusted_roots()
+
+
+def _is_user_file(path: str) -> bool:
+    """Check whether a source file lives outside the Python installation."""
+    return not os.path.realpath(path).startswith(_TRUSTED_ROOTS)
+
+
+def _is_user_module(name: str) -> bool:
+    """Check whether a module was loaded from outside the Python installation."""
+    module = sys.modules.get(name)
+    if module is None or name in sys.builtin_module_names:
+        return False
+    path = getattr(module, "__file__", None)
+    if path is None:
+        # Namespace packages have a search path but no file.
+        return getattr(module, "__path__", None) is None
+    return _is_user_file(path)
+
+
+@dataclass(eq=False)
+class _TrackedRun:
+    """A run in flight: its accounting and the modules it has imported."""
+
+    memory: RunMemory
+    threads_before: set[threading.Thread]
+    imported: set[str] = field(default_factory=set)
+
+
+_current_run: contextvars.ContextVar[_TrackedRun | None] = contextvars.ContextVar(
+    "tui_builder_tracked_run", default=None
+)
+
+
+class _ImportRecorder:
+    """Notes each import for the run in whose context it happens.
+
+    It sits first on sys.meta_path and never finds anything itself, leaving
+    that to the finders after it.
+    """
+
+    def find_spec(self, name: str, path: Any = None, target: Any = None) -> None:
+        run = _current_run.get()
+        if run is not None:
+            run.imported.add(name)
+        return None
+
+
+_import_recorder = _ImportRecorder()
+_recorder_users = 0
+_recorder_lock = threading.Lock()
+
+
+def _start_recording_imports() -> None:
+    """Put the import recorder first on sys.meta_path while runs need it."""
+    global _recorder_users
+    with _recorder_lock:
+        _recorder_users += 1
+        if _import_recorder not in sys.meta_path:
+            sys.meta_path.insert(0, _import_recorder)
+
+
+def _stop_recording_imports() -> None:
+    """Remove the import recorder once the last run using it has finished."""
+    global _recorder_users
+    with _recorder_lock:
+        _recorder_users -= 1
+        if not _recorder_users and _import_recorder in sys.meta_path:
+            sys.meta_path.remove(_import_recorder)
+
+
+def _trim_heap() -> None:
+    """Return free heap pages to the operating system where glibc allows it."""
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        import ctypes
+
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryMonitor:
+    """Tracks memory across runs and recycles when limits are crossed."""
+
+    def __init__(self, limits: MemoryLimits | None = None) -> None:
+        self.limits = limits or MemoryLimits()
+        self.baseline_rss = rss_bytes()
+        self.recycle_rss = self._next_recycle_rss(self.baseline_rss)
+        self.runs = 0
+        self.recycles = 0
+        self.removed_modules = 0
+        self._kept_roots: tuple[str, ...] = ()
+        self._active: set[_TrackedRun] = set()
+        self._pending_removal: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _next_recycle_rss(self, rss: int) -> int:
+        return rss + int(self.limits.max_rss_growth_mb * MB)
+
+    def configure(self, **limits: Any) -> None:
+        """Update limits; None values keep the current setting."""
+        for name, value in limits.items():
+            if value is not None:
+                setattr(self.limits, name, value)
+        self.recycle_rss = self._next_recycle_rss(self.baseline_rss)
+
+    def keep_modules(self, root: str | Path) -> None:
+        """Never drop modules loaded from files under `root` after a run."""
+        prefix = os.path.join(os.path.realpath(root), "")
+        with self._lock:
+            if prefix not in self._kept_roots:
+                self._kept_roots += (prefix,)
+
+    def _is_kept(self, name: str) -> bool:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        return bool(path) and os.path.realpath(path).startswith(self._kept_roots)
+
+    @contextmanager
+    def track(self) -> Iterator[RunMemory]:
+        """Account for the memory used by the code run inside the block."""
+        run = _TrackedRun(RunMemory(rss_before=rss_bytes()), set(threading.enumerate()))
+        with self._lock:
+            if self._active:
+                run.memory.overlapped = True
+                for other in self._active:
+                    other.memory.overlapped = True
+            self._active.add(run)
+        _start_recording_imports()
+        token = _current_run.set(run)
+        try:
+            yield run.memory
+        finally:
+            _current_run.reset(token)
+            _stop_recording_imports()
+            self._finish(run)
+
+    def _finish(self, run: _TrackedRun) -> None:
+        memory = run.memory
+        memory.new_modules = sorted(
+            name for name in run.imported if name in sys.modules
+        )
+        if self.limits.cleanup_modules:
+            memory.removed_modules = [
+                name
+                for name in memory.new_modules
+                if _is_user_module(name) and not self._is_kept(name)
+            ]
+
+        if not memory.overlapped:
+            memory.leaked_threads = sorted(
+                thread.name
+                for thread in threading.enumerate()
+                if thread not in run.threads_before and thread.is_alive()
+            )
+        if len(memory.leaked_threads) > self.limits.max_leaked_threads:
+            memory.warnings.append(
+                f"{len(memory.leaked_threads)} threads outlived the run "
+                f"(limit {self.limits.max_leaked_threads})"
+            )
+
+        memory.rss_after = rss_bytes()
+        with self._lock:
+            self._active.discard(run)
+            self.runs += 1
+            self._pending_removal.update(memory.removed_modules)
+            if self._active:
+                return
+            # No run can be using these modules any more.
+            for name in self._pending_removal:
+                if sys.modules.pop(name, None) is not None:
+                    self.removed_modules += 1
+            self._pending_removal.clear()
+            if memory.rss_after > self.recycle_rss:
+                memory.rss_after = self._recycle()
+                memory.recycled = True
+
+    def _recycle(self) -> int:
+        """Free what can be freed and move the recycle threshold if needed."""
+        gc.collect()
+        _trim_heap()
+        rss = rss_bytes()
+        self.recycles += 1
+        # Memory that survives a full collection is held by live objects.
+        # Re-arm above it so every later run doesn't pay for a collection.
+        self.recycle_rss = max(
+            self._next_recycle_rss(self.baseline_rss), self._next_recycle_rss(rss)
+        )
+        return rss
+
+    def status(self) -> MemoryStatus:
+        """Return the current memory state."""
+        return MemoryStatus(
+            rss=rss_bytes(),
+            baseline_rss=self.baseline_rss,
+            recycle_rss=self.recycle_rss,
+            runs=self.runs,
+            recycles=self.recycles,
+            removed_modules=self.removed_modules,
+            live_threads=sorted(thread.name for thread in threading.enumerate()),
+            limits=MemoryLimits(**asdict(self.limits)),
+        )
+
+
+memory_monitor = MemoryMonitor()
+
+
+def get_memory_status() -> MemoryStatus:
+    """Report the server's memory use and cleanup activity.
+
+    Returns:
+        MemoryStatus with resident memory, the recycle threshold, counters for
+        runs, recycles and removed modules, and the live threads.
+    """
+    return memory_monitor.status()
+
+
+def configure_memory_limits(
+    max_rss_growth_mb: float | None = None,
+    max_leaked_threads: int | None = None,
+    cleanup_modules: bool | None = None,
+    max_jobs_per_worker: int | None = None,
+) -> MemoryStatus:
+    """Change the thresholds used to keep the server's memory flat.
+
+    Args:
+        max_rss_growth_mb: Growth over the startup RSS that triggers a
+            garbage collection and heap trim after a run.
+        max_leaked_threads: Number of threads a run may leave running before
+            a warning is reported.
+        cleanup_modules: Drop modules imported from outside the Python
+            installation from sys.modules after each run.
+        max_jobs_per_worker: Jobs an isolated worker process runs before it
+            is replaced. Applies to worker pools created after the change.
+
+    Returns:
+        MemoryStatus with the updated limits.
+    """
+    memory_monitor.configure(
+        max_rss_growth_mb=max_rss_growth_mb,
+        max_leaked_threads=max_leaked_threads,
+        cleanup_modules=cleanup_modules,
+        max_jobs_per_worker=max_jobs_per_worker,
+    )
+    return memory_monitor.status()
+
+
+def register_memory_tools(mcp: FastMCP) -> None:
+    """Register memory tools."""
+    mcp.tool()(get_memory_status)
+    mcp.tool()(configure_memory_limits)
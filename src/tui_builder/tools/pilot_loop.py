@@ -0,0 +1,99 @@
+"""Shared event loop for headless pilot runs.
+
+Pilot runs spend most of their time awaiting message processing, so many of
+them can be interleaved on a single event loop. The loop runs in a daemon
+thread and every run is started in a fresh context, so Textual's active-app
+context variables never leak between apps.
+"""
+
+import asyncio
+import contextvars
+import threading
+from collections.abc import Awaitable, Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PILOT_CONCURRENCY = 8
+
+
+class PilotLoop:
+    """A background event loop that runs pilot coroutines concurrently."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_PILOT_CONCURRENCY) -> None:
+        self._max_concurrency = max_concurrency
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_concurrency(self) -> int:
+        """The number of pilot runs allowed to run at once."""
+        return self._max_concurrency
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Change the concurrency limit for runs started from now on.
+
+        Args:
+            max_concurrency: Maximum number of concurrent pilot runs.
+
+        Raises:
+            ValueError: If max_concurrency is less than 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        with self._lock:
+            self._max_concurrency = max_concurrency
+            self._semaphore = None
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the shared loop and block until it finishes.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            The coroutine's result.
+
+        Raises:
+            RuntimeError: If called from the pilot loop thread itself.
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Cannot block on the pilot loop from inside it")
+        return asyncio.run_coroutine_threadsafe(self._isolated(coro), loop).result()
+
+    async def limited(self, awaitable: Awaitable[T]) -> T:
+        """Await something while holding one of the concurrency slots."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            return await awaitable
+
+    @staticmethod
+    def isolate(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+        """Start a coroutine as a task with an empty context."""
+        return asyncio.get_running_loop().create_task(
+            coro, context=contextvars.Context()
+        )
+
+    async def _isolated(self, coro: Coroutine[Any, Any, T]) -> T:
+        return await self.isolate(coro)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="pilot-loop", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+                self._semaphore = None
+            return self._loop
+
+
+pilot_loop = PilotLoop()
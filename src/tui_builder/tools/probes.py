@@ -0,0 +1,1376 @@
+"""Opt-in instrumentation for pilot runs.
+
+Pilot tools with an ``instrument`` option attach the probes it names to
+their run. Each probe's findings are returned in the result's metrics under
+the probe's name, along with any spans the app recorded with
+``tui_builder.spans``, which every run collects. The probes are:
+
+- ``frames``: the layout and compositing cost of every frame.
+- ``gc``: garbage collections and their pauses.
+- ``resize``: terminal resizes received and applied, with their cost.
+- ``loop``: event loop callbacks that block the app, with stacks.
+- ``refresh``: refreshes and repaints per widget and action.
+- ``messages``: message traffic and handler times per node.
+- ``workers``: the lifecycle and queue times of workers.
+- ``styles``: style recalculation and layout time per action.
+
+Hooks into Textual and the interpreter are installed the first time a probe
+needs them and then stay, costing a context variable lookup when no run is
+active. The exception is the loop probe's hook, which wraps every event
+loop callback in the process: it is removed again once no run needs it. A
+hook passes what it sees to the run that is active in
+the current context, which hands it to those of its probes with a method
+named after the event. Concurrent runs on the shared pilot loop are
+therefore measured separately, and runs without probes skip all recording
+apart from the spans.
+"""
+
+import asyncio
+import contextvars
+import gc
+import inspect
+import sys
+import threading
+import traceback
+import weakref
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, ClassVar
+
+from tui_builder import spans
+from tui_builder.tools.memory import _is_user_file
+
+MAX_RECORDED_EVENTS = 1000
+BLOCK_THRESHOLD = 0.05
+HEARTBEAT_INTERVAL = 0.01
+MAX_STACK_DEPTH = 30
+REPAINT_THRESHOLD = 10
+REFRESH_THRESHOLD = 50
+MAX_REPORTED_WIDGETS = 20
+SLOW_HANDLER_THRESHOLD = 1 / 60
+FLOOD_QUEUE_DEPTH = 50
+MAX_TIMED_MESSAGES = 10000
+MAX_REPORTED_RULES = 20
+
+_active_run: contextvars.ContextVar["ProbeRun | None"] = contextvars.ContextVar(
+    "tui_builder_probe_run", default=None
+)
+
+PROBES: dict[str, type["Probe"]] = {}
+
+
+def register_probe(probe_class: type["Probe"]) -> type["Probe"]:
+    """Class decorator that makes a probe available by its name."""
+    PROBES[probe_class.name] = probe_class
+    return probe_class
+
+
+def check_probe_names(names: list[str] | tuple[str, ...]) -> None:
+    """Raise ValueError if any of the names is not a registered probe."""
+    unknown = [name for name in names if name not in PROBES]
+    if unknown:
+        raise ValueError(
+            f"Unknown probe(s) {', '.join(unknown)}; "
+            f"available: {', '.join(sorted(PROBES))}"
+        )
+
+
+def active_run() -> "ProbeRun | None":
+    """Return the probe run for the current context, if any."""
+    return _active_run.get()
+
+
+class Probe:
+    """Base class for instrumentation attached to a single run.
+
+    ``hooks`` names the hooks the probe needs installed. A probe receives
+    an event from them by defining a method named after it, such as
+    ``on_render``; other probes on the run don't need to know about it.
+    """
+
+    name: ClassVar[str] = ""
+    hooks: ClassVar[tuple[str, ...]] = ()
+
+    def __init__(self, run: "ProbeRun") -> None:
+        self.run = run
+
+    def start(self, app) -> None:
+        """Called once the app has been created, before it starts."""
+
+    def finish(self, app) -> None:
+        """Called after the last action, while the app is still running."""
+
+    def stop(self) -> None:
+        """Called after the app has exited."""
+
+    def on_frame(self, screen, elapsed: float) -> None:
+        """Called after a screen has rendered an update."""
+
+    def report(self) -> dict[str, Any]:
+        """Return the probe's findings as plain data."""
+        return {}
+
+
+class ProbeRun:
+    """The probes attached to one pilot run, plus where the run has got to."""
+
+    def __init__(self, names: list[str] | tuple[str, ...]) -> None:
+        check_probe_names(names)
+        self.action = "startup"
+        self.action_index = -1
+        self.frame = 0
+        self.painted = 0
+        self.rendered = 0
+        self.layout_time = 0.0
+        self._layout_started: float | None = None
+        self._frame_event: asyncio.Event | None = None
+        self.spans = spans.SpanRecorder(self.position)
+        self.probes = [PROBES[name](self) for name in dict.fromkeys(names)]
+        self._handlers: dict[str, list[Callable[..., Any]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.probes)
+
+    def probe(self, name: str) -> Probe:
+        """Return the attached probe called `name`.
+
+        Raises:
+            KeyError: If no probe of that name is attached.
+        """
+        for probe in self.probes:
+            if probe.name == name:
+                return probe
+        raise KeyError(name)
+
+    def handlers(self, event: str) -> list[Callable[..., Any]]:
+        """Return the methods named `event` of the probes that define one."""
+        handlers = self._handlers.get(event)
+        if handlers is None:
+            handlers = self._handlers[event] = [
+                getattr(probe, event) for probe in self.probes if hasattr(probe, event)
+            ]
+        return handlers
+
+    def dispatch(self, event: str, *args: Any) -> None:
+        """Pass an event seen by a hook to every probe that handles it."""
+        for handler in self.handlers(event):
+            handler(*args)
+
+    def position(self) -> dict[str, Any]:
+        """Describe the current point in the run for lining up events."""
+        return {"action": self.action, "frame": self.frame}
+
+    def mark(self, label: str) -> None:
+        """Record that the next action is starting."""
+        self.action_index += 1
+        self.action = f"{self.action_index}: {label}"
+
+    @contextmanager
+    def activate(self, app) -> Iterator["ProbeRun"]:
+        """Start the probes and make this run current for the block."""
+        hooks = {"spans"}
+        if self.probes:
+            hooks.add("frame")
+            hooks.update(hook for probe in self.probes for hook in probe.hooks)
+        with _hooks(hooks), spans.recording(self.spans):
+            if not self.probes:
+                yield self
+                return
+            token = _active_run.set(self)
+            for probe in self.probes:
+                probe.start(app)
+            try:
+                yield self
+            finally:
+                for probe in self.probes:
+                    probe.stop()
+                _active_run.reset(token)
+
+    def finish(self, app) -> None:
+        """Tell the probes the scripted part of the run is over."""
+        for probe in self.probes:
+            probe.finish(app)
+
+    def frame_rendered(self, screen, elapsed: float) -> None:
+        self.frame += 1
+        for probe in self.probes:
+            probe.on_frame(screen, elapsed)
+        if self._frame_event is not None:
+            self._frame_event.set()
+
+    async def wait_for_frame(self, frame: int, timeout: float) -> bool:
+        """Wait until a frame after `frame` has rendered.
+
+        Returns:
+            False if no frame rendered within the timeout.
+        """
+        if self._frame_event is None:
+            self._frame_event = asyncio.Event()
+        deadline = perf_counter() + timeout
+        while self.frame <= frame:
+            self._frame_event.clear()
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._frame_event.wait(), remaining)
+            except TimeoutError:
+                return False
+        return True
+
+    def report(self) -> dict[str, Any]:
+        """Collect every probe's report, keyed by probe name.
+
+        The app's spans are added under "spans" if it recorded any.
+        """
+        report = {probe.name: probe.report() for probe in self.probes}
+        if self.spans:
+            report["spans"] = self.spans.report()
+        return report
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _NodeLabels:
+    """Readable, stable labels for the DOM nodes seen during a run.
+
+    Nodes with an ID are labelled by class and ID; others are numbered per
+    class in the order they are first seen.
+    """
+
+    def __init__(self) -> None:
+        self._labels: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._instances: dict[str, int] = {}
+
+    def __call__(self, node) -> str:
+        label = self._labels.get(node)
+        if label is None:
+            name = type(node).__name__
+            if getattr(node, "id", None):
+                label = f"{name}#{node.id}"
+            else:
+                index = self._instances[name] = self._instances.get(name, 0) + 1
+                label = f"{name}[{index}]"
+            self._labels[node] = label
+        return label
+
+
+def action_label(action: tuple[str, ...]) -> str:
+    """Summarise a pilot action for reports."""
+    kind, *args = action
+    if kind == "keys":
+        return f"keys x{len(args)}"
+    if kind == "type":
+        text = args[0]
+        return f"type {text[:20]!r}" + ("..." if len(text) > 20 else "")
+    return " ".join([kind, *args])
+
+
+_installed_hooks: dict[str, Callable[[], None] | None] = {}
+_hook_users: dict[str, int] = {}
+_hooks_lock = threading.Lock()
+
+
+@contextmanager
+def _hooks(names: set[str]) -> Iterator[None]:
+    """Make sure the named hooks are installed while the block runs.
+
+    An installer that returns a function is removed with it once the last
+    block using the hook has finished; other hooks stay installed.
+    """
+    with _hooks_lock:
+        for name in names:
+            if name not in _installed_hooks:
+                _installed_hooks[name] = _HOOK_INSTALLERS[name]()
+            _hook_users[name] = _hook_users.get(name, 0) + 1
+    try:
+        yield
+    finally:
+        with _hooks_lock:
+            for name in names:
+                _hook_users[name] -= 1
+                remove = _installed_hooks[name]
+                if not _hook_users[name] and remove is not None:
+                    remove()
+                    del _installed_hooks[name]
+
+
+def _install_frame_hook() -> None:
+    """Count frames by wrapping the screen's compositor refresh."""
+    from textual.screen import Screen
+
+    original = Screen._compositor_refresh
+
+    def _compositor_refresh(self) -> None:
+        run = _active_run.get()
+        if run is None:
+            return original(self)
+        start = perf_counter()
+        if run._layout_started is not None:
+            # Layouts end with a frame; only the time before it is layout.
+            run.layout_time += start - run._layout_started
+            run._layout_started = None
+        original(self)
+        run.frame_rendered(self, perf_counter() - start)
+
+    Screen._compositor_refresh = _compositor_refresh
+
+
+def _install_layout_hook() -> None:
+    """Time screen layouts, which run just before the frame they affect."""
+    from textual.screen import Screen
+
+    original = Screen._refresh_layout
+
+    def _refresh_layout(self, size=None, scroll: bool = False) -> None:
+        run = _active_run.get()
+        if run is None:
+            return original(self, size, scroll)
+        run.dispatch("on_layout")
+        run._layout_started = perf_counter()
+        try:
+            original(self, size, scroll)
+        finally:
+            if run._layout_started is not None:
+                run.layout_time += perf_counter() - run._layout_started
+                run._layout_started = None
+
+    Screen._refresh_layout = _refresh_layout
+
+
+def _install_paint_hook() -> None:
+    """Count the widgets the compositor paints into each frame."""
+    from textual._compositor import Compositor
+
+    original = Compositor._get_renders
+
+    def _get_renders(self, crop=None):
+        run = _active_run.get()
+        for render in original(self, crop):
+            if run is not None:
+                run.painted += 1
+            yield render
+
+    Compositor._get_renders = _get_renders
+
+
+def _draws_lines(cache, widget, crop) -> bool:
+    """Check whether a widget's styles cache has lines in `crop` to draw again."""
+    if widget.region.width != cache._width:
+        # A change of width clears the whole cache.
+        return True
+    return any(cache.is_dirty(y) or y not in cache._cache for y in crop.line_range)
+
+
+def _install_render_hook() -> None:
+    """Count widgets that draw any of their visible lines again.
+
+    Every widget renders through its styles cache, so this counts widgets
+    that draw line by line (such as DataTable) as well as those that render
+    their whole content at once.
+    """
+    from textual._styles_cache import StylesCache
+
+    original = StylesCache.render_widget
+
+    def render_widget(self, widget, crop):
+        run = _active_run.get()
+        if run is not None and _draws_lines(self, widget, crop):
+            run.rendered += 1
+            run.dispatch("on_render", widget)
+        return original(self, widget, crop)
+
+    StylesCache.render_widget = render_widget
+
+
+def _install_refresh_hook() -> None:
+    """Count the refreshes widgets request."""
+    from textual.widget import Widget
+
+    original = Widget.refresh
+
+    def refresh(self, *regions, repaint=True, layout=False, recompose=False):
+        run = _active_run.get()
+        if run is not None:
+            run.dispatch("on_refresh", self, layout, recompose)
+        return original(
+            self, *regions, repaint=repaint, layout=layout, recompose=recompose
+        )
+
+    Widget.refresh = refresh
+
+
+def _install_resize_hook() -> None:
+    """Forward resizes seen by the app and applied by screens to resize probes."""
+    from textual.app import App
+    from textual.screen import Screen
+
+    app_on_resize = App._on_resize
+    screen_on_resize = Screen._on_resize
+
+    async def _app_on_resize(self, event) -> None:
+        run = _active_run.get()
+        if run is not None:
+            run.dispatch("on_resize_received", event)
+        await app_on_resize(self, event)
+
+    async def _screen_on_resize(self, event) -> None:
+        run = _active_run.get()
+        if run is None or not self.is_current:
+            return await screen_on_resize(self, event)
+        run.dispatch("on_resize_started", event)
+        try:
+            await screen_on_resize(self, event)
+        finally:
+            run.dispatch("on_resize_finished", event)
+
+    App._on_resize = _app_on_resize
+    Screen._on_resize = _screen_on_resize
+
+
+def _install_callback_hook() -> Callable[[], None]:
+    """Time event loop callbacks that run in a context with a loop probe.
+
+    Returns:
+        A function that puts back the original callback runner.
+    """
+    from asyncio.events import Handle
+
+    original = Handle._run
+
+    def _run(self) -> None:
+        run = self._context.get(_active_run)
+        if run is None or not run.handlers("callback_finished"):
+            return original(self)
+        run.dispatch("callback_started", self)
+        try:
+            original(self)
+        finally:
+            run.dispatch("callback_finished")
+
+    def remove() -> None:
+        Handle._run = original
+
+    Handle._run = _run
+    return remove
+
+
+def _install_message_hook() -> None:
+    """Count posted messages and time their handlers."""
+    from textual.message_pump import MessagePump
+
+    post_message = MessagePump.post_message
+    dispatch_message = MessagePump._dispatch_message
+
+    def _post_message(self, message) -> bool:
+        posted = post_message(self, message)
+        run = _active_run.get()
+        if posted and run is not None:
+            run.dispatch("on_post", self, message)
+        return posted
+
+    async def _dispatch_message(self, message) -> None:
+        run = _active_run.get()
+        if run is None or message.no_dispatch or not run.handlers("on_handled"):
+            return await dispatch_message(self, message)
+        start = perf_counter()
+        try:
+            await dispatch_message(self, message)
+        finally:
+            run.dispatch("on_handled", self, message, perf_counter() - start)
+
+    MessagePump.post_message = _post_message
+    MessagePump._dispatch_message = _dispatch_message
+
+
+def _observed_work(work, observe):
+    """Wrap a thread worker's work to run inside `observe()` on its thread.
+
+    The wrapper keeps the kind of work (coroutine function, awaitable or
+    plain callable), which decides how Textual runs it.
+    """
+    if inspect.iscoroutinefunction(work) or (
+        hasattr(work, "func") and inspect.iscoroutinefunction(work.func)
+    ):
+
+        async def observed_coroutine():
+            with observe():
+                return await work()
+
+        return observed_coroutine
+    if inspect.isawaitable(work):
+
+        async def observed_awaitable():
+            with observe():
+                return await work
+
+        return observed_awaitable()
+    if callable(work):
+
+        def observed_callable():
+            with observe():
+                return work()
+
+        return observed_callable
+    return work
+
+
+def _install_worker_hook() -> None:
+    """Follow worker state changes and when thread workers get a thread."""
+    from textual.worker import Worker
+
+    state = Worker.state
+    run_threaded = Worker._run_threaded
+
+    def set_state(self, value) -> None:
+        run = _active_run.get()
+        if run is not None:
+            run.dispatch("on_state", self, value)
+        state.fset(self, value)
+
+    async def _run_threaded(self):
+        run = _active_run.get()
+        if run is not None and run.handlers("on_thread_started"):
+
+            @contextmanager
+            def started():
+                run.dispatch("on_thread_started", self)
+                yield
+
+            self._work = _observed_work(self._work, started)
+        return await run_threaded(self)
+
+    Worker.state = state.setter(set_state)
+    Worker._run_threaded = _run_threaded
+
+
+def _install_style_hook() -> None:
+    """Time stylesheet application per node and rule matching per rule set."""
+    from textual.css.stylesheet import Stylesheet
+
+    apply = Stylesheet.apply
+    check_rule = Stylesheet._check_rule.__func__
+
+    def _apply(self, node, *, animate: bool = False, cache=None) -> None:
+        run = _active_run.get()
+        if run is None or not run.handlers("apply_finished"):
+            return apply(self, node, animate=animate, cache=cache)
+        run.dispatch("apply_started")
+        start = perf_counter()
+        try:
+            apply(self, node, animate=animate, cache=cache)
+        finally:
+            run.dispatch("apply_finished", node, perf_counter() - start)
+
+    def _check_rule(cls, rule_set, css_path_nodes):
+        run = _active_run.get()
+        if run is None or not run.handlers("on_rule"):
+            yield from check_rule(cls, rule_set, css_path_nodes)
+            return
+        start = perf_counter()
+        matched = list(check_rule(cls, rule_set, css_path_nodes))
+        run.dispatch("on_rule", rule_set, len(matched), perf_counter() - start)
+        yield from matched
+
+    Stylesheet.apply = _apply
+    Stylesheet._check_rule = classmethod(_check_rule)
+
+
+def _install_arrange_hook() -> None:
+    """Time the arrangements containers compute when their layout changes."""
+    import textual.screen
+    import textual.widget
+
+    for module in (textual.widget, textual.screen):
+        original = module.arrange
+
+        def arrange(widget, *args, _original=original, **kwargs):
+            run = _active_run.get()
+            if run is None or not run.handlers("arrange_finished"):
+                return _original(widget, *args, **kwargs)
+            run.dispatch("arrange_started")
+            start = perf_counter()
+            try:
+                return _original(widget, *args, **kwargs)
+            finally:
+                run.dispatch("arrange_finished", widget, perf_counter() - start)
+
+        module.arrange = arrange
+
+
+def _install_span_hook() -> None:
+    """Carry the span recorder over to the threads thread workers run on.
+
+    Executor threads don't inherit the context of the code that started
+    them, so without this spans in thread workers would go unrecorded.
+    """
+    from textual.worker import Worker
+
+    run_threaded = Worker._run_threaded
+
+    async def _run_threaded(self):
+        recorder = spans._recorder.get()
+        if recorder is not None:
+            self._work = _observed_work(self._work, lambda: spans.recording(recorder))
+        return await run_threaded(self)
+
+    Worker._run_threaded = _run_threaded
+
+
+def _install_gc_hook() -> None:
+    """Forward garbage collector callbacks to the active run's GC probe."""
+
+    def on_gc(phase: str, info: dict[str, int]) -> None:
+        run = _active_run.get()
+        if run is not None:
+            run.dispatch("on_gc", phase, info)
+
+    gc.callbacks.append(on_gc)
+
+
+_HOOK_INSTALLERS: dict[str, Callable[[], Callable[[], None] | None]] = {
+    "frame": _install_frame_hook,
+    "layout": _install_layout_hook,
+    "paint": _install_paint_hook,
+    "render": _install_render_hook,
+    "refresh": _install_refresh_hook,
+    "resize": _install_resize_hook,
+    "callbacks": _install_callback_hook,
+    "messages": _install_message_hook,
+    "workers": _install_worker_hook,
+    "styles": _install_style_hook,
+    "arrange": _install_arrange_hook,
+    "spans": _install_span_hook,
+    "gc": _install_gc_hook,
+}
+
+
+@register_probe
+class FramesProbe(Probe):
+    """Records the cost of every frame.
+
+    Each frame lists the time spent in layout since the previous frame, the
+    time to composite the update, how many widgets were painted into it and
+    how many of those had to render their content again.
+    """
+
+    name = "frames"
+    hooks = ("layout", "paint", "render")
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.frames: list[dict[str, Any]] = []
+        self.count = 0
+        self.paint_time = 0.0
+        self.layout_time = 0.0
+        self.longest = 0.0
+        self._last = (0, 0, 0.0)
+
+    def on_frame(self, screen, elapsed: float) -> None:
+        painted, rendered, layout_time = self._last
+        self._last = (self.run.painted, self.run.rendered, self.run.layout_time)
+        layout = self.run.layout_time - layout_time
+        self.count += 1
+        self.paint_time += elapsed
+        self.layout_time += layout
+        self.longest = max(self.longest, elapsed + layout)
+        if len(self.frames) < MAX_RECORDED_EVENTS:
+            self.frames.append(
+                {
+                    **self.run.position(),
+                    "layout_ms": layout * 1000,
+                    "paint_ms": elapsed * 1000,
+                    "painted": self.run.painted - painted,
+                    "rendered": self.run.rendered - rendered,
+                }
+            )
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "paint_ms": self.paint_time * 1000,
+            "layout_ms": self.layout_time * 1000,
+            "max_frame_ms": self.longest * 1000,
+            "frames": self.frames,
+        }
+
+
+@register_probe
+class GCProbe(Probe):
+    """Counts garbage collections and times their pauses.
+
+    The collector is process-wide, so a collection is charged to whichever
+    run was executing when it started, even if other concurrent runs made
+    the garbage.
+    """
+
+    name = "gc"
+    hooks = ("gc",)
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.collections = [0, 0, 0]
+        self.total = [0.0, 0.0, 0.0]
+        self.longest = [0.0, 0.0, 0.0]
+        self.collected = 0
+        self.by_action: dict[str, dict[str, Any]] = {}
+        self.pauses: list[dict[str, Any]] = []
+        self._started: float | None = None
+
+    def on_gc(self, phase: str, info: dict[str, int]) -> None:
+        if phase == "start":
+            self._started = perf_counter()
+            return
+        if self._started is None:
+            return
+        elapsed = perf_counter() - self._started
+        self._started = None
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.total[generation] += elapsed
+        self.longest[generation] = max(self.longest[generation], elapsed)
+        self.collected += info.get("collected", 0)
+        action = self.by_action.setdefault(
+            self.run.action, {"collections": 0, "pause_ms": 0.0}
+        )
+        action["collections"] += 1
+        action["pause_ms"] += elapsed * 1000
+        if len(self.pauses) < MAX_RECORDED_EVENTS:
+            self.pauses.append(
+                {
+                    "generation": generation,
+                    "ms": elapsed * 1000,
+                    "collected": info.get("collected", 0),
+                    **self.run.position(),
+                }
+            )
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "collections": sum(self.collections),
+            "pause_ms": sum(self.total) * 1000,
+            "collected": self.collected,
+            "by_generation": [
+                {
+                    "generation": generation,
+                    "collections": self.collections[generation],
+                    "total_ms": self.total[generation] * 1000,
+                    "max_ms": self.longest[generation] * 1000,
+                }
+                for generation in range(3)
+            ],
+            "by_action": self.by_action,
+            "pauses": self.pauses,
+        }
+
+
+@register_probe
+class ResizeProbe(Probe):
+    """Counts terminal resizes and times the ones the screen applies.
+
+    Textual merges resize events that queue up behind each other, so a burst
+    of resizes is applied fewer times than it is received. Each applied
+    resize records the time to lay the screen out again and to repaint it.
+    """
+
+    name = "resize"
+    hooks = ("resize", "layout", "paint")
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.received = 0
+        self.applied = 0
+        self.resizes: list[dict[str, Any]] = []
+        self._terminal_events: dict[int, Any] = {}
+        self._current: dict[str, Any] | None = None
+
+    def on_resize_received(self, event) -> None:
+        self.received += 1
+        self._terminal_events[id(event)] = event
+
+    def on_resize_started(self, event) -> None:
+        # Screens also get resize events from their own layout; only time
+        # the terminal resizes the app passes down.
+        if self._terminal_events.pop(id(event), None) is not event:
+            return
+        self._current = {
+            **self.run.position(),
+            "size": [event.size.width, event.size.height],
+            "relayout_ms": 0.0,
+            "repaint_ms": 0.0,
+            "painted": 0,
+            "_event": event,
+            "_start": perf_counter(),
+            "_painted": self.run.painted,
+        }
+
+    def on_frame(self, screen, elapsed: float) -> None:
+        if self._current is not None:
+            self._current["repaint_ms"] += elapsed * 1000
+
+    def on_resize_finished(self, event) -> None:
+        if self._current is None or self._current["_event"] is not event:
+            return
+        resize, self._current = self._current, None
+        del resize["_event"]
+        elapsed = (perf_counter() - resize.pop("_start")) * 1000
+        resize["relayout_ms"] = elapsed - resize["repaint_ms"]
+        resize["painted"] = self.run.painted - resize.pop("_painted")
+        self.applied += 1
+        if len(self.resizes) < MAX_RECORDED_EVENTS:
+            self.resizes.append(resize)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "relayout_ms": sum(resize["relayout_ms"] for resize in self.resizes),
+            "repaint_ms": sum(resize["repaint_ms"] for resize in self.resizes),
+            "resizes": self.resizes,
+        }
+
+
+def _describe_callback(handle) -> str:
+    """Name the task or function an event loop handle will run."""
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return f"task {getattr(coro, '__qualname__', repr(coro))}"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def _blocking_stack(frame) -> list[traceback.FrameSummary]:
+    """The frames of a blocking callback, below the event loop machinery."""
+    stack = traceback.extract_stack(frame)
+    for index, entry in enumerate(stack):
+        if entry.filename == asyncio.events.__file__ and entry.name == "_run":
+            stack = stack[index + 1 :]
+            break
+    return stack[-MAX_STACK_DEPTH:]
+
+
+@register_probe
+class LoopProbe(Probe):
+    """Finds event loop callbacks that block the app.
+
+    A heartbeat task measures how late the loop runs it, which is the lag
+    every other callback sees. Each callback the run schedules is timed,
+    and a watchdog thread samples the loop thread's stack while one runs
+    past the threshold, so a blocked interval is reported with the handler
+    that was executing and where it was stuck.
+    """
+
+    name = "loop"
+    hooks = ("callbacks",)
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.threshold = BLOCK_THRESHOLD
+        self.callbacks = 0
+        self.max_lag = 0.0
+        self.lagged_beats = 0
+        self.blocks: list[dict[str, Any]] = []
+        self.blocked = 0
+        self._current: dict[str, Any] | None = None
+        self._thread_id = 0
+        self._stopped = threading.Event()
+        self._heartbeat: asyncio.Task | None = None
+
+    def start(self, app) -> None:
+        self._thread_id = threading.get_ident()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+        threading.Thread(
+            target=self._watch, name="loop-probe-watchdog", daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+
+    async def _beat(self) -> None:
+        while True:
+            expected = perf_counter() + HEARTBEAT_INTERVAL
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lag = perf_counter() - expected
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.lagged_beats += 1
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 4):
+            current = self._current
+            if current is None or current["stack"] is not None:
+                continue
+            if perf_counter() - current["start"] < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None and self._current is current:
+                current["stack"] = _blocking_stack(frame)
+
+    def callback_started(self, handle) -> None:
+        self.callbacks += 1
+        self._current = {"handle": handle, "start": perf_counter(), "stack": None}
+
+    def callback_finished(self) -> None:
+        current, self._current = self._current, None
+        elapsed = perf_counter() - current["start"]
+        if elapsed <= self.threshold:
+            return
+        self.blocked += 1
+        if len(self.blocks) >= MAX_RECORDED_EVENTS:
+            return
+        stack = current["stack"] or []
+        user_frames = [entry for entry in stack if _is_user_file(entry.filename)]
+        handler = (user_frames or stack or [None])[0]
+        self.blocks.append(
+            {
+                **self.run.position(),
+                "ms": elapsed * 1000,
+                "callback": _describe_callback(current["handle"]),
+                "handler": (
+                    f"{handler.filename}:{handler.lineno} in {handler.name}"
+                    if handler
+                    else None
+                ),
+                "stack": [
+                    f"{entry.filename}:{entry.lineno} in {entry.name}"
+                    for entry in stack
+                ],
+            }
+        )
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "callbacks": self.callbacks,
+            "max_lag_ms": self.max_lag * 1000,
+            "lagged_beats": self.lagged_beats,
+            "blocked": self.blocked,
+            "blocked_ms": sum(block["ms"] for block in self.blocks),
+            "blocks": self.blocks,
+        }
+
+
+@register_probe
+class RefreshProbe(Probe):
+    """Counts refreshes, layouts and repaints for each widget and action.
+
+    A refresh is a request to update a widget, which Textual coalesces; a
+    repaint is the widget's content actually being rendered again. Widgets
+    that repaint more than REPAINT_THRESHOLD times, or request more than
+    REFRESH_THRESHOLD refreshes, for a single action are flagged.
+    """
+
+    name = "refresh"
+    hooks = ("refresh", "render", "layout")
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.labels = _NodeLabels()
+        self.by_action: dict[str, dict[str, dict[str, int]]] = {}
+        self.layouts: dict[str, int] = {}
+
+    def _counts(self, widget) -> dict[str, int]:
+        widgets = self.by_action.setdefault(self.run.action, {})
+        label = self.labels(widget)
+        counts = widgets.get(label)
+        if counts is None:
+            counts = widgets[label] = {
+                "refreshes": 0,
+                "layout_requests": 0,
+                "recomposes": 0,
+                "repaints": 0,
+            }
+        return counts
+
+    def on_refresh(self, widget, layout: bool, recompose: bool) -> None:
+        counts = self._counts(widget)
+        counts["refreshes"] += 1
+        counts["layout_requests"] += layout
+        counts["recomposes"] += recompose
+
+    def on_render(self, widget) -> None:
+        self._counts(widget)["repaints"] += 1
+
+    def on_layout(self) -> None:
+        self.layouts[self.run.action] = self.layouts.get(self.run.action, 0) + 1
+
+    def report(self) -> dict[str, Any]:
+        actions = {}
+        flagged = []
+        for action, widgets in self.by_action.items():
+            ranked = sorted(
+                widgets.items(),
+                key=lambda item: (item[1]["repaints"], item[1]["refreshes"]),
+                reverse=True,
+            )
+            actions[action] = {
+                "layouts": self.layouts.get(action, 0),
+                "refreshes": sum(counts["refreshes"] for counts in widgets.values()),
+                "repaints": sum(counts["repaints"] for counts in widgets.values()),
+                "widgets": dict(ranked[:MAX_REPORTED_WIDGETS]),
+            }
+            flagged.extend(
+                {"action": action, "widget": label, **counts}
+                for label, counts in ranked
+                if counts["repaints"] > REPAINT_THRESHOLD
+                or counts["refreshes"] > REFRESH_THRESHOLD
+            )
+        return {
+            "repaint_threshold": REPAINT_THRESHOLD,
+            "refresh_threshold": REFRESH_THRESHOLD,
+            "by_action": actions,
+            "flagged": flagged,
+        }
+
+
+@register_probe
+class MessageProbe(Probe):
+    """Records message traffic and handler times for each node.
+
+    For every node the probe counts messages posted to it and handled by
+    it and the deepest its queue got. For every message type it keeps the
+    handler times, which include any time an async handler spends awaiting.
+    Handlers slower than a frame and queues deeper than FLOOD_QUEUE_DEPTH
+    are listed.
+    """
+
+    name = "messages"
+    hooks = ("messages",)
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.labels = _NodeLabels()
+        self.nodes: dict[str, dict[str, int]] = {}
+        self.times: dict[str, list[float]] = {}
+        self.slowest: dict[str, tuple[float, str]] = {}
+        self.by_action: dict[str, dict[str, int]] = {}
+        self.slow: list[dict[str, Any]] = []
+
+    def _node(self, node) -> dict[str, int]:
+        label = self.labels(node)
+        counts = self.nodes.get(label)
+        if counts is None:
+            counts = self.nodes[label] = {"posted": 0, "handled": 0, "max_queue": 0}
+        return counts
+
+    def _action(self) -> dict[str, int]:
+        counts = self.by_action.get(self.run.action)
+        if counts is None:
+            counts = self.by_action[self.run.action] = {
+                "posted": 0,
+                "handled": 0,
+                "max_queue": 0,
+                "slow": 0,
+            }
+        return counts
+
+    def on_post(self, node, message) -> None:
+        depth = node.message_queue_size
+        for counts in (self._node(node), self._action()):
+            counts["posted"] += 1
+            counts["max_queue"] = max(counts["max_queue"], depth)
+
+    def on_handled(self, node, message, elapsed: float) -> None:
+        label = self.labels(node)
+        self._node(node)["handled"] += 1
+        action = self._action()
+        action["handled"] += 1
+        kind = type(message).__qualname__
+        times = self.times.setdefault(kind, [])
+        if len(times) < MAX_TIMED_MESSAGES:
+            times.append(elapsed)
+        if elapsed > self.slowest.get(kind, (-1.0, ""))[0]:
+            self.slowest[kind] = (elapsed, label)
+        if elapsed > SLOW_HANDLER_THRESHOLD:
+            action["slow"] += 1
+            if len(self.slow) < MAX_RECORDED_EVENTS:
+                self.slow.append(
+                    {
+                        **self.run.position(),
+                        "node": label,
+                        "message": kind,
+                        "ms": elapsed * 1000,
+                    }
+                )
+
+    def report(self) -> dict[str, Any]:
+        by_message = {
+            kind: {
+                "handled": len(times),
+                "p50_ms": _percentile(times, 0.5) * 1000,
+                "p95_ms": _percentile(times, 0.95) * 1000,
+                "p99_ms": _percentile(times, 0.99) * 1000,
+                "max_ms": self.slowest[kind][0] * 1000,
+                "slowest_node": self.slowest[kind][1],
+            }
+            for kind, times in sorted(
+                self.times.items(), key=lambda item: -sum(item[1])
+            )
+        }
+        ranked = sorted(
+            self.nodes.items(),
+            key=lambda item: (item[1]["handled"], item[1]["posted"]),
+            reverse=True,
+        )
+        return {
+            "slow_threshold_ms": SLOW_HANDLER_THRESHOLD * 1000,
+            "flood_queue_depth": FLOOD_QUEUE_DEPTH,
+            "by_action": self.by_action,
+            "by_node": dict(ranked[:MAX_REPORTED_WIDGETS]),
+            "by_message": by_message,
+            "slow": self.slow,
+            "floods": [
+                {"node": label, **counts}
+                for label, counts in ranked
+                if counts["max_queue"] > FLOOD_QUEUE_DEPTH
+            ],
+        }
+
+
+@register_probe
+class WorkerProbe(Probe):
+    """Follows every worker started during a run.
+
+    Each worker's state changes are recorded with their time since the run
+    started. Queue time runs from creation until the work starts: for
+    thread workers that is when a thread from the loop's executor picks it
+    up, so threads starving each other show up as long queue times. Workers
+    still running after the last action are listed, as Textual cancels them
+    when the app exits.
+    """
+
+    name = "workers"
+    hooks = ("workers",)
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.labels = _NodeLabels()
+        self.started_at = perf_counter()
+        self.workers: dict[int, dict[str, Any]] = {}
+        self.running = 0
+        self.peak_running = 0
+        self.threads = 0
+        self.peak_threads = 0
+        self.unfinished: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return (perf_counter() - self.started_at) * 1000
+
+    def _record(self, worker) -> dict[str, Any]:
+        record = self.workers.get(id(worker))
+        if record is None:
+            record = self.workers[id(worker)] = {
+                "name": worker.name,
+                "group": worker.group,
+                "node": self.labels(worker.node),
+                "thread": worker._thread_worker,
+                "action": self.run.action,
+                "states": [],
+                "_created": self._now(),
+                "_started": None,
+                "_worker": worker,
+            }
+        return record
+
+    def on_state(self, worker, state) -> None:
+        with self._lock:
+            record = self._record(worker)
+            if record["states"] and record["states"][-1][0] == state.name:
+                return
+            now = self._now()
+            record["states"].append([state.name, now])
+            if state.name == "RUNNING":
+                self.running += 1
+                self.peak_running = max(self.peak_running, self.running)
+                if not record["thread"]:
+                    record["_started"] = now
+            elif len(record["states"]) > 1 and record["states"][-2][0] == "RUNNING":
+                self.running -= 1
+                if record["thread"] and record["_started"] is not None:
+                    self.threads -= 1
+
+    def on_thread_started(self, worker) -> None:
+        with self._lock:
+            record = self._record(worker)
+            record["_started"] = self._now()
+            self.threads += 1
+            self.peak_threads = max(self.peak_threads, self.threads)
+
+    def finish(self, app) -> None:
+        self.unfinished = [
+            self._summary(record)
+            for record in self.workers.values()
+            if not record["_worker"].is_finished
+        ][:MAX_RECORDED_EVENTS]
+
+    def _summary(self, record: dict[str, Any]) -> dict[str, Any]:
+        summary = {
+            key: value for key, value in record.items() if not key.startswith("_")
+        }
+        summary["states"] = [list(change) for change in record["states"]]
+        summary["state"] = record["_worker"].state.name
+        started = record["_started"]
+        finished = record["states"][-1][1] if record["_worker"].is_finished else None
+        # Work that never started queued until it was cancelled, or still is.
+        end = started if started is not None else finished or self._now()
+        summary["started"] = started is not None
+        summary["queued_ms"] = end - record["_created"]
+        summary["duration_ms"] = (
+            finished - started if finished is not None and started is not None else None
+        )
+        return summary
+
+    def report(self) -> dict[str, Any]:
+        summaries = [self._summary(record) for record in self.workers.values()]
+        return {
+            "workers_created": len(summaries),
+            "peak_running": self.peak_running,
+            "peak_threads": self.peak_threads,
+            "max_queued_ms": max(
+                (summary["queued_ms"] for summary in summaries), default=0.0
+            ),
+            "unfinished": self.unfinished,
+            "workers": summaries[:MAX_RECORDED_EVENTS],
+        }
+
+
+@register_probe
+class StylesProbe(Probe):
+    """Times style recalculation and layout for each action.
+
+    Restyle time is charged to the node being styled and to every ancestor,
+    so each subtree's figure covers all the nodes below it. Rule sets are
+    timed while they are matched against nodes and ranked by how often
+    they matched; nodes styled from a cached sibling match no rules at all.
+    Layout time is split by container, each charged only for arranging its
+    own children.
+    """
+
+    name = "styles"
+    hooks = ("styles", "arrange", "layout")
+
+    def __init__(self, run: ProbeRun) -> None:
+        super().__init__(run)
+        self.labels = _NodeLabels()
+        self.by_action: dict[str, dict[str, Any]] = {}
+        self._layout_time = 0.0
+        self._checks = 0
+        self._arrange_stack: list[float] = []
+
+    def _action(self) -> dict[str, Any]:
+        action = self.by_action.get(self.run.action)
+        if action is None:
+            action = self.by_action[self.run.action] = {
+                "restyle_ms": 0.0,
+                "restyled": 0,
+                "cached": 0,
+                "layout_ms": 0.0,
+                "arrange_ms": 0.0,
+                "subtrees": {},
+                "rules": {},
+                "containers": {},
+            }
+        return action
+
+    def apply_started(self) -> None:
+        self._checks = 0
+
+    def apply_finished(self, node, elapsed: float) -> None:
+        action = self._action()
+        action["restyle_ms"] += elapsed * 1000
+        action["restyled"] += 1
+        action["cached"] += not self._checks
+        subtrees = action["subtrees"]
+        for ancestor in node.ancestors_with_self:
+            label = self.labels(ancestor)
+            subtree = subtrees.get(label)
+            if subtree is None:
+                subtree = subtrees[label] = {"restyle_ms": 0.0, "nodes": 0}
+            subtree["restyle_ms"] += elapsed * 1000
+            subtree["nodes"] += 1
+
+    def on_rule(self, rule_set, matches: int, elapsed: float) -> None:
+        self._checks += 1
+        rules = self._action()["rules"]
+        key = (rule_set.selectors, rule_set.is_default_rules)
+        rule = rules.get(key)
+        if rule is None:
+            rule = rules[key] = {
+                "selector": rule_set.selectors,
+                "default_css": rule_set.is_default_rules,
+                "checks": 0,
+                "matches": 0,
+                "ms": 0.0,
+            }
+        rule["checks"] += 1
+        rule["matches"] += matches
+        rule["ms"] += elapsed * 1000
+
+    def arrange_started(self) -> None:
+        self._arrange_stack.append(0.0)
+
+    def arrange_finished(self, widget, elapsed: float) -> None:
+        nested = self._arrange_stack.pop()
+        if self._arrange_stack:
+            self._arrange_stack[-1] += elapsed
+        action = self._action()
+        action["arrange_ms"] += (elapsed - nested) * 1000
+        label = self.labels(widget)
+        container = action["containers"].get(label)
+        if container is None:
+            container = action["containers"][label] = {"arranges": 0, "ms": 0.0}
+        container["arranges"] += 1
+        container["ms"] += (elapsed - nested) * 1000
+
+    def on_frame(self, screen, elapsed: float) -> None:
+        self._charge_layout()
+
+    def _charge_layout(self) -> None:
+        if self.run.layout_time > self._layout_time:
+            self._action()["layout_ms"] += (
+                self.run.layout_time - self._layout_time
+            ) * 1000
+            self._layout_time = self.run.layout_time
+
+    def finish(self, app) -> None:
+        self._charge_layout()
+
+    def report(self) -> dict[str, Any]:
+        actions = {}
+        for label, action in self.by_action.items():
+            subtrees = sorted(
+                action["subtrees"].items(), key=lambda item: -item[1]["restyle_ms"]
+            )
+            rules = sorted(
+                action["rules"].values(),
+                key=lambda rule: (rule["matches"], rule["ms"]),
+                reverse=True,
+            )
+            containers = sorted(
+                action["containers"].items(), key=lambda item: -item[1]["ms"]
+            )
+            actions[label] = {
+                "restyle_ms": action["restyle_ms"],
+                "restyled": action["restyled"],
+                "cached": action["cached"],
+                "layout_ms": action["layout_ms"],
+                "arrange_ms": action["arrange_ms"],
+                "subtrees": dict(subtrees[:MAX_REPORTED_WIDGETS]),
+                "rules": rules[:MAX_REPORTED_RULES],
+                "containers": dict(containers[:MAX_REPORTED_WIDGETS]),
+            }
+        return {
+            "restyle_ms": sum(action["restyle_ms"] for action in actions.values()),
+            "layout_ms": sum(action["layout_ms"] for action in actions.values()),
+            "restyled": sum(action["restyled"] for action in actions.values()),
+            "by_action": actions,
+        }
@@ -0,0 +1,435 @@
+"""Pilot runs against apps in on-disk projects.
+
+A project is a directory on disk containing the app's packages, modules
+and ``.tcss`` files. The app is named by an import target such as
+``myapp.main:MainApp``. The project directory is never put on
+``sys.path``: while a project loads or runs, an import finder resolves
+top-level modules against its directory instead, for that run's context
+only. Modules are compiled from their source and no bytecode is read from
+or written to the project.
+
+Imports stay warm between runs. Before each run the files of the project's
+imported modules are checked, and only the modules whose source changed are
+reloaded, together with the project modules that import them, directly or
+through other modules, since they hold references to the old definitions. Stylesheets
+need no reload: Textual reads ``CSS_PATH`` files each time an app starts.
+
+Each project keeps its own modules. Loading a project swaps its modules
+into ``sys.modules`` in place of same-named modules of other projects, so
+two projects can both have, say, a ``myapp`` package. Projects that share
+module names should not run at the same time, since a run importing a
+module lazily could find the other project's.
+"""
+
+import ast
+import contextvars
+import hashlib
+import importlib
+import importlib.machinery
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.memory import memory_monitor
+from tui_builder.tools.testing import (
+    AppLoadError,
+    KeyScriptError,
+    SnapshotResult,
+    _run_app_async,
+    _run_sync,
+    parse_key_script,
+)
+
+
+@dataclass
+class ProjectLoad:
+    """How an App class was loaded from a project."""
+
+    app_class: type
+    reloaded: list[str] = field(default_factory=list)
+    imported: list[str] = field(default_factory=list)
+    load_ms: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the load as metrics."""
+        return {
+            "reloaded": self.reloaded,
+            "imported": self.imported,
+            "load_ms": self.load_ms,
+        }
+
+
+@dataclass
+class _ModuleFile:
+    """The state of a module's source file when it was imported."""
+
+    path: Path
+    stat: tuple[int, int]
+    digest: str
+    imports: set[str]
+
+
+def _file_stat(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_digest(path: Path) -> str | None:
+    try:
+        return _digest(path.read_bytes())
+    except OSError:
+        return None
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _imported_modules(source: str, name: str, is_package: bool) -> set[str]:
+    """Names of the modules a module's source imports from, found statically."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+    package = name if is_package else name.rpartition(".")[0]
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            try:
+                base = importlib.util.resolve_name(
+                    "." * node.level + (node.module or ""), package
+                )
+            except ImportError:
+                continue
+            # Imported names may be submodules as well as attributes.
+            imports.add(base)
+            imports.update(f"{base}.{alias.name}" for alias in node.names)
+    return imports
+
+
+class _SourceLoader(importlib.machinery.SourceFileLoader):
+    """Loads a module from its source, ignoring any bytecode cache.
+
+    Bytecode is checked against the source's mtime in whole seconds, which
+    misses quick successive edits. Without source stats the import system
+    neither reads nor writes the cache.
+    """
+
+    def path_stats(self, path: str) -> dict[str, Any]:
+        raise OSError("bytecode cache not used for project modules")
+
+
+_current_project: contextvars.ContextVar["Project | None"] = contextvars.ContextVar(
+    "tui_builder_project", default=None
+)
+
+
+class _ProjectFinder:
+    """Finds modules in the project of the current context.
+
+    Top-level modules are looked up in the project directory and submodules
+    in their package, and both are loaded from source. Outside a project's
+    context it finds nothing, leaving imports to the finders after it.
+    """
+
+    def find_spec(
+        self, name: str, path: Sequence[str] | None = None, target: Any = None
+    ) -> importlib.machinery.ModuleSpec | None:
+        project = _current_project.get()
+        if project is None:
+            return None
+        if path is not None and not any(map(project.owns, path)):
+            return None
+        search = [str(project.root)] if path is None else path
+        spec = importlib.machinery.PathFinder.find_spec(name, search)
+        if (
+            spec is not None
+            and isinstance(spec.loader, importlib.machinery.SourceFileLoader)
+            and project.owns(spec.origin)
+        ):
+            spec.loader = _SourceLoader(name, spec.origin)
+            spec.cached = None
+        return spec
+
+
+_project_finder = _ProjectFinder()
+_finder_users = 0
+_finder_lock = threading.Lock()
+# Loads swap modules in and out of sys.modules, so only one runs at a time.
+_load_lock = threading.Lock()
+
+
+class Project:
+    """A project directory whose modules stay imported between runs."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._prefix = os.path.join(str(root), "")
+        self.files: dict[str, _ModuleFile] = {}
+        self.modules: dict[str, ModuleType] = {}
+        memory_monitor.keep_modules(root)
+
+    def owns(self, filename: str | None) -> bool:
+        """Check whether a file lies in the project directory."""
+        return isinstance(filename, str) and os.path.abspath(filename).startswith(
+            self._prefix
+        )
+
+    @contextmanager
+    def activate(self) -> Iterator[None]:
+        """Resolve imports in the current context against this project."""
+        global _finder_users
+        with _finder_lock:
+            _finder_users += 1
+            if _project_finder not in sys.meta_path:
+                sys.meta_path.insert(0, _project_finder)
+        token = _current_project.set(self)
+        try:
+            yield
+        finally:
+            _current_project.reset(token)
+            with _finder_lock:
+                _finder_users -= 1
+                if not _finder_users and _project_finder in sys.meta_path:
+                    sys.meta_path.remove(_project_finder)
+
+    def _swap_in(self) -> None:
+        """Put this project's modules in sys.modules in place of other projects'."""
+        with _projects_lock:
+            others = [project for project in _projects.values() if project is not self]
+        for other in others:
+            for name, module in other.modules.items():
+                top = name.partition(".")[0]
+                if sys.modules.get(name) is module and (
+                    name in self.modules
+                    or importlib.machinery.PathFinder.find_spec(top, [str(self.root)])
+                ):
+                    del sys.modules[name]
+        sys.modules.update(self.modules)
+
+    def _module_path(self, module: ModuleType) -> Path | None:
+        """The module's source file, if it belongs to this project."""
+        # The project directory is searched already resolved, so the files
+        # of modules imported from it start with it as they are.
+        filename = getattr(module, "__file__", None)
+        return Path(os.path.abspath(filename)) if self.owns(filename) else None
+
+    def _project_modules(self) -> dict[str, ModuleType]:
+        return {
+            name: module
+            for name, module in list(sys.modules.items())
+            if isinstance(module, ModuleType) and self._module_path(module)
+        }
+
+    def _changed(self) -> set[str]:
+        """Names of imported project modules whose source changed or vanished."""
+        changed = set()
+        for name, record in list(self.files.items()):
+            if name not in sys.modules:
+                del self.files[name]
+                self.modules.pop(name, None)
+                continue
+            stat = _file_stat(record.path)
+            if stat == record.stat:
+                continue
+            digest = _file_digest(record.path)
+            if digest == record.digest:
+                record.stat = stat
+                continue
+            changed.add(name)
+        return changed
+
+    def _with_importers(self, changed: set[str]) -> set[str]:
+        """Add the project modules that import changed ones, transitively."""
+        stale = set(changed)
+        while True:
+            found = {
+                name
+                for name, record in self.files.items()
+                if name not in stale and not record.imports.isdisjoint(stale)
+            }
+            if not found:
+                return stale
+            stale |= found
+
+    def _record(self, modules: dict[str, ModuleType]) -> list[str]:
+        """Remember the files of newly imported modules, returning their names."""
+        imported = []
+        for name, module in modules.items():
+            if name in self.files:
+                continue
+            path = self._module_path(module)
+            stat = path and _file_stat(path)
+            if not path or not stat:
+                continue
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue
+            imports = _imported_modules(
+                data.decode(errors="replace"), name, hasattr(module, "__path__")
+            )
+            self.files[name] = _ModuleFile(path, stat, _digest(data), imports)
+            imported.append(name)
+        return sorted(imported)
+
+    def load(self, target: str) -> ProjectLoad:
+        """Import the App class named by `target`, reloading changed modules.
+
+        Raises:
+            AppLoadError: If the target can't be imported.
+        """
+        module_name, _, class_name = target.partition(":")
+        if not module_name:
+            raise AppLoadError(f"Invalid app target: '{target}'")
+        with _load_lock, self.activate():
+            start = perf_counter()
+            self._swap_in()
+
+            stale = self._with_importers(self._changed())
+            for name in stale:
+                sys.modules.pop(name, None)
+                self.files.pop(name, None)
+                self.modules.pop(name, None)
+            importlib.invalidate_caches()
+
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as e:
+                raise AppLoadError(f"Failed to import '{module_name}': {e}") from e
+            finally:
+                modules = self._project_modules()
+                self.modules.update(modules)
+                imported = self._record(modules)
+            if self._module_path(module) is None:
+                raise AppLoadError(
+                    f"'{module_name}' is already imported from outside the "
+                    f"project: {getattr(module, '__file__', None)}"
+                )
+            app_class = _target_app_class(module, class_name)
+            return ProjectLoad(
+                app_class=app_class,
+                reloaded=sorted(stale & set(imported)),
+                imported=sorted(set(imported) - stale),
+                load_ms=(perf_counter() - start) * 1000,
+            )
+
+
+def _target_app_class(module: ModuleType, class_name: str) -> type:
+    """The named App class, or the only one the module defines."""
+    from textual.app import App
+
+    if class_name:
+        app_class = getattr(module, class_name, None)
+        if not (inspect.isclass(app_class) and issubclass(app_class, App)):
+            raise AppLoadError(f"'{module.__name__}' has no App class '{class_name}'")
+        return app_class
+    candidates = [
+        value
+        for value in vars(module).values()
+        if inspect.isclass(value)
+        and issubclass(value, App)
+        and value.__module__ == module.__name__
+    ]
+    if len(candidates) != 1:
+        raise AppLoadError(
+            f"'{module.__name__}' defines {len(candidates)} App classes; "
+            "name one as module:Class"
+        )
+    return candidates[0]
+
+
+_projects: dict[Path, Project] = {}
+_projects_lock = threading.Lock()
+
+
+def get_project(path: str | Path) -> Project:
+    """Return the project for a directory, creating it on first use.
+
+    Raises:
+        AppLoadError: If the path is not a directory.
+    """
+    root = Path(path).expanduser().resolve()
+    if not root.is_dir():
+        raise AppLoadError(f"Not a directory: {path}")
+    with _projects_lock:
+        project = _projects.get(root)
+        if project is None:
+            project = _projects[root] = Project(root)
+    return project
+
+
+def run_project_pilot(
+    project: str,
+    target: str,
+    script: str = "",
+    instrument: list[str] | None = None,
+    width: int = 80,
+    height: int = 24,
+) -> SnapshotResult:
+    """Run an app from an on-disk project with Pilot.
+
+    The project's modules stay imported between calls; only modules whose
+    files changed since the last run, and the modules that reference them,
+    are reloaded. ``.tcss`` files are read fresh on every run.
+
+    Args:
+        project: Path of the project directory. The app's packages are
+            imported from it, ahead of anything on sys.path.
+        target: Import target of the app, "package.module:AppClass". The
+            class may be left out when the module defines a single App.
+        script: Key script to apply (see run_key_script).
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+
+    Returns:
+        SnapshotResult with the screen after the script. metrics["project"]
+        lists the modules reloaded and imported for the first time, and the
+        time loading took in milliseconds.
+    """
+    try:
+        actions = parse_key_script(script)
+    except KeyScriptError as e:
+        return SnapshotResult(success=False, error=f"Invalid key script: {e}")
+    try:
+        app_project = get_project(project)
+        load = app_project.load(target)
+    except AppLoadError as e:
+        return SnapshotResult(success=False, error=str(e))
+
+    async def run() -> SnapshotResult:
+        # Modules the app imports while it runs come from the project too.
+        with app_project.activate():
+            return await _run_app_async(
+                nullcontext(load.app_class), actions, (width, height), instrument
+            )
+
+    try:
+        result = _run_sync(run())
+    except Exception as e:
+        result = SnapshotResult(success=False, error=str(e))
+    result.metrics["project"] = load.as_dict()
+    return result
+
+
+def register_project_tools(mcp: FastMCP) -> None:
+    """Register on-disk project tools."""
+    mcp.tool()(run_project_pilot)
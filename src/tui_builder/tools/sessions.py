@@ -0,0 +1,431 @@
+"""Long-lived pilot sessions.
+
+A session keeps an app mounted on the shared pilot loop between tool calls,
+so follow-up operations (such as swapping in new CSS) skip the cost of
+loading and mounting the app again. The memory monitor tracks a session
+as one run lasting until it is closed.
+"""
+
+import asyncio
+import atexit
+import threading
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, TypeVar
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.memory import RunMemory, memory_monitor
+from tui_builder.tools.pilot_loop import pilot_loop
+from tui_builder.tools.probes import ProbeRun
+from tui_builder.tools.testing import _load_app_class, _screen_text
+from tui_builder.tools.workspaces import WorkspaceError, resolve_files
+
+T = TypeVar("T")
+
+MAX_SESSIONS = 16
+
+SETTLE_TIMEOUT = 30.0
+
+INJECTED_CSS_LOCATION = ("<injected>", "")
+
+
+@dataclass
+class SessionResult:
+    """Result of starting or closing a pilot session."""
+
+    success: bool = True
+    session_id: str = ""
+    output: str = ""
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class CssInjectionResult:
+    """Result of swapping CSS into a running session."""
+
+    success: bool = True
+    output: str = ""
+    nodes: int = 0
+    parse_ms: float = 0.0
+    restyle_ms: float = 0.0
+    layout_ms: float = 0.0
+    settle_ms: float = 0.0
+    total_ms: float = 0.0
+    metrics: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+class SessionError(Exception):
+    """Raised when a session cannot be started or used."""
+
+
+class PilotSession:
+    """An app kept mounted under Pilot until the session is closed.
+
+    All work for the session runs inside the task that owns the app, so it
+    sees the same Textual context variables as the app itself.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        size: tuple[int, int],
+        path: str | None = None,
+        files: dict[str, str] | None = None,
+    ) -> None:
+        self.session_id = uuid.uuid4().hex[:12]
+        self.code = code
+        self.path = path
+        self.files = files or {}
+        self.size = size
+        self.app: Any = None
+        self.pilot: Any = None
+        self.error: str | None = None
+        self.memory: RunMemory | None = None
+        self._requests: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Mount the app and wait until it is ready for requests."""
+        ready = asyncio.get_running_loop().create_future()
+        self._requests = asyncio.Queue()
+        self._task = pilot_loop.isolate(self._serve(ready))
+        await ready
+
+    async def _serve(self, ready: asyncio.Future) -> None:
+        try:
+            with (
+                memory_monitor.track() as self.memory,
+                _load_app_class(self.code, self.path, self.files) as app_class,
+            ):
+                app = app_class()
+                async with app.run_test(size=self.size) as pilot:
+                    self.app, self.pilot = app, pilot
+                    ready.set_result(None)
+                    await self._handle_requests()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                self.error = f"Session {self.session_id} crashed: {e}"
+        finally:
+            self._fail_pending()
+            _end_session(self)
+
+    async def _handle_requests(self) -> None:
+        """Serve requests until the session is closed or the app stops."""
+        app_task = self.app._task
+        while True:
+            next_request = asyncio.ensure_future(self._requests.get())
+            await asyncio.wait(
+                {next_request, app_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not next_request.done():
+                # The app exited or crashed; leaving run_test re-raises any
+                # exception that stopped it.
+                next_request.cancel()
+                self.error = f"Session {self.session_id} ended: the app exited"
+                return
+            request = next_request.result()
+            if request is None:
+                return
+            func, future = request
+            try:
+                future.set_result(await func(self))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _fail_pending(self) -> None:
+        while not self._requests.empty():
+            request = self._requests.get_nowait()
+            if request is not None and not request[1].done():
+                request[1].set_exception(SessionError("Session closed"))
+
+    async def call(self, func: Callable[["PilotSession"], Awaitable[T]]) -> T:
+        """Run `func(session)` inside the session's task and return its result."""
+        if self._task is None or self._task.done():
+            raise SessionError(f"Session {self.session_id} is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._requests.put((func, future))
+        return await future
+
+    async def close(self) -> None:
+        """Unmount the app and end the session."""
+        if self._task is not None and not self._task.done():
+            await self._requests.put(None)
+            await self._task
+
+
+_sessions: dict[str, PilotSession] = {}
+_ended: dict[str, str] = {}
+_sessions_lock = threading.Lock()
+
+
+def _end_session(session: PilotSession) -> None:
+    """Forget a session whose app stopped, keeping why for the next call."""
+    with _sessions_lock:
+        if _sessions.pop(session.session_id, None) is None or not session.error:
+            return
+        _ended[session.session_id] = session.error
+        while len(_ended) > MAX_SESSIONS:
+            del _ended[next(iter(_ended))]
+
+
+def _missing_session_error(session_id: str) -> str:
+    """Why a session can't be found: it ended, or never existed."""
+    with _sessions_lock:
+        error = _ended.pop(session_id, None)
+    return error or f"No session with ID '{session_id}'"
+
+
+def get_session(session_id: str) -> PilotSession:
+    """Look up a running session.
+
+    Raises:
+        SessionError: If there is no session with that ID, or it has ended.
+    """
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+    if session is None:
+        raise SessionError(_missing_session_error(session_id))
+    return session
+
+
+def run_in_session(session_id: str, func: Callable[[PilotSession], Awaitable[T]]) -> T:
+    """Run `func(session)` inside a running session and block for the result."""
+    session = get_session(session_id)
+    return pilot_loop.run(session.call(func))
+
+
+async def _session_output(session: PilotSession) -> str:
+    return _screen_text(session.app.screen)
+
+
+def start_pilot_session(code: str, width: int = 80, height: int = 24) -> SessionResult:
+    """Mount an app and keep it running for follow-up tool calls.
+
+    Args:
+        code: Python code containing a Textual App class.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+
+    Returns:
+        SessionResult with the session ID and the initial screen.
+    """
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return SessionResult(success=False, error=str(e))
+    except SyntaxError as e:
+        return SessionResult(success=False, error=f"Syntax error: {e}")
+
+    with _sessions_lock:
+        if len(_sessions) >= MAX_SESSIONS:
+            return SessionResult(
+                success=False,
+                error=f"Too many open sessions (limit {MAX_SESSIONS})",
+            )
+        session = PilotSession(code, (width, height), path, files)
+        _sessions[session.session_id] = session
+
+    try:
+        pilot_loop.run(session.start())
+        output = pilot_loop.run(session.call(_session_output))
+    except Exception as e:
+        with _sessions_lock:
+            _sessions.pop(session.session_id, None)
+        return SessionResult(success=False, error=str(e))
+
+    return SessionResult(session_id=session.session_id, output=output)
+
+
+def close_pilot_session(session_id: str) -> SessionResult:
+    """Unmount a session's app and free it.
+
+    Args:
+        session_id: ID returned by start_pilot_session.
+
+    Returns:
+        SessionResult indicating whether the session was closed, with the
+        session's memory accounting in metrics["memory"].
+    """
+    with _sessions_lock:
+        session = _sessions.pop(session_id, None)
+    if session is None:
+        return SessionResult(
+            success=False,
+            session_id=session_id,
+            error=_missing_session_error(session_id),
+        )
+    try:
+        pilot_loop.run(session.close())
+    except Exception as e:
+        return SessionResult(success=False, session_id=session_id, error=str(e))
+    metrics = {"memory": session.memory.as_dict()} if session.memory else {}
+    return SessionResult(session_id=session_id, metrics=metrics)
+
+
+def close_all_sessions() -> None:
+    """Close every open session."""
+    with _sessions_lock:
+        session_ids = list(_sessions)
+    for session_id in session_ids:
+        close_pilot_session(session_id)
+
+
+atexit.register(close_all_sessions)
+
+
+async def _settle(app, screen, timeout: float = SETTLE_TIMEOUT) -> None:
+    """Wait for nodes with queued messages to process them.
+
+    Unlike Pilot's wait for the whole screen, idle nodes are skipped, so the
+    wait costs nothing extra on large DOMs where only a few nodes changed.
+    """
+    loop = asyncio.get_running_loop()
+    futures = []
+    for node in (app, *screen.walk_children(with_self=True)):
+        if node is app or node is screen or node.message_queue_size:
+            future = loop.create_future()
+            if node.call_later(_resolve, future):
+                futures.append(future)
+    if futures:
+        try:
+            await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except TimeoutError:
+            raise SessionError(f"App did not settle within {timeout} seconds") from None
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _css_error_message(error: Exception) -> str:
+    """Flatten a stylesheet error into readable lines."""
+    from rich.text import Text
+
+    rules = getattr(getattr(error, "errors", None), "rules", None)
+    if not rules:
+        return f"CSS error: {error}"
+    lines = [
+        f"line {token.location[0] + 1}: {Text.from_markup(str(message)).plain}"
+        for rule in rules
+        for token, message in rule.errors
+    ]
+    return "CSS error: " + "; ".join(lines)
+
+
+def _swap_stylesheet_source(stylesheet, css: str, replace: bool) -> set[str]:
+    """Swap CSS into a stylesheet, restoring the old sources if it is invalid.
+
+    Parsing happens in place, so sources that didn't change are served from
+    the stylesheet's parse cache and keep their rule objects.
+
+    Returns:
+        Selector names of every rule that was added or removed. Only nodes
+        matching one of these names can have different styles.
+    """
+    previous_sources = dict(stylesheet.source)
+    previous_rules = set(stylesheet.rules)
+    if replace:
+        for location, source in previous_sources.items():
+            if not source.is_defaults:
+                del stylesheet.source[location]
+    stylesheet.source.pop(INJECTED_CSS_LOCATION, None)
+    stylesheet.add_source(css, read_from=INJECTED_CSS_LOCATION)
+    try:
+        stylesheet.parse()
+    except Exception:
+        stylesheet.source = previous_sources
+        stylesheet.parse()
+        raise
+    changed_rules = previous_rules.symmetric_difference(stylesheet.rules)
+    return set().union(*(rule.selector_names for rule in changed_rules))
+
+
+def inject_css(
+    session_id: str,
+    css: str,
+    replace: bool = True,
+    instrument: list[str] | None = None,
+) -> CssInjectionResult:
+    """Swap a new stylesheet into a running session and re-render it.
+
+    The app is not remounted: the CSS is parsed, styles are re-applied to
+    the nodes on the active screen that an added or removed rule can match,
+    and the screen is laid out again. Screens further down the
+    stack pick up the new styles when they are resumed.
+
+    Args:
+        session_id: ID returned by start_pilot_session.
+        css: Textual CSS to apply.
+        replace: Replace the app's own CSS (CSS and CSS_PATH) with this CSS.
+            If False, the CSS is layered on top of the app's CSS, replacing
+            only previously injected CSS.
+        instrument: Probes to attach while the CSS is applied, by name.
+            Their findings are returned in metrics; see
+            tui_builder.tools.probes. The app's tasks were started with the
+            session, so probes see the parsing, restyling and layout done
+            here but not the frames the app paints in its own tasks.
+
+    Returns:
+        CssInjectionResult with the new screen and timings in milliseconds.
+    """
+
+    async def restyle(session: PilotSession) -> CssInjectionResult:
+        app = session.app
+        stylesheet = app.stylesheet
+        probe_run = ProbeRun(instrument or [])
+        with probe_run.activate(app):
+            probe_run.mark("inject_css")
+            start = perf_counter()
+            selector_names = _swap_stylesheet_source(stylesheet, css, replace)
+            parsed = perf_counter()
+
+            screen = app.screen
+            nodes = [
+                node
+                for node in (app, *screen.walk_children(with_self=True))
+                if not selector_names.isdisjoint(node._selector_names)
+            ]
+            stylesheet.update_nodes(nodes)
+            restyled = perf_counter()
+
+            screen._refresh_layout(screen.size)
+            laid_out = perf_counter()
+
+            await _settle(app, screen)
+            settled = perf_counter()
+            probe_run.finish(app)
+        return CssInjectionResult(
+            output=_screen_text(screen),
+            nodes=len(nodes),
+            parse_ms=(parsed - start) * 1000,
+            restyle_ms=(restyled - parsed) * 1000,
+            layout_ms=(laid_out - restyled) * 1000,
+            settle_ms=(settled - laid_out) * 1000,
+            total_ms=(settled - start) * 1000,
+            metrics=probe_run.report(),
+        )
+
+    from textual.css.stylesheet import StylesheetError
+
+    try:
+        return run_in_session(session_id, restyle)
+    except StylesheetError as e:
+        return CssInjectionResult(success=False, error=_css_error_message(e))
+    except Exception as e:
+        return CssInjectionResult(success=False, error=str(e))
+
+
+def register_session_tools(mcp: FastMCP) -> None:
+    """Register session tools."""
+    mcp.tool()(start_pilot_session)
+    mcp.tool()(inject_css)
+    mcp.tool()(close_pilot_session)
@@ -0,0 +1,383 @@
+"""Golden snapshot suites.
+
+A suite is a directory of apps, the key scripts to run against them and the
+screens they are expected to end on. For an app ``counter.py``:
+
+- ``counter.keys`` and ``counter.<scenario>.keys`` are key scripts (see
+  ``run_key_script``), each run as a separate case. An app without any is
+  run once, as it starts.
+- ``counter.txt`` and ``counter.<scenario>.txt`` hold the expected screen
+  text for each scenario.
+
+Apps in subdirectories are included; files starting with an underscore are
+not, which suits helper modules. Apps run beside the suite's other modules
+and .tcss files, so they can import them and load their CSS_PATH. A suite
+can also be a workspace (``workspace://<id>``, or ``workspace://<id>/<dir>``
+for a directory within it); updated baselines are written back to it.
+Cases run on a pool of isolated workers, so a suite takes time proportional
+to its case count divided by the number of workers.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.executor import PilotExecutor, resolve_backend
+from tui_builder.tools.testing import PilotJob, compare_snapshots
+from tui_builder.tools.workspaces import (
+    WorkspaceError,
+    _check_path,
+    get_workspace_by_id,
+    parse_reference,
+)
+
+SCRIPT_SUFFIX = ".keys"
+BASELINE_SUFFIX = ".txt"
+SOURCE_SUFFIXES = (".py", ".tcss")
+PASSING = ("passed", "updated")
+
+
+@dataclass
+class SnapshotCase:
+    """One scenario of a suite: an app, a key script and a baseline."""
+
+    name: str
+    app: Path
+    script: Path | None
+    baseline: Path
+
+
+@dataclass
+class SnapshotSuiteResult:
+    """Result of running a snapshot suite."""
+
+    success: bool = True
+    directory: str = ""
+    backend: str = ""
+    workers: int = 0
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    missing: int = 0
+    updated: int = 0
+    skipped: int = 0
+    wall_ms: float = 0.0
+    case_ms: float = 0.0
+    cases: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+
+
+def discover_snapshot_cases(directory: str | Path) -> list[SnapshotCase]:
+    """Find the cases in a suite directory.
+
+    Args:
+        directory: The suite's root directory.
+
+    Returns:
+        The cases, sorted by name.
+    """
+    root = Path(directory)
+    cases = []
+    for app in sorted(root.rglob("*.py")):
+        if app.name.startswith("_"):
+            continue
+        stem = glob.escape(app.stem)
+        scripts = sorted(
+            [
+                *app.parent.glob(f"{stem}{SCRIPT_SUFFIX}"),
+                *app.parent.glob(f"{stem}.*{SCRIPT_SUFFIX}"),
+            ]
+        )
+        for script in scripts or [None]:
+            base = app.with_suffix("") if script is None else script.with_suffix("")
+            cases.append(
+                SnapshotCase(
+                    name=base.relative_to(root).as_posix(),
+                    app=app,
+                    script=script,
+                    baseline=base.with_name(base.name + BASELINE_SUFFIX),
+                )
+            )
+    return sorted(cases, key=lambda case: case.name)
+
+
+def _read_baseline(case: SnapshotCase) -> str | None:
+    if not case.baseline.is_file():
+        return None
+    return case.baseline.read_text().removesuffix("\n")
+
+
+def _check_case(case: SnapshotCase, result, update: bool) -> dict[str, Any]:
+    """Compare a case's result with its baseline, rewriting it if asked."""
+    entry: dict[str, Any] = {
+        "name": case.name,
+        "duration_ms": result.metrics.get("duration_ms", 0.0),
+    }
+    if not result.success:
+        return {**entry, "status": "error", "error": result.error}
+    expected = _read_baseline(case)
+    if expected is not None:
+        comparison = compare_snapshots(expected, result.output)
+        if comparison.match:
+            return {**entry, "status": "passed"}
+    if update:
+        case.baseline.write_text(result.output + "\n")
+        return {**entry, "status": "updated"}
+    if expected is None:
+        return {**entry, "status": "missing", "error": "No baseline"}
+    return {**entry, "status": "failed", "diff": comparison.diff}
+
+
+def run_snapshot_suite(
+    directory: str,
+    workers: int | None = None,
+    isolation: str = "auto",
+    fail_fast: bool = False,
+    update: bool = False,
+    width: int = 80,
+    height: int = 24,
+) -> SnapshotSuiteResult:
+    """Run every case in a snapshot suite and diff it against its baseline.
+
+    Each case runs its app with Pilot in an isolated worker, applies the
+    case's key script and compares the final screen text with the baseline.
+    Cases are spread across the worker pool as workers free up.
+
+    Args:
+        directory: The suite directory, or a workspace reference. See the
+            module docs for its layout.
+        workers: Number of workers. Defaults to the number of CPU cores.
+        isolation: Executor backend: "auto", "subinterpreter" or "process".
+        fail_fast: Stop after the first case that fails or errors. Cases
+            already running finish; the rest are reported as skipped.
+        update: Write the actual screen as the baseline for cases that are
+            missing one or don't match it.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+
+    Returns:
+        SnapshotSuiteResult with status counts and, for every case, its
+        status, run time and diff or error.
+    """
+    reference = parse_reference(directory)
+    if reference is not None:
+        return _run_workspace_suite(
+            directory, reference, workers, isolation, fail_fast, update, width, height
+        )
+    root = Path(directory)
+    if not root.is_dir():
+        return SnapshotSuiteResult(
+            success=False, directory=directory, error=f"Not a directory: {directory}"
+        )
+    if workers is not None and workers < 1:
+        return SnapshotSuiteResult(
+            success=False, directory=directory, error="workers must be at least 1"
+        )
+    workers = workers or os.cpu_count() or 1
+    try:
+        backend = resolve_backend(isolation)
+    except ValueError as e:
+        return SnapshotSuiteResult(success=False, directory=directory, error=str(e))
+
+    cases = discover_snapshot_cases(root)
+    result = SnapshotSuiteResult(
+        directory=directory, backend=backend, workers=workers, total=len(cases)
+    )
+    if not cases:
+        return result
+    start = perf_counter()
+    entries = _run_cases(
+        root, cases, backend, workers, fail_fast, update, (width, height)
+    )
+    result.wall_ms = (perf_counter() - start) * 1000
+    result.cases = [entries[case.name] for case in cases]
+    for entry in result.cases:
+        field_name = "errors" if entry["status"] == "error" else entry["status"]
+        setattr(result, field_name, getattr(result, field_name) + 1)
+    result.case_ms = sum(entry["duration_ms"] for entry in result.cases)
+    result.success = result.passed + result.updated == result.total
+    return result
+
+
+def _run_workspace_suite(
+    directory: str,
+    reference: tuple[str, str | None],
+    workers: int | None,
+    isolation: str,
+    fail_fast: bool,
+    update: bool,
+    width: int,
+    height: int,
+) -> SnapshotSuiteResult:
+    """Run a suite held in a workspace from a copy of its files."""
+    workspace_id, path = reference
+    try:
+        workspace = get_workspace_by_id(workspace_id)
+        prefix = f"{_check_path(path)}/" if path else ""
+    except WorkspaceError as e:
+        return SnapshotSuiteResult(success=False, directory=directory, error=str(e))
+    files = workspace.snapshot()
+    if prefix and not any(name.startswith(prefix) for name in files):
+        return SnapshotSuiteResult(
+            success=False, directory=directory, error=f"Not a directory: {directory}"
+        )
+
+    with tempfile.TemporaryDirectory(prefix="tui_builder_suite_") as checkout:
+        for name, text in files.items():
+            target = Path(checkout, name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text)
+        suite = Path(checkout, prefix)
+        result = run_snapshot_suite(
+            str(suite), workers, isolation, fail_fast, update, width, height
+        )
+        baselines = {
+            f"{prefix}{entry['name']}{BASELINE_SUFFIX}": (
+                suite / f"{entry['name']}{BASELINE_SUFFIX}"
+            ).read_text()
+            for entry in result.cases
+            if entry["status"] == "updated"
+        }
+    result.directory = directory
+    if baselines:
+        try:
+            workspace.update(files=baselines)
+        except WorkspaceError as e:
+            result.success = False
+            result.error = f"Baselines not saved: {e}"
+    return result
+
+
+def _suite_sources(root: Path) -> dict[str, str]:
+    """Read the modules and stylesheets apps in the suite may load."""
+    return {
+        path.relative_to(root).as_posix(): path.read_text()
+        for path in sorted(root.rglob("*"))
+        if path.suffix in SOURCE_SUFFIXES and path.is_file()
+    }
+
+
+def _run_cases(
+    root: Path,
+    cases: list[SnapshotCase],
+    backend: str,
+    workers: int,
+    fail_fast: bool,
+    update: bool,
+    size: tuple[int, int],
+) -> dict[str, dict[str, Any]]:
+    """Run cases on a dedicated pool, returning an entry per case name."""
+    sources = _suite_sources(root)
+    executor = PilotExecutor(backend, max_workers=min(workers, len(cases)))
+    entries: dict[str, dict[str, Any]] = {}
+    pending: dict[Future, SnapshotCase] = {}
+    try:
+        pending = {
+            executor.submit(
+                PilotJob(
+                    code=case.app.read_text(),
+                    script=case.script.read_text() if case.script else "",
+                    width=size[0],
+                    height=size[1],
+                    path=case.app.relative_to(root).as_posix(),
+                    files=sources,
+                )
+            ): case
+            for case in cases
+        }
+        stopped = False
+        while pending and not stopped:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                case = pending.pop(future)
+                entry = _check_case(case, executor.result(future), update)
+                entries[case.name] = entry
+                stopped |= fail_fast and entry["status"] not in PASSING
+        for future in pending:
+            future.cancel()
+    finally:
+        executor.shutdown()
+        # Free the results of cases that were still running when we stopped.
+        for future in pending:
+            if not future.cancelled():
+                executor.result(future)
+    for case in cases:
+        entries.setdefault(
+            case.name, {"name": case.name, "status": "skipped", "duration_ms": 0.0}
+        )
+    return entries
+
+
+def _print_summary(result: SnapshotSuiteResult) -> None:
+    for entry in result.cases:
+        status = entry["status"].upper()
+        print(f"{status:8} {entry['name']} ({entry['duration_ms']:.0f} ms)")
+        if entry.get("error"):
+            print(f"         {entry['error']}")
+        if entry.get("diff"):
+            print(entry["diff"], end="")
+    print(
+        f"{result.total} cases: {result.passed} passed, {result.failed} failed, "
+        f"{result.errors} errors, {result.missing} missing, {result.updated} "
+        f"updated, {result.skipped} skipped in {result.wall_ms / 1000:.1f}s "
+        f"on {result.workers} {result.backend} workers"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a snapshot suite from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="tui-builder-snapshots",
+        description="Run a directory of golden snapshot cases in parallel.",
+    )
+    parser.add_argument("directory", help="suite directory")
+    parser.add_argument("-j", "--workers", type=int, help="number of workers")
+    parser.add_argument(
+        "--isolation",
+        default="auto",
+        choices=["auto", "subinterpreter", "process"],
+        help="executor backend",
+    )
+    parser.add_argument(
+        "-x", "--fail-fast", action="store_true", help="stop at the first failure"
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="rewrite missing or changed baselines"
+    )
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--height", type=int, default=24)
+    args = parser.parse_args(argv)
+
+    result = run_snapshot_suite(
+        args.directory,
+        workers=args.workers,
+        isolation=args.isolation,
+        fail_fast=args.fail_fast,
+        update=args.update,
+        width=args.width,
+        height=args.height,
+    )
+    if result.error:
+        print(f"error: {result.error}", file=sys.stderr)
+        return 2
+    _print_summary(result)
+    return 0 if result.success else 1
+
+
+def register_snapshot_tools(mcp: FastMCP) -> None:
+    """Register snapshot suite tools."""
+    mcp.tool()(run_snapshot_suite)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
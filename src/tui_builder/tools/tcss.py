@@ -0,0 +1,224 @@
+"""A single-pass tokenizer and parser for Textual CSS.
+
+The parser checks structure, not meaning: it finds rule blocks (including
+nested ones), declarations and variable definitions, and records where each
+starts. Syntax errors are collected with their line and column and parsing
+carries on, so one pass reports every problem in a stylesheet. Tokenizing and
+parsing both walk the input once, so time grows linearly with its size.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<comment>/\*.*?(?:\*/|\Z))
+    |(?P<string>"(?:[^"\\\n]|\\.)*(?:"|(?=\n)|\Z)|'(?:[^'\\\n]|\\.)*(?:'|(?=\n)|\Z))
+    |(?P<space>\s+)
+    |(?P<punct>[{};:])
+    |(?P<text>[^\s{};:"'/]+|/)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_NAME_PATTERN = re.compile(r"-?[a-zA-Z_][a-zA-Z0-9_-]*")
+
+
+@dataclass
+class TcssError:
+    """A syntax error at a position in the source."""
+
+    message: str
+    line: int
+    column: int
+
+    def __str__(self) -> str:
+        return f"line {self.line}, column {self.column}: {self.message}"
+
+
+@dataclass
+class TcssDeclaration:
+    """A ``name: value`` declaration, or a ``$variable: value`` definition."""
+
+    name: str
+    value: str
+    line: int
+    column: int
+
+
+@dataclass
+class TcssRule:
+    """A rule block: its selector, declarations and nested rules."""
+
+    selector: str
+    line: int
+    column: int
+    declarations: list[TcssDeclaration] = field(default_factory=list)
+    rules: list["TcssRule"] = field(default_factory=list)
+
+
+@dataclass
+class TcssStylesheet:
+    """The rules and variables of a stylesheet, with any syntax errors."""
+
+    rules: list[TcssRule] = field(default_factory=list)
+    variables: list[TcssDeclaration] = field(default_factory=list)
+    errors: list[TcssError] = field(default_factory=list)
+
+    def walk_rules(self) -> Iterator[TcssRule]:
+        """Yield every rule, nested rules after the rule containing them."""
+        stack = list(reversed(self.rules))
+        while stack:
+            rule = stack.pop()
+            yield rule
+            stack.extend(reversed(rule.rules))
+
+
+@dataclass(slots=True)
+class _Token:
+    kind: str
+    text: str
+    line: int
+    column: int
+
+
+def tokenize_tcss(css: str) -> Iterator[_Token]:
+    """Split TCSS into tokens, tracking the line and column of each.
+
+    Comments are kept as tokens; unterminated comments and strings run to
+    the end of the input or line, and are reported by the parser.
+    """
+    line, line_start = 1, 0
+    for match in _TOKEN_PATTERN.finditer(css):
+        kind = match.lastgroup or "text"
+        text = match.group()
+        start = match.start()
+        yield _Token(kind, text, line, start - line_start + 1)
+        newlines = text.count("\n")
+        if newlines:
+            line += newlines
+            line_start = start + text.rindex("\n") + 1
+
+
+class _Parser:
+    """Builds a TcssStylesheet from tokens in one pass."""
+
+    def __init__(self) -> None:
+        self.stylesheet = TcssStylesheet()
+        self.open_rules: list[TcssRule] = []
+        self.statement: list[_Token] = []
+
+    def error(self, message: str, token: _Token) -> None:
+        self.stylesheet.errors.append(TcssError(message, token.line, token.column))
+
+    def feed(self, token: _Token) -> None:
+        if token.kind == "comment":
+            if not token.text.endswith("*/") or len(token.text) < 4:
+                self.error("Unterminated comment", token)
+        elif token.kind == "string" and (
+            len(token.text) < 2 or token.text[-1] != token.text[0]
+        ):
+            self.error("Unterminated string", token)
+            self.statement.append(token)
+        elif token.text == "{" and token.kind == "punct":
+            self.open_rule(token)
+        elif token.text in ";}" and token.kind == "punct":
+            self.end_statement()
+            if token.text == "}":
+                self.close_rule(token)
+        elif token.kind != "space":
+            self.statement.append(token)
+        elif self.statement and self.statement[-1].kind != "space":
+            self.statement.append(token)
+
+    def open_rule(self, brace: _Token) -> None:
+        parts = self.statement
+        self.statement = []
+        selector = _join(parts)
+        if not selector:
+            self.error("Missing selector before '{'", brace)
+        elif any(part.kind == "string" for part in parts):
+            self.error(f"Invalid selector '{selector}'", parts[0])
+        start = parts[0] if parts else brace
+        rule = TcssRule(selector, start.line, start.column)
+        parent = self.open_rules[-1].rules if self.open_rules else self.stylesheet.rules
+        parent.append(rule)
+        self.open_rules.append(rule)
+
+    def close_rule(self, brace: _Token) -> None:
+        if not self.open_rules:
+            self.error("Unexpected '}'", brace)
+            return
+        self.open_rules.pop()
+
+    def end_statement(self) -> None:
+        parts = self.statement
+        self.statement = []
+        if not parts:
+            return
+        first = parts[0]
+        colon = next((i for i, part in enumerate(parts) if part.text == ":"), None)
+        if colon is None:
+            if self.open_rules:
+                self.error(f"Expected ':' after '{_join(parts)}'", first)
+            else:
+                self.error(f"Expected '{{' after '{_join(parts)}'", first)
+            return
+
+        name = _join(parts[:colon])
+        value_parts = parts[colon + 1 :]
+        extra_colon = next((part for part in value_parts if part.text == ":"), None)
+        if extra_colon is not None:
+            self.error(
+                f"Unexpected ':' in value of '{name}'; missing ';'?", extra_colon
+            )
+            return
+        declaration = TcssDeclaration(
+            name, _join(value_parts), first.line, first.column
+        )
+
+        if name.startswith("$"):
+            if not _NAME_PATTERN.fullmatch(name[1:]):
+                self.error(f"Invalid variable name '{name}'", first)
+            elif not declaration.value:
+                self.error(f"Missing value for '{name}'", parts[colon])
+            else:
+                self.stylesheet.variables.append(declaration)
+        elif not self.open_rules:
+            self.error(f"Declaration '{name}' outside a rule block", first)
+        elif not _NAME_PATTERN.fullmatch(name):
+            self.error(f"Invalid property name '{name}'", first)
+        elif not declaration.value:
+            self.error(f"Missing value for '{name}'", parts[colon])
+        else:
+            self.open_rules[-1].declarations.append(declaration)
+
+    def finish(self) -> TcssStylesheet:
+        self.end_statement()
+        for rule in reversed(self.open_rules):
+            self.stylesheet.errors.append(
+                TcssError(
+                    f"Unclosed '{{' for '{rule.selector}'", rule.line, rule.column
+                )
+            )
+        return self.stylesheet
+
+
+def _join(parts: list[_Token]) -> str:
+    """The text of tokens with whitespace collapsed to single spaces."""
+    return "".join(" " if part.kind == "space" else part.text for part in parts).strip()
+
+
+def parse_tcss(css: str) -> TcssStylesheet:
+    """Parse a Textual CSS stylesheet.
+
+    Args:
+        css: The stylesheet source.
+
+    Returns:
+        TcssStylesheet with the rules, variables and syntax errors found.
+    """
+    parser = _Parser()
+    for token in tokenize_tcss(css):
+        parser.feed(token)
+    return parser.finish()
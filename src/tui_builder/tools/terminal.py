@@ -0,0 +1,415 @@
+"""Real-terminal tools for TUI applications.
+
+These tools run an app in a subprocess attached to a pseudo-terminal, so the
+real Linux driver is exercised and every byte written to the terminal can be
+measured.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from mcp.server.fastmcp import FastMCP
+
+from tui_builder.tools.testing import (
+    KeyScriptError,
+    _extract_app_class_name,
+    _write_source,
+    parse_key_script,
+)
+from tui_builder.tools.workspaces import WorkspaceError, resolve_files
+
+SYNC_START = b"\x1b[?2026h"
+SYNC_END = b"\x1b[?2026l"
+SYNC_QUERY = b"\x1b[?2026$p"
+SYNC_SUPPORTED_REPLY = b"\x1b[?2026;2$y"
+CLEAR_SCREEN = b"\x1b[2J"
+
+STARTUP_TIMEOUT = 10.0
+EXIT_TIMEOUT = 3.0
+
+_CURSOR_MOVE_PATTERN = re.compile(rb"\x1b\[(\d+);(\d+)H")
+_ESCAPE_SEQUENCE_PATTERN = re.compile(rb"\x1b(?:\[[0-?]*[ -/]*[@-~]|[@-Z\\-_])")
+
+_KEY_SEQUENCES: dict[str, bytes] = {
+    "enter": b"\r",
+    "tab": b"\t",
+    "shift+tab": b"\x1b[Z",
+    "escape": b"\x1b",
+    "backspace": b"\x7f",
+    "space": b" ",
+    "up": b"\x1b[A",
+    "down": b"\x1b[B",
+    "right": b"\x1b[C",
+    "left": b"\x1b[D",
+    "home": b"\x1b[H",
+    "end": b"\x1b[F",
+    "insert": b"\x1b[2~",
+    "delete": b"\x1b[3~",
+    "pageup": b"\x1b[5~",
+    "pagedown": b"\x1b[6~",
+    "f1": b"\x1bOP",
+    "f2": b"\x1bOQ",
+    "f3": b"\x1bOR",
+    "f4": b"\x1bOS",
+}
+
+_LAUNCHER = """
+import importlib.util
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+spec = importlib.util.spec_from_file_location("pty_app", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+sys.modules["pty_app"] = module
+spec.loader.exec_module(module)
+getattr(module, sys.argv[2])().run()
+"""
+
+
+@dataclass
+class FrameStats:
+    """Bytes and repaint kind of a single frame written to the terminal."""
+
+    time: float = 0.0
+    bytes: int = 0
+    full_repaint: bool = False
+    rows_updated: int = 0
+
+
+@dataclass
+class TerminalBandwidthResult:
+    """Result of measuring an app's terminal output over a pseudo-terminal."""
+
+    success: bool = True
+    error: str | None = None
+    total_bytes: int = 0
+    startup_bytes: int = 0
+    escape_sequences: int = 0
+    frame_count: int = 0
+    bytes_per_frame: float = 0.0
+    max_frame_bytes: int = 0
+    frames_per_second: float = 0.0
+    full_repaints: int = 0
+    partial_updates: int = 0
+    duration: float = 0.0
+    synchronized: bool = False
+    frames: list[FrameStats] = field(default_factory=list)
+
+
+def _key_bytes(key: str) -> bytes:
+    """Translate a Textual key name into the bytes a terminal would send."""
+    if key in _KEY_SEQUENCES:
+        return _KEY_SEQUENCES[key]
+    if key.startswith("ctrl+") and len(key) == 6 and key[5].isalpha():
+        return bytes([ord(key[5].lower()) & 0x1F])
+    if len(key) == 1:
+        return key.encode()
+    raise KeyScriptError(f"No terminal sequence for key '{key}'")
+
+
+def _script_inputs(script: str) -> list[bytes | None]:
+    """Compile a key script into terminal writes, with None marking a pause."""
+    inputs: list[bytes | None] = []
+    for action in parse_key_script(script):
+        if action[0] == "keys":
+            inputs.append(b"".join(_key_bytes(key) for key in action[1:]))
+        elif action[0] == "type":
+            inputs.append(action[1].encode())
+        else:
+            inputs.append(None)
+    return inputs
+
+
+def _set_window_size(fd: int, width: int, height: int) -> None:
+    """Set the size reported by a pseudo-terminal."""
+    import fcntl
+    import struct
+    import termios
+
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", height, width, 0, 0))
+
+
+class _TerminalRecorder:
+    """Reads a pseudo-terminal, timestamping output and answering queries."""
+
+    def __init__(self, master_fd: int) -> None:
+        self.master_fd = master_fd
+        self.chunks: list[bytes] = []
+        self.chunk_times: list[float] = []
+        self.chunk_offsets: list[int] = []
+        self.size = 0
+        self.has_painted = False
+
+    def read_until_quiet(self, quiet: float, timeout: float) -> bool:
+        """Record output until none arrives for `quiet` seconds.
+
+        Returns:
+            False if the terminal was closed by the child process.
+        """
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            has_data = self._read(quiet)
+            if has_data is None:
+                return False
+            if not has_data:
+                return True
+        return True
+
+    def read_until_painted(self, timeout: float) -> bool:
+        """Record output until the app paints its first frame.
+
+        Returns:
+            False if the terminal was closed by the child process.
+        """
+        deadline = time.perf_counter() + timeout
+        while not self.has_painted and time.perf_counter() < deadline:
+            if self._read(deadline - time.perf_counter()) is None:
+                return False
+        return True
+
+    def _read(self, timeout: float) -> bool | None:
+        """Record one read, returning None once the terminal has closed."""
+        import select
+
+        readable, _, _ = select.select([self.master_fd], [], [], max(timeout, 0))
+        if not readable:
+            return False
+        try:
+            data = os.read(self.master_fd, 65536)
+        except OSError:
+            return None
+        if not data:
+            return None
+        self._record(data)
+        return True
+
+    def write(self, data: bytes) -> None:
+        """Send input to the app."""
+        os.write(self.master_fd, data)
+
+    def _record(self, data: bytes) -> None:
+        if SYNC_QUERY in data:
+            self.write(SYNC_SUPPORTED_REPLY)
+        if SYNC_END in data or _CURSOR_MOVE_PATTERN.search(data):
+            self.has_painted = True
+        self.chunk_offsets.append(self.size)
+        self.chunk_times.append(time.perf_counter())
+        self.chunks.append(data)
+        self.size += len(data)
+
+    def time_at(self, offset: int) -> float:
+        """Return the time the byte at `offset` was read."""
+        index = max(bisect_right(self.chunk_offsets, offset) - 1, 0)
+        return self.chunk_times[index]
+
+
+def _split_synchronized_frames(stream: bytes) -> list[tuple[int, int]]:
+    """Find (start, end) offsets of frames bracketed by synchronized updates."""
+    frames = []
+    position = stream.find(SYNC_START)
+    while position != -1:
+        end = stream.find(SYNC_END, position)
+        if end == -1:
+            break
+        end += len(SYNC_END)
+        frames.append((position, end))
+        position = stream.find(SYNC_START, end)
+    return frames
+
+
+def _split_chunk_frames(recorder: _TerminalRecorder) -> list[tuple[int, int]]:
+    """Treat every read as a frame when the app doesn't bracket its updates."""
+    return [
+        (offset, offset + len(chunk))
+        for offset, chunk in zip(recorder.chunk_offsets, recorder.chunks, strict=True)
+        if _CURSOR_MOVE_PATTERN.search(chunk)
+    ]
+
+
+def _frame_stats(frame: bytes, height: int, frame_time: float) -> FrameStats:
+    """Classify a frame as a full repaint or a partial update."""
+    rows = {int(row) for row, _ in _CURSOR_MOVE_PATTERN.findall(frame)}
+    rows_from_left = {
+        int(row)
+        for row, column in _CURSOR_MOVE_PATTERN.findall(frame)
+        if column == b"1"
+    }
+    full_repaint = CLEAR_SCREEN in frame or len(rows_from_left) >= height
+    return FrameStats(
+        time=frame_time,
+        bytes=len(frame),
+        full_repaint=full_repaint,
+        rows_updated=len(rows),
+    )
+
+
+def _analyze_stream(
+    recorder: _TerminalRecorder, height: int, start_time: float, input_time: float
+) -> TerminalBandwidthResult:
+    """Summarize recorded terminal output into frame statistics."""
+    stream = b"".join(recorder.chunks)
+    spans = _split_synchronized_frames(stream)
+    synchronized = bool(spans)
+    if not synchronized:
+        spans = _split_chunk_frames(recorder)
+
+    frames = [
+        _frame_stats(stream[start:end], height, recorder.time_at(start) - start_time)
+        for start, end in spans
+    ]
+    startup_bytes = sum(
+        len(chunk)
+        for chunk, chunk_time in zip(recorder.chunks, recorder.chunk_times, strict=True)
+        if chunk_time < input_time
+    )
+
+    result = TerminalBandwidthResult(
+        total_bytes=len(stream),
+        startup_bytes=startup_bytes,
+        escape_sequences=len(_ESCAPE_SEQUENCE_PATTERN.findall(stream)),
+        frame_count=len(frames),
+        synchronized=synchronized,
+        frames=frames,
+    )
+    if recorder.chunk_times:
+        result.duration = recorder.chunk_times[-1] - start_time
+    if frames:
+        frame_bytes = [frame.bytes for frame in frames]
+        result.bytes_per_frame = sum(frame_bytes) / len(frames)
+        result.max_frame_bytes = max(frame_bytes)
+        result.full_repaints = sum(frame.full_repaint for frame in frames)
+        result.partial_updates = len(frames) - result.full_repaints
+        if result.duration > 0:
+            result.frames_per_second = len(frames) / result.duration
+    return result
+
+
+def _drive_terminal(
+    recorder: _TerminalRecorder,
+    inputs: list[bytes | None],
+    settle: float,
+) -> float:
+    """Wait for startup, feed inputs and ask the app to quit.
+
+    Returns:
+        The time input started.
+    """
+    is_open = recorder.read_until_painted(STARTUP_TIMEOUT)
+    if is_open:
+        is_open = recorder.read_until_quiet(max(settle, 0.2), STARTUP_TIMEOUT)
+    input_time = time.perf_counter()
+    for data in inputs:
+        if not is_open:
+            break
+        if data:
+            recorder.write(data)
+        is_open = recorder.read_until_quiet(settle, STARTUP_TIMEOUT)
+    if is_open:
+        recorder.write(_key_bytes("ctrl+q"))
+        recorder.read_until_quiet(EXIT_TIMEOUT, EXIT_TIMEOUT)
+    return input_time
+
+
+def measure_terminal_output(
+    code: str,
+    script: str = "",
+    width: int = 80,
+    height: int = 24,
+    settle_ms: int = 50,
+) -> TerminalBandwidthResult:
+    """Run an app on a pseudo-terminal and measure the bytes it writes.
+
+    The app runs in a subprocess with the real Linux driver. Input from the
+    key script (see run_key_script) is written to the terminal, and the ANSI
+    output is split into frames using the synchronized-update markers
+    Textual emits once the terminal reports support for them.
+
+    Args:
+        code: Python code containing a Textual App class.
+        script: Key script to feed to the app after startup.
+        width: Terminal width in columns.
+        height: Terminal height in rows.
+        settle_ms: Quiet time that ends the output for one input.
+
+    Returns:
+        TerminalBandwidthResult with byte, frame and repaint statistics.
+    """
+    if sys.platform == "win32":
+        return TerminalBandwidthResult(
+            success=False, error="Pseudo-terminals are not supported on Windows"
+        )
+
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return TerminalBandwidthResult(success=False, error=str(e))
+    except SyntaxError as e:
+        return TerminalBandwidthResult(success=False, error=f"Syntax error: {e}")
+
+    app_class_name = _extract_app_class_name(code)
+    if not app_class_name:
+        return TerminalBandwidthResult(success=False, error="No App class found")
+
+    try:
+        inputs = _script_inputs(script)
+    except KeyScriptError as e:
+        return TerminalBandwidthResult(success=False, error=f"Invalid key script: {e}")
+
+    directory = tempfile.TemporaryDirectory(prefix="tui_builder_")
+    temp_path = _write_source(Path(directory.name), code, path, files)
+
+    import pty
+
+    master_fd, slave_fd = pty.openpty()
+    try:
+        _set_window_size(slave_fd, width, height)
+        env = {**os.environ, "TERM": "xterm-256color", "COLORTERM": "truecolor"}
+        process = subprocess.Popen(
+            [sys.executable, "-c", _LAUNCHER, str(temp_path), app_class_name],
+            stdin=slave_fd,
+            stdout=slave_fd,
+            stderr=slave_fd,
+            env=env,
+            start_new_session=True,
+        )
+        os.close(slave_fd)
+        slave_fd = -1
+
+        recorder = _TerminalRecorder(master_fd)
+        start_time = time.perf_counter()
+        try:
+            input_time = _drive_terminal(recorder, inputs, settle_ms / 1000)
+        finally:
+            try:
+                process.wait(timeout=EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+        result = _analyze_stream(recorder, height, start_time, input_time)
+        if process.returncode != 0:
+            result.success = False
+            tail = b"".join(recorder.chunks)[-500:].decode(errors="replace")
+            result.error = f"App exited with code {process.returncode}: {tail}"
+        return result
+    except Exception as e:
+        return TerminalBandwidthResult(success=False, error=str(e))
+    finally:
+        if slave_fd != -1:
+            os.close(slave_fd)
+        os.close(master_fd)
+        directory.cleanup()
+
+
+def register_terminal_tools(mcp: FastMCP) -> None:
+    """Register real-terminal tools."""
+    mcp.tool()(measure_terminal_output)
@@ -1,13 +1,47 @@
 """Testing tools for TUI applications."""
 
 import difflib
+import math
+import os
 import re
+import sys
 import tempfile
-from dataclasses import dataclass
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+from typing import Any
 
 from mcp.server.fastmcp import FastMCP
 
+from tui_builder.perf import measure_key_ms, measure_peak_mb, measure_startup_ms
+from tui_builder.tools.memory import memory_monitor
+from tui_builder.tools.pilot_loop import pilot_loop
+from tui_builder.tools.probes import ProbeRun, action_label
+from tui_builder.tools.workspaces import WorkspaceError, resolve_files
+
+MAX_SCRIPT_EVENTS = 100_000
+
+_SCRIPT_TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        (?P<text>"(?:[^"\\]|\\.)*")
+        |(?P<open>\()
+        |(?P<close>\))
+        |(?P<repeat>\*\s*\d+)
+        |(?P<key>[^\s()*"]+)
+    )""",
+    re.VERBOSE,
+)
+_SCRIPT_WHITESPACE_PATTERN = re.compile(r"\s*")
+_SCRIPT_ESCAPES = {"n": "\n", "t": "\t"}
+
+PERF_CALIBRATION_RUNS = 3
+MAX_PERF_CALIBRATION_RUNS = 20
+MIN_TIME_BUDGET_MS = 10.0
+MIN_MEMORY_BUDGET_MB = 1.0
+
 
 @dataclass
 class SnapshotResult:
@@ -16,6 +50,26 @@ class SnapshotResult:
     success: bool = True
     output: str = ""
     error: str | None = None
+    metrics: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PilotJob:
+    """A single app run within a pilot batch.
+
+    ``files`` are other files the code runs beside, such as modules it
+    imports or its CSS_PATH files, keyed by path, and ``path`` is where the
+    code itself goes among them. Both are filled in for workspace
+    references.
+    """
+
+    code: str
+    script: str = ""
+    width: int = 80
+    height: int = 24
+    instrument: list[str] = field(default_factory=list)
+    path: str | None = None
+    files: dict[str, str] = field(default_factory=dict)
 
 
 @dataclass
@@ -26,6 +80,136 @@ class CompareResult:
     diff: str | None = None
 
 
+class KeyScriptError(ValueError):
+    """Raised when a key script cannot be parsed."""
+
+
+def _tokenize_key_script(script: str) -> list[tuple[str, str, int]]:
+    """Split a key script into (kind, value, position) tokens."""
+    tokens = []
+    position = 0
+    while True:
+        position = _SCRIPT_WHITESPACE_PATTERN.match(script, position).end()
+        if position == len(script):
+            break
+        match = _SCRIPT_TOKEN_PATTERN.match(script, position)
+        if match is None:
+            raise KeyScriptError(f"Unexpected input at position {position}")
+        kind = match.lastgroup or ""
+        tokens.append((kind, match.group(kind), match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+def _unquote_script_text(token: str) -> str:
+    """Remove quotes and resolve backslash escapes in a script text literal."""
+    return re.sub(
+        r"\\(.)",
+        lambda match: _SCRIPT_ESCAPES.get(match.group(1), match.group(1)),
+        token[1:-1],
+    )
+
+
+def _append_script_action(actions: list[list[str]], action: list[str]) -> None:
+    """Append an action, merging it into the previous one where possible."""
+    if actions and actions[-1][0] == action[0] and action[0] in ("keys", "type"):
+        actions[-1].extend(action[1:])
+    else:
+        actions.append(list(action))
+
+
+def _count_script_events(actions: list[list[str]]) -> int:
+    """Count the input events a list of script actions will generate."""
+    return sum(
+        sum(map(len, action[1:])) if action[0] == "type" else max(len(action) - 1, 1)
+        for action in actions
+    )
+
+
+def _script_item_action(kind: str, value: str) -> list[str]:
+    """Build the action for a single key, text or pause script item."""
+    if kind == "text":
+        return ["type", _unquote_script_text(value)]
+    if value == "pause":
+        return ["pause"]
+    return ["keys", value]
+
+
+def _freeze_script_action(action: list[str]) -> tuple[str, ...]:
+    """Convert a mutable script action into a pilot action tuple."""
+    if action[0] == "type":
+        return ("type", "".join(action[1:]))
+    return tuple(action)
+
+
+def parse_key_script(script: str) -> list[tuple[str, ...]]:
+    """Compile a compact key script into pilot actions.
+
+    A script is a whitespace-separated sequence of items. An item is a key
+    name (``tab``, ``ctrl+s``), a quoted text block (``"hello"``), the word
+    ``pause`` to let the app settle, or a parenthesised group. Any item may
+    be followed by ``*N`` to repeat it, e.g. ``"abc" enter down*20 (tab
+    space)*50``. Text literals accept ``\\"``, ``\\n`` and ``\\t`` escapes.
+
+    Adjacent keys are merged into a single ``("keys", ...)`` burst and
+    adjacent text into a single ``("type", text)`` action, so long scripts
+    run with one settle per burst rather than one per key.
+
+    Args:
+        script: The key script to compile.
+
+    Returns:
+        A list of action tuples understood by the pilot runner.
+
+    Raises:
+        KeyScriptError: If the script is malformed or expands to more than
+            MAX_SCRIPT_EVENTS input events.
+    """
+    frames: list[list[list[str]]] = [[]]
+    last_item: list[list[str]] = []
+    total_events = 0
+
+    for kind, value, position in _tokenize_key_script(script):
+        if kind == "open":
+            frames.append([])
+            last_item = []
+            continue
+
+        if kind == "close":
+            if len(frames) == 1:
+                raise KeyScriptError(f"Unmatched ')' at position {position}")
+            last_item = frames.pop()
+            copies = 1
+        elif kind == "repeat":
+            if not last_item:
+                raise KeyScriptError(f"Nothing to repeat at position {position}")
+            count = int(value.lstrip("*"))
+            if count < 1:
+                raise KeyScriptError(
+                    f"Repeat count must be at least 1 at position {position}"
+                )
+            copies = count - 1
+            total_events += _count_script_events(last_item) * copies
+        else:
+            last_item = [_script_item_action(kind, value)]
+            copies = 1
+            total_events += _count_script_events(last_item)
+
+        if total_events > MAX_SCRIPT_EVENTS:
+            raise KeyScriptError(
+                f"Script expands to more than {MAX_SCRIPT_EVENTS} events"
+            )
+        for _ in range(copies):
+            for action in last_item:
+                _append_script_action(frames[-1], action)
+        if kind == "repeat":
+            last_item = []
+
+    if len(frames) > 1:
+        raise KeyScriptError("Unclosed '(' in key script")
+    return [_freeze_script_action(action) for action in frames[0]]
+
+
 def _extract_app_class_name(code: str) -> str | None:
     """Extract the App class name from code."""
     pattern = re.compile(r"class\s+(\w+)\s*\(\s*App\s*\)")
@@ -33,208 +217,558 @@ def _extract_app_class_name(code: str) -> str | None:
     return match.group(1) if match else None
 
 
-async def _run_app_async(code: str, actions: list[tuple[str, ...]] | None = None):
-    """Run an app asynchronously with Pilot."""
-    # Write code to temp file
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as f:
-        f.write(code)
-        temp_path = Path(f.name)
+def _key_event(key: str):
+    """Build the Key event Textual would generate for a key name or character.
 
+    The character is resolved the way ``App._press_keys`` does it, so keys
+    such as "plus" carry their character and typed text arrives intact.
+    """
+    import unicodedata
+
+    from textual import events
+    from textual.keys import (
+        REPLACED_KEYS,
+        _character_to_key,
+        _get_unicode_name_from_key,
+    )
+
+    if key == "\n":
+        key = "enter"
+    elif len(key) == 1 and not key.isalnum():
+        key = _character_to_key(key)
     try:
-        # Import the app module
-        import importlib.util
+        character = unicodedata.lookup(
+            _get_unicode_name_from_key(REPLACED_KEYS.get(key, key))
+        )
+    except KeyError:
+        character = key if len(key) == 1 else None
+    return events.Key(key, character)
+
+
+async def _send_key_burst(app, pilot, keys: tuple[str, ...]) -> None:
+    """Queue every key event up front and wait for the app to settle once."""
+    for key in keys:
+        app.post_message(_key_event(key))
+    await pilot.pause()
+
+
+async def _perform_action(app, pilot, action: tuple[str, ...]) -> None:
+    """Apply a single pilot action to a running app."""
+    from textual import events
+
+    action_type = action[0]
+    if action_type == "press":
+        await pilot.press(*action[1:])
+    elif action_type == "click":
+        await pilot.click(app.query_one(action[1]))
+    elif action_type == "keys":
+        await _send_key_burst(app, pilot, action[1:])
+    elif action_type == "type":
+        app.post_message(events.Paste(action[1]))
+        await pilot.pause()
+    elif action_type == "focus":
+        app.set_focus(app.query_one(action[1]))
+        await pilot.pause()
+    elif action_type == "pause":
+        await pilot.pause()
+    else:
+        raise ValueError(f"Unknown action: {action_type}")
 
-        spec = importlib.util.spec_from_file_location("temp_app", temp_path)
-        if spec is None or spec.loader is None:
-            return SnapshotResult(success=False, error="Failed to load module")
 
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+def _extract_screen_class_name(code: str) -> str | None:
+    """Extract the Screen or ModalScreen class name from code."""
+    pattern = re.compile(r"class\s+(\w+)\s*\(\s*(?:Modal)?Screen\b")
+    match = pattern.search(code)
+    return match.group(1) if match else None
 
-        # Find the App class
-        app_class_name = _extract_app_class_name(code)
-        if not app_class_name:
-            return SnapshotResult(success=False, error="No App class found")
 
-        app_class = getattr(module, app_class_name, None)
-        if app_class is None:
-            return SnapshotResult(
-                success=False, error=f"Class {app_class_name} not found"
-            )
+def _screen_preview_app(screen_class: type) -> type:
+    """Build an App class whose default screen is the given screen."""
+    from textual.app import App
 
-        # Run the app with Pilot
-        app = app_class()
-        output = ""
-
-        async with app.run_test(size=(80, 24)) as pilot:
-            # Execute any actions
-            if actions:
-                for action in actions:
-                    action_type = action[0]
-                    if action_type == "press":
-                        await pilot.press(*action[1:])
-                    elif action_type == "click":
-                        selector = action[1]
-                        try:
-                            widget = app.query_one(selector)
-                            await pilot.click(widget)
-                        except Exception as e:
-                            return SnapshotResult(
-                                success=False, error=f"Click failed: {e}"
-                            )
-
-            # Capture the output using console export
-            from io import StringIO
-
-            from rich.console import Console
-
-            console = Console(file=StringIO(), force_terminal=True, width=80)
-            # Get screen content by rendering widgets
-            screen_content = []
-            for widget in app.screen.walk_children():
-                if hasattr(widget, "renderable"):
-                    screen_content.append(str(widget.renderable))
-                elif hasattr(widget, "render"):
-                    try:
-                        rendered = widget.render()
-                        if rendered:
-                            console.print(rendered)
-                    except Exception:
-                        pass
-
-            # Build output from widget content
-            output_parts = []
-            for widget in app.screen.query("*"):
-                # Get text content from widgets
-                if hasattr(widget, "renderable"):
-                    output_parts.append(str(widget.renderable))
-
-            output = "\n".join(output_parts) if output_parts else "App rendered"
-
-        return SnapshotResult(success=True, output=output)
+    class ScreenPreviewApp(App):
+        """Hosts a generated screen so it can be previewed on its own."""
 
-    except Exception as e:
-        return SnapshotResult(success=False, error=str(e))
-    finally:
-        temp_path.unlink(missing_ok=True)
+        def get_default_screen(self):
+            return screen_class()
 
+    return ScreenPreviewApp
 
-def _run_sync(coro):
-    """Run an async coroutine synchronously."""
-    import asyncio
 
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
+class AppLoadError(Exception):
+    """Raised when an App class cannot be loaded from code."""
+
 
-    if loop is not None:
-        # Already in async context, create a new task
-        import threading
+@contextmanager
+def _load_module(
+    code: str, path: str | None = None, files: dict[str, str] | None = None
+) -> Iterator[ModuleType]:
+    """Import code as a temporary module and yield it.
 
-        result = None
-        exception = None
+    The code is written to `path` in a temporary directory, among `files`
+    (the other files of its workspace, keyed by path). The directory exists
+    for as long as the context is open and, when there are other files, the
+    code's own directory is on sys.path, so relative CSS_PATH files resolve
+    while the app runs and sibling modules can be imported.
 
-        def run_in_thread():
-            nonlocal result, exception
+    Sibling modules are dropped from sys.modules once the code has loaded,
+    so two workspaces with a module of the same name, such as both versions
+    in a comparison, each get their own. Modules first imported while the
+    app runs are shared until the run ends.
+    """
+    import importlib.util
+
+    with tempfile.TemporaryDirectory(prefix="tui_builder_") as directory:
+        root = Path(directory)
+        module_path = _write_source(root, code, path, files)
+        import_path = str(module_path.parent) if files else None
+        if import_path:
+            sys.path.insert(0, import_path)
+        try:
+            spec = importlib.util.spec_from_file_location("temp_app", module_path)
+            if spec is None or spec.loader is None:
+                raise AppLoadError("Failed to load module")
+
+            module = importlib.util.module_from_spec(spec)
             try:
-                new_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(new_loop)
-                try:
-                    result = new_loop.run_until_complete(coro)
-                finally:
-                    new_loop.close()
-            except Exception as e:
-                exception = e
-
-        thread = threading.Thread(target=run_in_thread)
-        thread.start()
-        thread.join()
-
-        if exception:
-            raise exception
-        return result
+                spec.loader.exec_module(module)
+            finally:
+                if files:
+                    _forget_modules(root)
+            _set_base_path(module, module_path)
+            yield module
+        finally:
+            if import_path:
+                sys.path.remove(import_path)
+
+
+def _write_source(
+    root: Path, code: str, path: str | None, files: dict[str, str] | None
+) -> Path:
+    """Write code to `path` under `root` among `files`, returning its location."""
+    for name, text in {**(files or {}), path or "temp_app.py": code}.items():
+        target = root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text)
+    return root / (path or "temp_app.py")
+
+
+def _forget_modules(root: Path) -> None:
+    """Drop modules loaded from files under `root` from sys.modules."""
+    prefix = os.path.join(os.path.realpath(root), "")
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.realpath(path).startswith(prefix):
+            del sys.modules[name]
+
+
+def _set_base_path(module: ModuleType, module_path: Path) -> None:
+    """Resolve CSS_PATH of the module's apps and screens against its file.
+
+    Textual otherwise looks the file up through sys.modules, where the
+    temporary module isn't registered.
+    """
+    from textual.app import App
+    from textual.screen import Screen
+
+    for value in vars(module).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, (App, Screen))
+            and value.__module__ == module.__name__
+            and "_BASE_PATH" not in vars(value)
+        ):
+            value._BASE_PATH = str(module_path)
+
+
+def _module_app_class(module: ModuleType, code: str) -> type:
+    """Return the App class defined by code, or a preview app for its Screen."""
+    app_class_name = _extract_app_class_name(code)
+    screen_class_name = _extract_screen_class_name(code)
+    if app_class_name:
+        app_class = getattr(module, app_class_name, None)
+    elif screen_class_name:
+        screen_class = getattr(module, screen_class_name, None)
+        app_class = screen_class and _screen_preview_app(screen_class)
     else:
-        return asyncio.run(coro)
+        raise AppLoadError("No App class found")
+
+    if app_class is None:
+        raise AppLoadError(f"Class {app_class_name or screen_class_name} not found")
+    return app_class
+
+
+@contextmanager
+def _load_app_class(
+    code: str, path: str | None = None, files: dict[str, str] | None = None
+) -> Iterator[type]:
+    """Import code as a temporary module and yield its App class."""
+    with _load_module(code, path, files) as module:
+        yield _module_app_class(module, code)
+
+
+def _screen_text(screen) -> str:
+    """Return the text currently composited on a screen."""
+    lines = [strip.text.rstrip() for strip in screen._compositor.render_strips()]
+    return "\n".join(lines).rstrip("\n") or "App rendered"
+
 
+async def _run_app_async(
+    code: str | AbstractContextManager[type],
+    actions: list[tuple[str, ...]] | None = None,
+    size: tuple[int, int] = (80, 24),
+    instrument: list[str] | None = None,
+) -> SnapshotResult:
+    """Run an app asynchronously with Pilot, accounting for its memory use.
 
-def run_app_pilot(code: str) -> SnapshotResult:
+    ``code`` is the app's source, or a context manager that yields an App
+    class that has already been loaded.
+    """
+    with memory_monitor.track() as memory:
+        result = await _run_app(code, actions, size, instrument or [])
+    result.metrics["memory"] = memory.as_dict()
+    return result
+
+
+async def _run_app(
+    code: str | AbstractContextManager[type],
+    actions: list[tuple[str, ...]] | None,
+    size: tuple[int, int],
+    instrument: list[str],
+) -> SnapshotResult:
+    """Run an app with Pilot, apply actions and capture the screen."""
+    try:
+        probe_run = ProbeRun(instrument)
+        loader = _load_app_class(code) if isinstance(code, str) else code
+        with loader as app_class:
+            app = app_class()
+
+            with probe_run.activate(app):
+                async with app.run_test(size=size) as pilot:
+                    for action in actions or []:
+                        probe_run.mark(action_label(action))
+                        try:
+                            await _perform_action(app, pilot, action)
+                        except Exception as e:
+                            if action[0] == "click":
+                                return SnapshotResult(
+                                    success=False, error=f"Click failed: {e}"
+                                )
+                            raise
+
+                    probe_run.finish(app)
+                    output = _screen_text(app.screen)
+
+        return SnapshotResult(success=True, output=output, metrics=probe_run.report())
+
+    except Exception as e:
+        return SnapshotResult(success=False, error=str(e))
+
+
+def _run_sync(coro):
+    """Run an async coroutine synchronously on the shared pilot loop."""
+    return pilot_loop.run(pilot_loop.limited(coro))
+
+
+def run_app_pilot(
+    code: str, isolation: str = "none", instrument: list[str] | None = None
+) -> SnapshotResult:
     """Run an app with Textual Pilot for testing.
 
     Args:
         code: Python code containing a Textual App class.
+        isolation: "none" to run in the server process, or an executor
+            backend ("auto", "subinterpreter", "process") to run the app in
+            an isolated interpreter.
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
 
     Returns:
         SnapshotResult with the rendered output or error.
     """
     try:
+        code, path, files = resolve_files(code)
         # Check for syntax errors first
         compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return SnapshotResult(success=False, error=str(e))
     except SyntaxError as e:
         return SnapshotResult(success=False, error=f"Syntax error: {e}")
 
+    if isolation != "none":
+        job = PilotJob(code, instrument=instrument or [], path=path, files=files)
+        return _run_isolated([job], isolation)[0]
+
     try:
-        return _run_sync(_run_app_async(code))
+        loader = _load_app_class(code, path, files)
+        return _run_sync(_run_app_async(loader, instrument=instrument))
     except Exception as e:
         return SnapshotResult(success=False, error=str(e))
 
 
-def take_snapshot(code: str) -> SnapshotResult:
+def take_snapshot(code: str, width: int = 80, height: int = 24) -> SnapshotResult:
     """Capture app output as a text snapshot.
 
     Args:
         code: Python code containing a Textual App class.
+        width: Terminal width in columns.
+        height: Terminal height in rows.
 
     Returns:
         SnapshotResult with the captured snapshot.
     """
-    return run_app_pilot(code)
-
+    try:
+        code, path, files = resolve_files(code)
+        compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return SnapshotResult(success=False, error=str(e))
+    except SyntaxError as e:
+        return SnapshotResult(success=False, error=f"Syntax error: {e}")
 
-def simulate_keys(code: str, keys: list[str]) -> SnapshotResult:
-    """Simulate keyboard input in a Textual app.
+    try:
+        loader = _load_app_class(code, path, files)
+        return _run_sync(_run_app_async(loader, size=(width, height)))
+    except Exception as e:
+        return SnapshotResult(success=False, error=str(e))
 
-    Args:
-        code: Python code containing a Textual App class.
-        keys: List of key names to press (e.g., ["tab", "enter", "q"]).
 
-    Returns:
-        SnapshotResult after key simulation.
-    """
+def _run_pilot_actions(
+    code: str,
+    actions: list[tuple[str, ...]],
+    instrument: list[str] | None = None,
+) -> SnapshotResult:
+    """Syntax-check code, then run it with Pilot applying the given actions."""
     try:
+        code, path, files = resolve_files(code)
         compile(code, "<string>", "exec")
+    except WorkspaceError as e:
+        return SnapshotResult(success=False, error=str(e))
     except SyntaxError as e:
         return SnapshotResult(success=False, error=f"Syntax error: {e}")
 
-    actions = [("press", key) for key in keys]
-
     try:
-        return _run_sync(_run_app_async(code, actions))
+        loader = _load_app_class(code, path, files)
+        return _run_sync(_run_app_async(loader, actions, instrument=instrument))
     except Exception as e:
         return SnapshotResult(success=False, error=str(e))
 
 
-def simulate_click(code: str, selector: str) -> SnapshotResult:
+def simulate_keys(
+    code: str, keys: list[str], instrument: list[str] | None = None
+) -> SnapshotResult:
+    """Simulate keyboard input in a Textual app.
+
+    Args:
+        code: Python code containing a Textual App class.
+        keys: List of key names to press (e.g., ["tab", "enter", "q"]).
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        SnapshotResult after key simulation.
+    """
+    return _run_pilot_actions(code, [("press", key) for key in keys], instrument)
+
+
+def simulate_click(
+    code: str, selector: str, instrument: list[str] | None = None
+) -> SnapshotResult:
     """Simulate a mouse click on a widget.
 
     Args:
         code: Python code containing a Textual App class.
         selector: CSS selector for the widget to click.
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
 
     Returns:
         SnapshotResult after click simulation.
     """
+    return _run_pilot_actions(code, [("click", selector)], instrument)
+
+
+def type_text(
+    code: str,
+    text: str,
+    selector: str | None = None,
+    as_keys: bool = False,
+    instrument: list[str] | None = None,
+) -> SnapshotResult:
+    """Type a whole block of text into a Textual app in one operation.
+
+    By default the text is delivered as a single paste event, which Input
+    and TextArea insert in one step. With ``as_keys`` every character is
+    sent as a key event instead, queued in one burst with a single settle
+    at the end, for widgets that only react to key presses.
+
+    Args:
+        code: Python code containing a Textual App class.
+        text: The text to type.
+        selector: Optional CSS selector of the widget to focus first.
+        as_keys: Send individual key events instead of a paste.
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        SnapshotResult after the text has been typed.
+    """
+    actions: list[tuple[str, ...]] = []
+    if selector:
+        actions.append(("focus", selector))
+    if as_keys:
+        actions.append(("keys", *text))
+    else:
+        actions.append(("type", text))
+    return _run_pilot_actions(code, actions, instrument)
+
+
+def repeat_key(
+    code: str, key: str, count: int, instrument: list[str] | None = None
+) -> SnapshotResult:
+    """Press a single key many times in one burst.
+
+    Args:
+        code: Python code containing a Textual App class.
+        key: Key name to press (e.g., "down").
+        count: Number of times to press it.
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        SnapshotResult after the key presses.
+    """
+    if count < 1 or count > MAX_SCRIPT_EVENTS:
+        return SnapshotResult(
+            success=False,
+            error=f"count must be between 1 and {MAX_SCRIPT_EVENTS}",
+        )
+    return _run_pilot_actions(code, [("keys", *([key] * count))], instrument)
+
+
+def run_key_script(
+    code: str, script: str, instrument: list[str] | None = None
+) -> SnapshotResult:
+    """Run a compact key script against a Textual app.
+
+    Scripts mix key names, quoted text and ``pause`` markers, and any item
+    or parenthesised group can be repeated with ``*N``. For example
+    ``"hello" enter (down space)*100 pause ctrl+s`` types a word, presses
+    enter, toggles a hundred rows, settles, then saves.
+
+    Args:
+        code: Python code containing a Textual App class.
+        script: The key script to run.
+        instrument: Probes to attach to the run, by name. Their findings
+            are returned in metrics; see tui_builder.tools.probes.
+
+    Returns:
+        SnapshotResult after the script has been applied.
+    """
     try:
-        compile(code, "<string>", "exec")
+        actions = parse_key_script(script)
+    except KeyScriptError as e:
+        return SnapshotResult(success=False, error=f"Invalid key script: {e}")
+    return _run_pilot_actions(code, actions, instrument)
+
+
+async def _run_pilot_job(job: PilotJob) -> SnapshotResult:
+    """Check, compile and run a single batch job."""
+    try:
+        compile(job.code, "<string>", "exec")
     except SyntaxError as e:
         return SnapshotResult(success=False, error=f"Syntax error: {e}")
 
-    actions = [("click", selector)]
+    try:
+        actions = parse_key_script(job.script)
+    except KeyScriptError as e:
+        return SnapshotResult(success=False, error=f"Invalid key script: {e}")
+
+    start = perf_counter()
+    result = await _run_app_async(
+        _load_app_class(job.code, job.path, job.files),
+        actions,
+        size=(job.width, job.height),
+        instrument=job.instrument,
+    )
+    result.metrics["duration_ms"] = (perf_counter() - start) * 1000
+    return result
+
+
+async def _run_pilot_jobs(
+    jobs: list[PilotJob], max_concurrency: int | None
+) -> list[SnapshotResult]:
+    """Run jobs concurrently on the current loop, each in its own context."""
+    import asyncio
+
+    batch_semaphore = asyncio.Semaphore(max_concurrency or len(jobs) or 1)
+
+    async def run_job(job: PilotJob) -> SnapshotResult:
+        async with batch_semaphore:
+            return await pilot_loop.limited(_run_pilot_job(job))
+
+    tasks = [pilot_loop.isolate(run_job(job)) for job in jobs]
+    return list(await asyncio.gather(*tasks))
+
+
+def _run_isolated(
+    jobs: list[PilotJob], isolation: str, max_concurrency: int | None = None
+) -> list[SnapshotResult]:
+    """Run jobs on an isolated executor backend."""
+    from tui_builder.tools.executor import get_pilot_executor
 
     try:
-        return _run_sync(_run_app_async(code, actions))
-    except Exception as e:
-        return SnapshotResult(success=False, error=str(e))
+        executor = get_pilot_executor(isolation)
+    except ValueError as e:
+        return [SnapshotResult(success=False, error=str(e)) for _ in jobs]
+    return executor.run_all(jobs, max_concurrency)
+
+
+def run_pilot_batch(
+    jobs: list[PilotJob],
+    max_concurrency: int | None = None,
+    isolation: str = "none",
+) -> list[SnapshotResult]:
+    """Run several apps concurrently with Pilot.
+
+    By default each job runs headless in its own task and context on a
+    single event loop, so apps are isolated from each other while their
+    waits for message processing overlap. The number of simultaneous runs
+    is bounded by the shared pilot loop limit and, if given, by
+    ``max_concurrency``. With an ``isolation`` backend the jobs run in
+    subinterpreters or worker processes instead.
+
+    Args:
+        jobs: Apps to run, each with an optional key script, size and probes.
+        max_concurrency: Optional limit for this batch.
+        isolation: "none", or an executor backend ("auto", "subinterpreter",
+            "process").
+
+    Returns:
+        A SnapshotResult for each job, in the order given.
+    """
+    if max_concurrency is not None and max_concurrency < 1:
+        return [
+            SnapshotResult(success=False, error="max_concurrency must be at least 1")
+            for _ in jobs
+        ]
+    # Workspaces live in this process, so references are resolved before
+    # jobs are sent to other interpreters.
+    results: list[SnapshotResult | None] = [None] * len(jobs)
+    runnable = []
+    for index, job in enumerate(jobs):
+        try:
+            code, path, files = resolve_files(job.code)
+            runnable.append((index, replace(job, code=code, path=path, files=files)))
+        except WorkspaceError as e:
+            results[index] = SnapshotResult(success=False, error=str(e))
+    resolved = [job for _, job in runnable]
+    if isolation != "none":
+        outcomes = _run_isolated(resolved, isolation, max_concurrency)
+    else:
+        outcomes = pilot_loop.run(_run_pilot_jobs(resolved, max_concurrency))
+    for (index, _), outcome in zip(runnable, outcomes, strict=True):
+        results[index] = outcome
+    return results
 
 
 def generate_test_cases(code: str) -> str:
@@ -297,6 +831,194 @@ class Test{app_class_name}:
 '''
 
 
+@dataclass
+class PerfTestsResult:
+    """Result of generating performance tests."""
+
+    success: bool = True
+    code: str = ""
+    budgets: dict[str, Any] = field(default_factory=dict)
+    calibration: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def _app_binding_keys(app_class: type) -> list[str]:
+    """Keys bound by the app's own classes, other than ones that quit."""
+    keys = []
+    for cls in app_class.__mro__:
+        if cls.__module__.startswith("textual."):
+            continue
+        for binding in cls.__dict__.get("BINDINGS", []):
+            if isinstance(binding, tuple):
+                key, action = binding[:2]
+            else:
+                key, action = binding.key, binding.action
+            if action not in ("quit", "app.quit"):
+                keys.append(key.split(",")[0].strip())
+    return list(dict.fromkeys(keys))
+
+
+async def _calibrate_perf(
+    app_class: type, keys: list[str], size: tuple[int, int], runs: int
+) -> dict[str, Any]:
+    """Measure the app the way the generated tests will, several times over."""
+    return {
+        "startup_ms": [await measure_startup_ms(app_class, size) for _ in range(runs)],
+        "keys_ms": {
+            key: [await measure_key_ms(app_class, size, key) for _ in range(runs)]
+            for key in keys
+        },
+        "peak_mb": [await measure_peak_mb(app_class, size, keys) for _ in range(runs)],
+    }
+
+
+def _budget(samples: list[float], headroom: float, floor: float) -> float:
+    """The worst calibrated sample with headroom, rounded up to one decimal."""
+    return max(math.ceil(max(samples) * headroom * 10) / 10, floor)
+
+
+def generate_perf_tests(
+    code: str,
+    module: str = "app",
+    keys: list[str] | None = None,
+    headroom: float = 2.0,
+    runs: int = PERF_CALIBRATION_RUNS,
+    width: int = 80,
+    height: int = 24,
+) -> PerfTestsResult:
+    """Generate pytest tests that hold an app to calibrated performance budgets.
+
+    The app is first run several times to calibrate: startup time, the time
+    each key takes to be handled and peak memory are measured exactly as
+    the generated tests measure them. Each budget is the worst calibrated
+    value times ``headroom``, with a floor of 10 ms or 1 MB so very fast
+    measurements don't make the tests flaky. The tests import the app from
+    ``module`` and the measurements from ``tui_builder.perf``, so they need
+    pytest and tui_builder installed.
+
+    Args:
+        code: Python code containing a Textual App class.
+        module: Module the tests import the app class from.
+        keys: Keys to give latency budgets. Defaults to the keys in the
+            app's own BINDINGS, except those bound to quit.
+        headroom: Multiplier applied to the worst calibrated measurement.
+        runs: Calibration runs per measurement.
+        width: Terminal width in cells.
+        height: Terminal height in cells.
+
+    Returns:
+        PerfTestsResult with the test code, the budgets and the calibration
+        measurements they were derived from.
+    """
+    if not 1 <= runs <= MAX_PERF_CALIBRATION_RUNS:
+        return PerfTestsResult(
+            success=False,
+            error=f"runs must be between 1 and {MAX_PERF_CALIBRATION_RUNS}",
+        )
+    if headroom < 1:
+        return PerfTestsResult(success=False, error="headroom must be at least 1")
+    if not module.replace(".", "_").isidentifier():
+        return PerfTestsResult(success=False, error=f"Invalid module name: {module}")
+    try:
+        code, path, files = resolve_files(code)
+    except WorkspaceError as e:
+        return PerfTestsResult(success=False, error=str(e))
+    app_class_name = _extract_app_class_name(code)
+    if not app_class_name:
+        return PerfTestsResult(success=False, error="No App class found")
+    try:
+        compile(code, "<string>", "exec")
+    except SyntaxError as e:
+        return PerfTestsResult(success=False, error=f"Syntax error: {e}")
+
+    size = (width, height)
+    try:
+        with (
+            memory_monitor.track(),
+            _load_app_class(code, path, files) as app_class,
+        ):
+            if keys is None:
+                keys = _app_binding_keys(app_class)
+            calibration = _run_sync(_calibrate_perf(app_class, keys, size, runs))
+    except Exception as e:
+        return PerfTestsResult(success=False, error=f"Calibration failed: {e}")
+
+    budgets = {
+        "startup_ms": _budget(calibration["startup_ms"], headroom, MIN_TIME_BUDGET_MS),
+        "keys_ms": {
+            key: _budget(samples, headroom, MIN_TIME_BUDGET_MS)
+            for key, samples in calibration["keys_ms"].items()
+        },
+        "peak_mb": _budget(calibration["peak_mb"], headroom, MIN_MEMORY_BUDGET_MB),
+    }
+    return PerfTestsResult(
+        code=_perf_test_code(app_class_name, module, size, budgets, headroom, runs),
+        budgets=budgets,
+        calibration=calibration,
+    )
+
+
+def _perf_test_code(
+    app_class_name: str,
+    module: str,
+    size: tuple[int, int],
+    budgets: dict[str, Any],
+    headroom: float,
+    runs: int,
+) -> str:
+    """Write the pytest module that checks the app against its budgets.
+
+    A key latency test is only included when some keys have budgets.
+    """
+    pytest_import = key_test = ""
+    if budgets["keys_ms"]:
+        pytest_import = "\nimport pytest\n"
+        key_test = f'''
+
+@pytest.mark.parametrize("key", list(KEY_BUDGETS_MS))
+def test_key_latency(key):
+    """Each key is handled within its budget."""
+    elapsed = asyncio.run(measure_key_ms({app_class_name}, SIZE, key))
+    assert elapsed < KEY_BUDGETS_MS[key], (
+        f"{{key!r}} took {{elapsed:.1f}} ms, budget {{KEY_BUDGETS_MS[key]}} ms"
+    )
+'''
+    return f'''"""Performance budgets for {app_class_name}.
+
+Each budget is the worst of {runs} calibration runs multiplied by {headroom:g}.
+Regenerate them with generate_perf_tests after an intended change in
+performance.
+"""
+
+import asyncio
+{pytest_import}
+from tui_builder.perf import measure_key_ms, measure_peak_mb, measure_startup_ms
+from {module} import {app_class_name}
+
+SIZE = {size!r}
+STARTUP_BUDGET_MS = {budgets["startup_ms"]!r}
+KEY_BUDGETS_MS = {budgets["keys_ms"]!r}
+PEAK_MEMORY_BUDGET_MB = {budgets["peak_mb"]!r}
+
+
+def test_startup_time():
+    """The app starts and settles within budget."""
+    elapsed = asyncio.run(measure_startup_ms({app_class_name}, SIZE))
+    assert elapsed < STARTUP_BUDGET_MS, (
+        f"Startup took {{elapsed:.1f}} ms, budget {{STARTUP_BUDGET_MS}} ms"
+    )
+{key_test}
+
+def test_peak_memory():
+    """Starting the app and pressing every key stays within the memory budget."""
+    keys = list(KEY_BUDGETS_MS)
+    peak = asyncio.run(measure_peak_mb({app_class_name}, SIZE, keys))
+    assert peak < PEAK_MEMORY_BUDGET_MB, (
+        f"Peak memory {{peak:.1f}} MB, budget {{PEAK_MEMORY_BUDGET_MB}} MB"
+    )
+'''
+
+
 def compare_snapshots(snapshot1: str, snapshot2: str) -> CompareResult:
     """Compare two snapshots for differences.
 
@@ -329,5 +1051,10 @@ def register_testing_tools(mcp: FastMCP) -> None:
     mcp.tool()(take_snapshot)
     mcp.tool()(simulate_keys)
     mcp.tool()(simulate_click)
+    mcp.tool()(type_text)
+    mcp.tool()(repeat_key)
+    mcp.tool()(run_key_script)
+    mcp.tool()(run_pilot_batch)
     mcp.tool()(generate_test_cases)
+    mcp.tool()(generate_perf_tests)
     mcp.tool()(compare_snapshots)
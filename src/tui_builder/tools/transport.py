@@ -0,0 +1,63 @@
+"""Shared-memory transport for large results from isolated workers.
+
+Results returned by executor workers are pickled and sent back through a
+pipe, which copies them several times on the way. Large results, such as
+snapshots of big terminals or detailed probe reports, are written into a
+shared memory segment instead, and only a small handle to it goes through
+the pipe. The server reads the result straight out of the segment and then
+frees it.
+"""
+
+import pickle
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any
+
+SHARED_RESULT_MIN_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SharedResult:
+    """A handle to a pickled result held in a shared memory segment."""
+
+    name: str
+    size: int
+
+
+def export_result(result: Any, min_bytes: int = SHARED_RESULT_MIN_BYTES) -> Any:
+    """Move a large result into shared memory, returning a handle to it.
+
+    Results smaller than `min_bytes` once pickled, or that can't be placed in
+    shared memory, are returned unchanged to travel the usual way.
+    """
+    data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) < min_bytes:
+        return result
+    try:
+        segment = shared_memory.SharedMemory(create=True, size=len(data))
+    except OSError:
+        return result
+    try:
+        segment.buf[: len(data)] = data
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    return SharedResult(segment.name, len(data))
+
+
+def import_result(value: Any) -> Any:
+    """Return the result a worker sent, freeing its shared memory segment.
+
+    Values that aren't SharedResult handles are returned unchanged.
+    """
+    if not isinstance(value, SharedResult):
+        return value
+    segment = shared_memory.SharedMemory(name=value.name)
+    try:
+        with segment.buf[: value.size] as view:
+            return pickle.loads(view)
+    finally:
+        segment.close()
+        segment.unlink()
@@ -1,10 +1,14 @@
 """Validation tools for TUI applications."""
 
 import re
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
 from mcp.server.fastmcp import FastMCP
 
+from tui_builder.tools.tcss import parse_tcss
+from tui_builder.tools.workspaces import WorkspaceError, cached, read_reference
+
 # Valid Textual CSS properties
 TEXTUAL_CSS_PROPERTIES = {
     "align",
@@ -105,37 +109,48 @@ class ValidationResult:
     warnings: list[str] = field(default_factory=list)
 
 
+def _check_source(
+    kind: str, source: str, check: Callable[[str], ValidationResult]
+) -> ValidationResult:
+    """Run a check on source text or a workspace file, cached by its hash."""
+    try:
+        text, digest = read_reference(source)
+    except WorkspaceError as e:
+        return ValidationResult(valid=False, errors=[str(e)])
+    if digest is None:
+        return check(text)
+    return cached((kind, digest), lambda: check(text))
+
+
 def validate_css(css: str) -> ValidationResult:
     """Validate Textual CSS syntax.
 
+    The stylesheet is parsed in a single pass. Syntax errors, such as
+    unbalanced braces or a declaration missing its value, are reported as
+    errors and unknown properties as warnings, each with its line and column.
+
     Args:
-        css: The CSS string to validate.
+        css: The CSS string to validate. Also accepts a workspace
+            reference such as ``workspace://<id>/<path>``.
 
     Returns:
         ValidationResult with any errors or warnings.
     """
-    result = ValidationResult()
-
-    if not css.strip():
-        return result
-
-    # Check for balanced braces
-    open_braces = css.count("{")
-    close_braces = css.count("}")
-    if open_braces != close_braces:
-        result.valid = False
-        result.errors.append(
-            f"Unbalanced braces: {open_braces} opening, {close_braces} closing"
-        )
-        return result
+    return _check_source("validate_css", css, _validate_css)
 
-    # Extract property names and check them
-    property_pattern = re.compile(r"([a-zA-Z-]+)\s*:")
-    for match in property_pattern.finditer(css):
-        prop_name = match.group(1).lower()
-        if prop_name not in TEXTUAL_CSS_PROPERTIES:
-            result.warnings.append(f"Unknown CSS property: {prop_name}")
 
+def _validate_css(css: str) -> ValidationResult:
+    result = ValidationResult()
+    stylesheet = parse_tcss(css)
+    result.errors.extend(str(error) for error in stylesheet.errors)
+    result.valid = not result.errors
+    for rule in stylesheet.walk_rules():
+        for declaration in rule.declarations:
+            if declaration.name.lower() not in TEXTUAL_CSS_PROPERTIES:
+                result.warnings.append(
+                    f"line {declaration.line}, column {declaration.column}: "
+                    f"Unknown CSS property: {declaration.name}"
+                )
     return result
 
 
@@ -143,11 +158,16 @@ def lint_widget(code: str) -> ValidationResult:
     """Lint widget code for best practices.
 
     Args:
-        code: Python code containing a widget class.
+        code: Python code containing a widget class. Also accepts a workspace
+            reference such as ``workspace://<id>/<path>``.
 
     Returns:
         ValidationResult with any errors or warnings.
     """
+    return _check_source("lint_widget", code, _lint_widget)
+
+
+def _lint_widget(code: str) -> ValidationResult:
     result = ValidationResult()
 
     # Check for class definition
@@ -180,11 +200,16 @@ def check_accessibility(code: str) -> ValidationResult:
     """Check code for accessibility best practices.
 
     Args:
-        code: Python code to check for accessibility.
+        code: Python code to check for accessibility. Also accepts a workspace
+            reference such as ``workspace://<id>/<path>``.
 
     Returns:
         ValidationResult with any errors or warnings.
     """
+    return _check_source("check_accessibility", code, _check_accessibility)
+
+
+def _check_accessibility(code: str) -> ValidationResult:
     result = ValidationResult()
 
     # Check for BINDINGS
@@ -0,0 +1,391 @@
+"""Workspaces: source files uploaded once and referenced by ID.
+
+Tools that take source code also accept a reference to a workspace file in
+its place: ``workspace://<id>`` for the workspace's entry file, or
+``workspace://<id>/<path>`` for any other file. Follow-up changes are sent
+as small edits instead of whole files.
+
+Every file is stored with the SHA-256 of its content. Clients can compare
+hashes to skip uploading files the server already has, and checks that
+only depend on a file's content are cached by its hash.
+"""
+
+import copy
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Any, TypeVar
+
+from mcp.server.fastmcp import FastMCP
+
+T = TypeVar("T")
+
+WORKSPACE_SCHEME = "workspace://"
+MAX_WORKSPACES = 64
+MAX_WORKSPACE_BYTES = 4 * 1024 * 1024
+MAX_CACHED_RESULTS = 1024
+
+
+@dataclass
+class WorkspaceResult:
+    """Result of a workspace operation."""
+
+    success: bool = True
+    workspace_id: str = ""
+    entry: str | None = None
+    files: dict[str, str] = field(default_factory=dict)
+    changed: list[str] = field(default_factory=list)
+    size: int = 0
+    error: str | None = None
+
+
+class WorkspaceError(Exception):
+    """Raised when a workspace or one of its files can't be used."""
+
+
+def content_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a file's text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _check_path(path: str) -> str:
+    """Normalise a workspace path, rejecting ones that leave the workspace."""
+    parts = PurePosixPath(path).parts
+    if not parts or PurePosixPath(path).is_absolute() or ".." in parts:
+        raise WorkspaceError(f"Invalid workspace path: '{path}'")
+    return PurePosixPath(*parts).as_posix()
+
+
+class Workspace:
+    """A set of source files with per-file content hashes."""
+
+    def __init__(self, files: dict[str, str], entry: str | None = None) -> None:
+        self.workspace_id = uuid.uuid4().hex[:12]
+        self.files: dict[str, str] = {}
+        self.hashes: dict[str, str] = {}
+        self.entry: str | None = None
+        self._lock = threading.Lock()
+        self.update(files=files, entry=entry)
+
+    @property
+    def size(self) -> int:
+        """Total size of the files in bytes."""
+        return sum(len(text.encode()) for text in self.files.values())
+
+    def update(
+        self,
+        files: dict[str, str] | None = None,
+        edits: list[dict[str, str]] | None = None,
+        delete: list[str] | None = None,
+        entry: str | None = None,
+    ) -> list[str]:
+        """Apply changes all at once, or not at all.
+
+        Returns:
+            The paths whose content changed, was added or was deleted.
+
+        Raises:
+            WorkspaceError: If a change is invalid.
+        """
+        with self._lock:
+            new_files = dict(self.files)
+            for path, text in (files or {}).items():
+                new_files[_check_path(path)] = text
+            for edit in edits or []:
+                path = _check_path(edit.get("path", ""))
+                _apply_edit(new_files, path, edit.get("old", ""), edit.get("new", ""))
+            for path in delete or []:
+                if new_files.pop(_check_path(path), None) is None:
+                    raise WorkspaceError(f"No file '{path}' to delete")
+            new_entry = _check_path(entry) if entry else self.entry
+            if new_entry not in new_files:
+                new_entry = _default_entry(new_files)
+            size = sum(len(text.encode()) for text in new_files.values())
+            if size > MAX_WORKSPACE_BYTES:
+                raise WorkspaceError(
+                    f"Workspace would hold {size} bytes (limit {MAX_WORKSPACE_BYTES})"
+                )
+
+            hashes = {
+                path: self.hashes[path]
+                if self.files.get(path) == text
+                else content_hash(text)
+                for path, text in new_files.items()
+            }
+            changed = sorted(
+                path
+                for path in hashes.keys() | self.hashes.keys()
+                if hashes.get(path) != self.hashes.get(path)
+            )
+            self.files, self.hashes, self.entry = new_files, hashes, new_entry
+            return changed
+
+    def read(self, path: str | None = None) -> tuple[str, str]:
+        """Return a file's text and hash, defaulting to the entry file.
+
+        Raises:
+            WorkspaceError: If the file doesn't exist.
+        """
+        with self._lock:
+            path = self._find(path)
+            return self.files[path], self.hashes[path]
+
+    def checkout(self, path: str | None = None) -> tuple[str, dict[str, str]]:
+        """Return a file's path, defaulting to the entry file, with all files.
+
+        The files are read together, so they are consistent with each other.
+
+        Raises:
+            WorkspaceError: If the file doesn't exist.
+        """
+        with self._lock:
+            return self._find(path), dict(self.files)
+
+    def snapshot(self) -> dict[str, str]:
+        """Return a copy of all files, read together."""
+        with self._lock:
+            return dict(self.files)
+
+    def _find(self, path: str | None) -> str:
+        """Normalise the path of an existing file. Call with the lock held."""
+        if path is None:
+            if self.entry is None:
+                raise WorkspaceError(
+                    f"Workspace '{self.workspace_id}' has no entry file; "
+                    f"reference a file as {WORKSPACE_SCHEME}"
+                    f"{self.workspace_id}/<path>"
+                )
+            path = self.entry
+        path = _check_path(path)
+        if path not in self.files:
+            raise WorkspaceError(f"No file '{path}' in workspace '{self.workspace_id}'")
+        return path
+
+    def result(self, changed: list[str] | None = None) -> WorkspaceResult:
+        """Describe the workspace by its files' hashes."""
+        with self._lock:
+            return WorkspaceResult(
+                workspace_id=self.workspace_id,
+                entry=self.entry,
+                files=dict(sorted(self.hashes.items())),
+                changed=changed or [],
+                size=self.size,
+            )
+
+
+def _apply_edit(files: dict[str, str], path: str, old: str, new: str) -> None:
+    """Replace the single occurrence of `old` in a file with `new`."""
+    if path not in files:
+        raise WorkspaceError(f"No file '{path}' to edit")
+    count = files[path].count(old) if old else 0
+    if count != 1:
+        found = "not found" if count == 0 else f"found {count} times"
+        raise WorkspaceError(f"Edit text for '{path}' must occur exactly once, {found}")
+    files[path] = files[path].replace(old, new, 1)
+
+
+def _default_entry(files: dict[str, str]) -> str | None:
+    """Pick app.py, or the only Python file, as the entry file."""
+    if "app.py" in files:
+        return "app.py"
+    modules = [path for path in files if path.endswith(".py")]
+    return modules[0] if len(modules) == 1 else None
+
+
+_workspaces: dict[str, Workspace] = {}
+_workspaces_lock = threading.Lock()
+_cache: OrderedDict[tuple, Any] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_workspace_by_id(workspace_id: str) -> Workspace:
+    """Look up a workspace.
+
+    Raises:
+        WorkspaceError: If there is no workspace with that ID.
+    """
+    with _workspaces_lock:
+        workspace = _workspaces.get(workspace_id)
+    if workspace is None:
+        raise WorkspaceError(f"No workspace with ID '{workspace_id}'")
+    return workspace
+
+
+def parse_reference(source: str) -> tuple[str, str | None] | None:
+    """Split a workspace reference into its ID and optional path.
+
+    Returns:
+        None if `source` is not a workspace reference.
+    """
+    if not source.startswith(WORKSPACE_SCHEME):
+        return None
+    workspace_id, _, path = source[len(WORKSPACE_SCHEME) :].strip().partition("/")
+    return workspace_id, path or None
+
+
+def read_reference(source: str) -> tuple[str, str | None]:
+    """Return the text of `source` and its hash if it is a workspace reference.
+
+    Source that isn't a reference is returned unchanged, without a hash.
+
+    Raises:
+        WorkspaceError: If the reference can't be resolved.
+    """
+    reference = parse_reference(source)
+    if reference is None:
+        return source, None
+    workspace_id, path = reference
+    return get_workspace_by_id(workspace_id).read(path)
+
+
+def resolve_source(source: str) -> str:
+    """Return the code a tool should use for `source`.
+
+    Raises:
+        WorkspaceError: If `source` is a reference that can't be resolved.
+    """
+    return read_reference(source)[0]
+
+
+def resolve_files(source: str) -> tuple[str, str | None, dict[str, str]]:
+    """Return the code for `source` with its path and its workspace's files.
+
+    Tools that run code write the files out and run the code from among
+    them, so it can import its sibling modules and load its CSS_PATH files.
+    Source that isn't a reference is returned without a path or files.
+
+    Raises:
+        WorkspaceError: If `source` is a reference that can't be resolved.
+    """
+    reference = parse_reference(source)
+    if reference is None:
+        return source, None, {}
+    workspace_id, path = reference
+    path, files = get_workspace_by_id(workspace_id).checkout(path)
+    return files[path], path, files
+
+
+def cached(key: tuple, compute: Callable[[], T]) -> T:
+    """Return a copy of the cached result for `key`, computing it if needed.
+
+    Keys should include the content hashes the result depends on.
+    """
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return copy.deepcopy(_cache[key])
+    result = compute()
+    with _cache_lock:
+        _cache[key] = copy.deepcopy(result)
+        while len(_cache) > MAX_CACHED_RESULTS:
+            _cache.popitem(last=False)
+    return result
+
+
+def create_workspace(
+    files: dict[str, str], entry: str | None = None
+) -> WorkspaceResult:
+    """Upload a set of source files and get an ID to reference them by.
+
+    Pass ``workspace://<id>`` as the code argument of the pilot, snapshot,
+    session, benchmark, leak, comparison, lint and validation tools to use
+    the entry file, or ``workspace://<id>/<path>`` for another file (for
+    example a .tcss file to validate_css). Apps run beside the rest of
+    their workspace, so they can import its modules and load its CSS files.
+
+    Args:
+        files: File contents keyed by relative path, such as "app.py".
+        entry: The file used for ``workspace://<id>``. Defaults to app.py, or
+            the only Python file.
+
+    Returns:
+        WorkspaceResult with the workspace ID and the SHA-256 of each file.
+    """
+    with _workspaces_lock:
+        if len(_workspaces) >= MAX_WORKSPACES:
+            return WorkspaceResult(
+                success=False,
+                error=f"Too many workspaces (limit {MAX_WORKSPACES})",
+            )
+    try:
+        workspace = Workspace(files, entry)
+    except WorkspaceError as e:
+        return WorkspaceResult(success=False, error=str(e))
+    with _workspaces_lock:
+        _workspaces[workspace.workspace_id] = workspace
+    return workspace.result(changed=sorted(workspace.files))
+
+
+def update_workspace(
+    workspace_id: str,
+    files: dict[str, str] | None = None,
+    edits: list[dict[str, str]] | None = None,
+    delete: list[str] | None = None,
+    entry: str | None = None,
+) -> WorkspaceResult:
+    """Change files in a workspace. Either every change applies or none does.
+
+    Args:
+        workspace_id: ID returned by create_workspace.
+        files: Files to add or replace whole, keyed by path.
+        edits: Small changes, each {"path", "old", "new"}: the text "old"
+            must occur exactly once in the file and is replaced by "new".
+        delete: Paths of files to remove.
+        entry: New entry file.
+
+    Returns:
+        WorkspaceResult with the updated hashes and the paths that changed.
+    """
+    try:
+        workspace = get_workspace_by_id(workspace_id)
+        changed = workspace.update(files, edits, delete, entry)
+    except WorkspaceError as e:
+        return WorkspaceResult(success=False, workspace_id=workspace_id, error=str(e))
+    return workspace.result(changed)
+
+
+def get_workspace(workspace_id: str) -> WorkspaceResult:
+    """List a workspace's files with their SHA-256 hashes.
+
+    Args:
+        workspace_id: ID returned by create_workspace.
+
+    Returns:
+        WorkspaceResult with the entry file and the hash of each file.
+    """
+    try:
+        return get_workspace_by_id(workspace_id).result()
+    except WorkspaceError as e:
+        return WorkspaceResult(success=False, workspace_id=workspace_id, error=str(e))
+
+
+def delete_workspace(workspace_id: str) -> WorkspaceResult:
+    """Free a workspace and its files.
+
+    Args:
+        workspace_id: ID returned by create_workspace.
+
+    Returns:
+        WorkspaceResult indicating whether the workspace was deleted.
+    """
+    with _workspaces_lock:
+        workspace = _workspaces.pop(workspace_id, None)
+    if workspace is None:
+        return WorkspaceResult(
+            success=False,
+            workspace_id=workspace_id,
+            error=f"No workspace with ID '{workspace_id}'",
+        )
+    return WorkspaceResult(workspace_id=workspace_id)
+
+
+def register_workspace_tools(mcp: FastMCP) -> None:
+    """Register workspace tools."""
+    mcp.tool()(create_workspace)
+    mcp.tool()(update_workspace)
+    mcp.tool()(get_workspace)
+    mcp.tool()(delete_workspace)
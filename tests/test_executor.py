@@ -0,0 +1,152 @@
+"""Tests for isolated pilot executors."""
+
+from multiprocessing import shared_memory
+
+import pytest
+
+from tui_builder.tools.executor import (
+    PilotExecutor,
+    resolve_backend,
+    subinterpreters_supported,
+)
+from tui_builder.tools.testing import (
+    PilotJob,
+    SnapshotResult,
+    run_app_pilot,
+    run_pilot_batch,
+)
+from tui_builder.tools.transport import SharedResult, export_result, import_result
+
+APP = """
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class IsolatedApp(App):
+    def compose(self) -> ComposeResult:
+        yield Static("isolated {n}")
+"""
+
+
+class TestResolveBackend:
+    """Tests for resolve_backend."""
+
+    def test_process(self):
+        """The process backend is always available."""
+        assert resolve_backend("process") == "process"
+
+    def test_auto_matches_support(self):
+        """auto picks subinterpreters only where they are supported."""
+        expected = "subinterpreter" if subinterpreters_supported() else "process"
+        assert resolve_backend("auto") == expected
+        assert resolve_backend("subinterpreter") == expected
+
+    def test_unknown_backend(self):
+        """Unknown backends are rejected."""
+        with pytest.raises(ValueError, match="Unknown executor backend"):
+            resolve_backend("threads")
+
+
+class TestPilotExecutor:
+    """Tests for running jobs in isolation."""
+
+    def test_run_all_keeps_order(self):
+        """Results come back in job order."""
+        executor = PilotExecutor("process", max_workers=2)
+        try:
+            jobs = [PilotJob(APP.replace("{n}", str(n))) for n in range(3)]
+            results = executor.run_all(jobs, max_in_flight=2)
+        finally:
+            executor.shutdown()
+        assert [r.success for r in results] == [True, True, True]
+        for n, result in enumerate(results):
+            assert f"isolated {n}" in result.output
+
+    def test_recovers_from_crashed_worker(self):
+        """A job that kills its worker fails without breaking the executor."""
+        crash = APP.replace("{n}", "0") + "\nimport os\nos._exit(1)\n"
+        executor = PilotExecutor("process", max_workers=1)
+        try:
+            crashed = executor.run_all([PilotJob(crash)])[0]
+            recovered = executor.run_all([PilotJob(APP.replace("{n}", "1"))])[0]
+        finally:
+            executor.shutdown()
+        assert not crashed.success
+        assert "crashed" in crashed.error
+        assert recovered.success
+        assert "isolated 1" in recovered.output
+
+    def test_crash_fails_every_job_on_the_pool_with_an_error(self):
+        """Jobs lost with a crashed worker report why, and the executor recovers."""
+        crash = APP.replace("{n}", "0") + "\nimport os\nos._exit(1)\n"
+        executor = PilotExecutor("process", max_workers=1)
+        try:
+            jobs = [PilotJob(crash), PilotJob(APP), PilotJob(APP)]
+            pool = executor._pool
+            results = executor.run_all(jobs)
+            replacement = executor._pool
+            recovered = executor.run_all([PilotJob(APP.replace("{n}", "1"))])[0]
+        finally:
+            executor.shutdown()
+        assert not results[0].success
+        assert all(result.error for result in results)
+        assert replacement is not pool
+        assert recovered.success, recovered.error
+
+    def test_no_new_pool_after_shutdown(self):
+        """Reading a crashed job after shutdown doesn't start new workers."""
+        crash = APP.replace("{n}", "0") + "\nimport os\nos._exit(1)\n"
+        executor = PilotExecutor("process", max_workers=1)
+        future = executor.submit(PilotJob(crash))
+        executor.shutdown()
+        pool = executor._pool
+        result = executor.result(future)
+        assert "crashed" in result.error
+        assert executor._pool is pool
+
+    def test_large_result_uses_shared_memory(self):
+        """A big screen comes back through shared memory, which is then freed."""
+        app = APP.replace('"isolated {n}"', '"\\n".join(["#" * 400] * 200)')
+        executor = PilotExecutor("process", max_workers=1)
+        try:
+            result = executor.run_all([PilotJob(app, width=400, height=200)])[0]
+        finally:
+            executor.shutdown()
+        assert result.success, result.error
+        assert result.output.count("#" * 400) == 200
+        assert result.metrics["shared_memory_bytes"] > len(result.output)
+
+
+class TestSharedResults:
+    """Tests for the shared-memory result transport."""
+
+    def test_small_results_are_unchanged(self):
+        """Results under the threshold are returned as they are."""
+        result = SnapshotResult(output="small")
+        assert export_result(result) is result
+        assert import_result(result) is result
+
+    def test_round_trip_frees_segment(self):
+        """A shared result reads back intact and its segment is unlinked."""
+        result = SnapshotResult(output="x" * 100, metrics={"frames": [1, 2]})
+        handle = export_result(result, min_bytes=0)
+        assert isinstance(handle, SharedResult)
+        assert import_result(handle) == result
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle.name)
+
+
+class TestIsolationOption:
+    """Tests for the isolation parameter of the pilot tools."""
+
+    def test_run_app_pilot_isolated(self):
+        """run_app_pilot can run the app in a worker."""
+        result = run_app_pilot(APP.replace("{n}", "7"), isolation="process")
+        assert result.success
+        assert "isolated 7" in result.output
+
+    def test_batch_unknown_isolation(self):
+        """An unknown isolation backend fails every job with an error."""
+        results = run_pilot_batch([PilotJob(APP), PilotJob(APP)], isolation="bogus")
+        assert len(results) == 2
+        assert all(not r.success for r in results)
+        assert "Unknown executor backend" in results[0].error
@@ -0,0 +1,55 @@
+"""Tests for the shared pilot loop."""
+
+import asyncio
+import contextvars
+
+import pytest
+
+from tui_builder.tools.pilot_loop import PilotLoop
+
+marker: contextvars.ContextVar[str] = contextvars.ContextVar("marker")
+
+
+class TestPilotLoop:
+    """Tests for PilotLoop."""
+
+    def test_runs_coroutine(self):
+        """run returns the coroutine's result."""
+
+        async def answer() -> int:
+            return 42
+
+        assert PilotLoop().run(answer()) == 42
+
+    def test_runs_in_fresh_context(self):
+        """Context variables from the caller don't leak into runs."""
+
+        async def read_marker() -> str:
+            return marker.get("unset")
+
+        marker.set("caller")
+        assert PilotLoop().run(read_marker()) == "unset"
+
+    def test_limits_concurrency(self):
+        """limited never lets more than max_concurrency run at once."""
+        loop = PilotLoop(max_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def job() -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        async def batch() -> None:
+            await asyncio.gather(*(loop.limited(job()) for _ in range(6)))
+
+        loop.run(batch())
+        assert peak == 2
+
+    def test_rejects_invalid_limit(self):
+        """Concurrency limits below one are rejected."""
+        with pytest.raises(ValueError):
+            PilotLoop().set_max_concurrency(0)
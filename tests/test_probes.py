@@ -0,0 +1,483 @@
+"""Tests for pilot run probes."""
+
+from asyncio.events import Handle
+
+import pytest
+
+from tui_builder.tools import probes
+from tui_builder.tools.probes import PROBES, ProbeRun, action_label
+from tui_builder.tools.testing import (
+    PilotJob,
+    run_app_pilot,
+    run_key_script,
+    run_pilot_batch,
+    simulate_click,
+    simulate_keys,
+)
+
+COLLECTING_APP = """
+import gc
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class CollectingApp(App):
+    BINDINGS = [("c", "collect")]
+
+    def compose(self) -> ComposeResult:
+        yield Static("ready")
+
+    def action_collect(self) -> None:
+        gc.collect()
+"""
+
+
+class TestProbeRun:
+    """Tests for ProbeRun."""
+
+    def test_unknown_probe(self):
+        """Unknown probe names are rejected with the available names."""
+        with pytest.raises(ValueError, match="available: .*gc"):
+            ProbeRun(["gc", "bogus"])
+
+    def test_empty_run_is_falsy(self):
+        """A run without probes is falsy and reports nothing."""
+        run = ProbeRun([])
+        assert not run
+        assert run.report() == {}
+
+    def test_duplicates_are_ignored(self):
+        """Naming a probe twice attaches it once."""
+        assert len(ProbeRun(["gc", "gc"]).probes) == 1
+
+    def test_probe_by_name(self):
+        """Attached probes are looked up by name, whatever their order."""
+        run = ProbeRun(["gc", "frames"])
+        assert run.probe("frames") is run.probes[1]
+        with pytest.raises(KeyError):
+            run.probe("loop")
+
+    def test_mark_numbers_actions(self):
+        """Actions are numbered in the order they start."""
+        run = ProbeRun(["gc"])
+        assert run.position() == {"action": "startup", "frame": 0}
+        run.mark("press tab")
+        run.mark("pause")
+        assert run.position()["action"] == "1: pause"
+
+    def test_registry(self):
+        """Probes are registered under their names."""
+        assert PROBES["gc"].name == "gc"
+
+
+def test_action_label():
+    """Actions are summarised briefly."""
+    assert action_label(("press", "tab")) == "press tab"
+    assert action_label(("keys", "a", "b", "c")) == "keys x3"
+    assert action_label(("type", "x" * 30)) == f"type {'x' * 20!r}..."
+    assert action_label(("click", "#ok")) == "click #ok"
+
+
+class TestGCProbe:
+    """Tests for the gc probe."""
+
+    def test_attributes_collection_to_action(self):
+        """A forced collection is reported against the action that caused it."""
+        result = run_key_script(COLLECTING_APP, "c", instrument=["gc"])
+        assert result.success, result.error
+        report = result.metrics["gc"]
+        oldest = report["by_generation"][2]
+        assert oldest["collections"] >= 1
+        assert oldest["max_ms"] > 0
+        assert report["by_action"]["0: keys x1"]["collections"] >= 1
+        assert any(
+            pause["generation"] == 2 and pause["action"] == "0: keys x1"
+            for pause in report["pauses"]
+        )
+
+    def test_not_reported_without_instrument(self):
+        """Runs without probes carry no probe metrics."""
+        result = run_app_pilot(COLLECTING_APP)
+        assert "gc" not in result.metrics
+
+    def test_unknown_probe_fails_run(self):
+        """Asking for an unknown probe fails the run with a clear error."""
+        result = run_app_pilot(COLLECTING_APP, instrument=["bogus"])
+        assert not result.success
+        assert "Unknown probe" in result.error
+
+    def test_batch_jobs_are_measured_separately(self):
+        """Only the instrumented job in a batch gets a GC report."""
+        results = run_pilot_batch(
+            [
+                PilotJob(COLLECTING_APP, script="c", instrument=["gc"]),
+                PilotJob(COLLECTING_APP, script="c"),
+            ]
+        )
+        assert results[0].metrics["gc"]["collections"] >= 1
+        assert "gc" not in results[1].metrics
+
+
+class TestFramesProbe:
+    """Tests for the frames probe."""
+
+    def test_records_frames_per_action(self):
+        """Frames are counted with the widgets painted into them."""
+        result = run_key_script(COLLECTING_APP, "c", instrument=["frames"])
+        assert result.success, result.error
+        report = result.metrics["frames"]
+        assert report["count"] == len(report["frames"]) >= 1
+        painted = [frame for frame in report["frames"] if frame["painted"]]
+        assert painted
+        assert report["max_frame_ms"] >= max(frame["paint_ms"] for frame in painted)
+
+    def test_totals_cover_frames_past_the_record_limit(self, monkeypatch):
+        """Totals and the slowest frame include frames that weren't kept."""
+        monkeypatch.setattr(probes, "MAX_RECORDED_EVENTS", 2)
+        (frames,) = ProbeRun(["frames"]).probes
+        for elapsed in (0.001, 0.001, 0.001, 0.005):
+            frames.on_frame(None, elapsed)
+        report = frames.report()
+        assert report["count"] == 4
+        assert len(report["frames"]) == 2
+        assert report["paint_ms"] == pytest.approx(8.0)
+        assert report["max_frame_ms"] == pytest.approx(5.0)
+
+
+BLOCKING_APP = """
+import time
+from textual.app import App
+from textual.widgets import Static
+
+def fetch():
+    time.sleep(0.2)
+    return "data"
+
+class BlockingApp(App):
+    BINDINGS = [("f", "fetch")]
+
+    def compose(self):
+        yield Static("ready")
+
+    def action_fetch(self):
+        self.query_one(Static).update(fetch())
+"""
+
+
+class TestLoopProbe:
+    """Tests for the loop probe."""
+
+    def test_reports_blocking_handler(self):
+        """A handler that blocks the loop is reported with its stack."""
+        result = run_key_script(BLOCKING_APP, "f", instrument=["loop"])
+        assert result.success, result.error
+        report = result.metrics["loop"]
+        assert report["blocked"] == 1
+        assert report["max_lag_ms"] >= report["threshold_ms"]
+        (block,) = report["blocks"]
+        assert block["ms"] >= 200
+        assert block["action"] == "0: keys x1"
+        assert block["handler"].endswith("in action_fetch")
+        assert block["stack"][-1].endswith("in fetch")
+
+    def test_responsive_app(self):
+        """Apps that don't block report no blocked callbacks."""
+        code = BLOCKING_APP.replace("time.sleep(0.2)", "pass")
+        result = run_key_script(code, "f", instrument=["loop"])
+        assert result.success, result.error
+        report = result.metrics["loop"]
+        assert report["callbacks"] > 0
+        assert report["blocks"] == []
+
+    def test_hook_removed_after_run(self):
+        """Event loop callbacks run unwrapped once no run needs the probe."""
+        original = Handle._run
+        result = run_key_script(BLOCKING_APP, "f", instrument=["loop"])
+        assert result.metrics["loop"]["callbacks"] > 0
+        assert Handle._run is original
+
+
+STORM_APP = """
+import asyncio
+from textual.app import App
+from textual.reactive import reactive
+from textual.widgets import Static
+
+class Counter(Static):
+    count = reactive(0)
+
+    def watch_count(self, value):
+        self.update(str(value))
+
+class StormApp(App):
+    BINDINGS = [("r", "refresh_loop"), ("a", "animate"), ("o", "once")]
+
+    def compose(self):
+        yield Counter(id="counter")
+        yield Static("idle")
+
+    def action_refresh_loop(self):
+        counter = self.query_one(Counter)
+        for _ in range(100):
+            counter.refresh()
+
+    async def action_animate(self):
+        counter = self.query_one(Counter)
+        for _ in range(15):
+            counter.count += 1
+            await asyncio.sleep(0.02)
+
+    def action_once(self):
+        self.query_one(Counter).count += 1
+"""
+
+
+TABLE_APP = """
+from textual.app import App
+from textual.widgets import DataTable
+
+class TableApp(App):
+    def compose(self):
+        yield DataTable(id="table")
+
+    def on_mount(self):
+        table = self.query_one(DataTable)
+        table.add_columns("id", "name")
+        for i in range(200):
+            table.add_row(str(i), f"item {i}")
+"""
+
+
+class TestRefreshProbe:
+    """Tests for the refresh probe."""
+
+    def test_flags_refresh_loop(self):
+        """Refreshing in a loop is flagged even though Textual coalesces it."""
+        result = simulate_keys(STORM_APP, ["r", "o"], instrument=["refresh"])
+        assert result.success, result.error
+        report = result.metrics["refresh"]
+        (flag,) = report["flagged"]
+        assert flag["action"] == "0: press r"
+        assert flag["widget"] == "Counter#counter"
+        assert flag["refreshes"] >= 100
+        once = report["by_action"]["1: press o"]["widgets"]["Counter#counter"]
+        assert once["repaints"] <= 2
+
+    def test_flags_repaint_storm(self):
+        """A widget repainted on every frame of one input is flagged."""
+        result = simulate_keys(STORM_APP, ["a"], instrument=["refresh"])
+        assert result.success, result.error
+        (flag,) = result.metrics["refresh"]["flagged"]
+        assert flag["widget"] == "Counter#counter"
+        assert flag["repaints"] > 10
+
+    def test_unnamed_widgets_are_numbered(self):
+        """Widgets without an ID are told apart by class and order."""
+        result = simulate_keys(STORM_APP, ["o"], instrument=["refresh"])
+        startup = result.metrics["refresh"]["by_action"]["startup"]
+        assert "Static[1]" in startup["widgets"]
+        assert startup["layouts"] >= 1
+
+    def test_counts_line_api_repaints(self):
+        """Widgets that draw line by line are counted when they repaint."""
+        result = simulate_keys(TABLE_APP, ["down"], instrument=["refresh"])
+        assert result.success, result.error
+        widgets = result.metrics["refresh"]["by_action"]["0: press down"]["widgets"]
+        assert widgets["DataTable#table"]["repaints"] >= 1
+
+
+MESSAGE_APP = """
+import time
+from textual.app import App
+from textual.message import Message
+from textual.widgets import Button, Static
+
+class Log(Static):
+    class Line(Message):
+        pass
+
+    def on_log_line(self, message):
+        pass
+
+class MessageApp(App):
+    BINDINGS = [("f", "flood")]
+
+    def compose(self):
+        yield Log(id="log")
+        yield Button("Save", id="save")
+
+    def on_button_pressed(self, event):
+        time.sleep(0.05)
+
+    def action_flood(self):
+        log = self.query_one(Log)
+        for _ in range(100):
+            log.post_message(Log.Line())
+"""
+
+
+class TestMessageProbe:
+    """Tests for the messages probe."""
+
+    def test_reports_slow_handler(self):
+        """Slow handlers show up by message type and in the slow list."""
+        result = simulate_click(MESSAGE_APP, "#save", instrument=["messages"])
+        assert result.success, result.error
+        report = result.metrics["messages"]
+        pressed = report["by_message"]["Button.Pressed"]
+        assert pressed["max_ms"] >= 50
+        assert pressed["slowest_node"] == "MessageApp[1]"
+        assert pressed["p50_ms"] <= pressed["p95_ms"] <= pressed["max_ms"]
+        slow = [
+            entry for entry in report["slow"] if entry["message"] == "Button.Pressed"
+        ]
+        assert slow[0]["action"] == "0: click #save"
+
+    def test_reports_flood(self):
+        """A burst of messages to one widget is reported as a flood."""
+        result = simulate_keys(MESSAGE_APP, ["f"], instrument=["messages"])
+        assert result.success, result.error
+        report = result.metrics["messages"]
+        # Line bubbles, so the screen and app queues flood as well.
+        floods = {flood["node"]: flood for flood in report["floods"]}
+        assert set(floods) == {"Log#log", "Screen#_default", "MessageApp[1]"}
+        assert floods["Log#log"]["max_queue"] >= 100
+        assert report["by_message"]["Log.Line"]["handled"] == 3 * 100
+        assert report["by_action"]["0: press f"]["posted"] >= 100
+
+
+WORKER_APP = """
+import asyncio
+import time
+from textual import work
+from textual.app import App
+from textual.widgets import Static
+
+class WorkerApp(App):
+    BINDINGS = [("l", "load"), ("t", "threads"), ("p", "poll")]
+
+    def compose(self):
+        yield Static("ready")
+
+    def action_load(self):
+        self.fetch()
+
+    @work(exclusive=True)
+    async def fetch(self):
+        await asyncio.sleep(0)
+
+    def action_threads(self):
+        for _ in range(40):
+            self.crunch()
+
+    @work(thread=True, group="crunch")
+    def crunch(self):
+        time.sleep(0.02)
+
+    def action_poll(self):
+        self.poll()
+
+    @work
+    async def poll(self):
+        while True:
+            await asyncio.sleep(0.01)
+"""
+
+
+class TestWorkerProbe:
+    """Tests for the workers probe."""
+
+    def test_records_worker_lifecycle(self):
+        """A finished worker has its states, queue time and duration."""
+        result = run_key_script(WORKER_APP, "l pause", instrument=["workers"])
+        assert result.success, result.error
+        report = result.metrics["workers"]
+        (worker,) = report["workers"]
+        assert worker["name"] == "fetch"
+        assert [state for state, _ in worker["states"]] == [
+            "PENDING",
+            "RUNNING",
+            "SUCCESS",
+        ]
+        assert worker["started"]
+        assert worker["duration_ms"] >= 0
+        assert worker["action"] == "0: keys x1"
+        assert report["unfinished"] == []
+
+    def test_thread_workers_queue_for_threads(self):
+        """More thread workers than executor threads wait in the queue."""
+        result = simulate_keys(WORKER_APP, ["t"], instrument=["workers"])
+        assert result.success, result.error
+        report = result.metrics["workers"]
+        assert report["workers_created"] == 40
+        assert report["peak_running"] == 40
+        assert report["peak_threads"] < report["peak_running"]
+        assert report["max_queued_ms"] >= 20
+
+    def test_reports_unfinished_workers(self):
+        """Workers still running after the last action are listed."""
+        result = simulate_keys(WORKER_APP, ["p"], instrument=["workers"])
+        assert result.success, result.error
+        (worker,) = result.metrics["workers"]["unfinished"]
+        assert worker["name"] == "poll"
+        assert worker["state"] == "RUNNING"
+        assert worker["duration_ms"] is None
+
+
+STYLE_APP = '''
+from textual.app import App
+from textual.containers import Vertical
+from textual.widgets import Static
+
+class StyleApp(App):
+    CSS = """
+    .row { height: 1; }
+    #grid.striped .row { background: red; }
+    """
+    BINDINGS = [("s", "stripe"), ("d", "toggle_dark")]
+
+    def compose(self):
+        with Vertical(id="grid"):
+            for i in range(50):
+                yield Static(f"row {i}", classes="row")
+        yield Static("footer", id="footer")
+
+    def action_stripe(self):
+        self.query_one("#grid").toggle_class("striped")
+'''
+
+
+class TestStylesProbe:
+    """Tests for the styles probe."""
+
+    def test_class_toggle_restyles_subtree(self):
+        """Toggling a container's class restyles only that container's subtree."""
+        result = simulate_keys(STYLE_APP, ["s"], instrument=["styles"])
+        assert result.success, result.error
+        report = result.metrics["styles"]
+        toggle = report["by_action"]["0: press s"]
+        assert toggle["restyled"] >= 51
+        assert toggle["restyle_ms"] > 0
+        top, *_ = toggle["subtrees"].items()
+        assert top[1]["nodes"] == toggle["restyled"]
+        assert toggle["subtrees"]["Vertical#grid"]["nodes"] >= 51
+        assert "Static#footer" not in toggle["subtrees"]
+        assert report["restyled"] >= toggle["restyled"]
+
+    def test_reports_matched_rules(self):
+        """User rules that matched are listed with their selector."""
+        result = simulate_keys(STYLE_APP, ["s"], instrument=["styles"])
+        toggle = result.metrics["styles"]["by_action"]["0: press s"]
+        rule = next(
+            rule for rule in toggle["rules"] if rule["selector"] == "#grid.striped .row"
+        )
+        assert not rule["default_css"]
+        assert rule["matches"] >= 1
+        assert toggle["cached"] > 0
+
+    def test_layout_split_by_container(self):
+        """Startup layout is charged to the containers that arranged children."""
+        result = simulate_keys(STYLE_APP, ["d"], instrument=["styles"])
+        by_action = result.metrics["styles"]["by_action"]
+        assert by_action["startup"]["layout_ms"] > 0
+        assert "Vertical#grid" in by_action["startup"]["containers"]
+        assert by_action["0: press d"]["restyled"] > 0
@@ -0,0 +1,115 @@
+"""Tests for the span API."""
+
+import asyncio
+
+from tui_builder.spans import SpanRecorder, recording, span
+from tui_builder.tools.benchmarks import benchmark_resize
+from tui_builder.tools.testing import run_app_pilot, simulate_keys
+
+SPAN_APP = """
+from textual import work
+from textual.app import App
+from textual.widgets import Static
+from tui_builder.spans import span
+
+class SpanApp(App):
+    BINDINGS = [("l", "load"), ("t", "fetch")]
+
+    def compose(self):
+        yield Static(id="out")
+
+    @span("load rows")
+    def action_load(self):
+        with span("parse"):
+            pass
+
+    def action_fetch(self):
+        self.fetch()
+
+    @work(thread=True)
+    def fetch(self):
+        with span("fetch"):
+            pass
+
+    def on_resize(self, event):
+        with span("reflow"):
+            pass
+"""
+
+
+class TestSpan:
+    """Tests for span outside and inside a recorder."""
+
+    def test_no_recorder_records_nothing(self):
+        """Spans outside a recording block are no-ops."""
+        recorder = SpanRecorder()
+        with span("idle"):
+            pass
+        assert not recorder
+        assert recorder.report()["count"] == 0
+
+    def test_records_nested_spans(self):
+        """Nested spans name their parent and finish innermost first."""
+        recorder = SpanRecorder(lambda: {"action": "test"})
+        with recording(recorder):
+            with span("outer"):
+                with span("inner"):
+                    pass
+        report = recorder.report()
+        inner, outer = report["spans"]
+        assert inner["name"] == "inner"
+        assert inner["parent"] == "outer"
+        assert outer["parent"] is None
+        assert inner["action"] == "test"
+        assert report["by_name"]["outer"]["count"] == 1
+
+    def test_decorator_times_each_call(self):
+        """Decorated functions and coroutines get a span per call."""
+
+        @span("step")
+        def step(n):
+            return step(n - 1) if n else 0
+
+        @span("fetch")
+        async def fetch():
+            await asyncio.sleep(0)
+            return "done"
+
+        recorder = SpanRecorder()
+        with recording(recorder):
+            assert step(2) == 0
+            assert asyncio.run(fetch()) == "done"
+        by_name = recorder.report()["by_name"]
+        assert by_name["step"]["count"] == 3
+        assert by_name["fetch"]["count"] == 1
+        assert step.__name__ == "step"
+
+
+class TestSpanCollection:
+    """Tests for spans collected by the pilot and benchmark tools."""
+
+    def test_pilot_run_collects_spans(self):
+        """Spans from actions and thread workers are returned in metrics."""
+        result = simulate_keys(SPAN_APP, ["l", "t"])
+        assert result.success, result.error
+        spans = result.metrics["spans"]
+        assert spans["by_name"]["load rows"]["count"] == 1
+        parse = next(entry for entry in spans["spans"] if entry["name"] == "parse")
+        assert parse["parent"] == "load rows"
+        assert parse["action"] == "0: press l"
+        fetch = next(entry for entry in spans["spans"] if entry["name"] == "fetch")
+        assert fetch["action"] == "1: press t"
+
+    def test_runs_without_spans_report_none(self):
+        """Apps that record no spans add nothing to metrics."""
+        result = run_app_pilot(
+            "from textual.app import App\nclass Plain(App):\n    pass\n"
+        )
+        assert result.success, result.error
+        assert "spans" not in result.metrics
+
+    def test_benchmark_collects_spans(self):
+        """Benchmarks return the app's spans next to their timings."""
+        result = benchmark_resize(SPAN_APP, sizes=[[60, 20], [70, 22]])
+        assert result.success, result.error
+        assert result.spans["by_name"]["reflow"]["count"] >= 2
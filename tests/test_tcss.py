@@ -0,0 +1,61 @@
+"""Tests for the TCSS tokenizer and parser."""
+
+from tui_builder.tools.tcss import parse_tcss
+
+STYLESHEET = """
+/* Theme overrides */
+$accent: #ff0000;
+
+Screen > Container {
+    layout: vertical;
+
+    Button:hover {
+        background: $accent;
+    }
+}
+
+Label { content-align: center middle }
+"""
+
+
+class TestParseTcss:
+    """Tests for parse_tcss."""
+
+    def test_builds_nested_rules_with_positions(self):
+        """Rules, nested rules and declarations keep their source positions."""
+        stylesheet = parse_tcss(STYLESHEET)
+        assert stylesheet.errors == []
+        assert [v.name for v in stylesheet.variables] == ["$accent"]
+        container, label = stylesheet.rules
+        assert (container.selector, container.line, container.column) == (
+            "Screen > Container",
+            5,
+            1,
+        )
+        assert container.rules[0].selector == "Button:hover"
+        assert container.rules[0].declarations[0].value == "$accent"
+        assert label.declarations[0].name == "content-align"
+        assert [rule.selector for rule in stylesheet.walk_rules()] == [
+            "Screen > Container",
+            "Button:hover",
+            "Label",
+        ]
+
+    def test_keeps_parsing_after_errors(self):
+        """Every error in a stylesheet is reported in one pass."""
+        css = 'A { color: ; }\n{ width: 1; }\nB { content: "open\n}\n/* end'
+        messages = [error.message for error in parse_tcss(css).errors]
+        assert messages == [
+            "Missing value for 'color'",
+            "Missing selector before '{'",
+            "Unterminated string",
+            "Unterminated comment",
+        ]
+
+    def test_large_stylesheet(self):
+        """A 100 KB stylesheet parses into every one of its rules."""
+        block = "Button.primary:hover { color: $text 80%; padding: 1 2; }\n"
+        count = 100_000 // len(block) + 1
+        stylesheet = parse_tcss(block * count)
+        assert stylesheet.errors == []
+        assert len(stylesheet.rules) == count
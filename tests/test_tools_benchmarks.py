@@ -0,0 +1,258 @@
+"""Tests for benchmark tools."""
+
+from tui_builder.tools.benchmarks import (
+    _drag_sizes,
+    _recommend,
+    benchmark_resize,
+    benchmark_screens,
+    benchmark_scroll,
+)
+from tui_builder.tools.generate import generate_screen
+from tui_builder.tools.memory import get_memory_status
+
+LONG_LIST_APP = """
+from textual.app import App
+from textual.containers import VerticalScroll
+from textual.widgets import Static
+
+class ListApp(App):
+    def compose(self):
+        with VerticalScroll(id="rows"):
+            for i in range(100):
+                yield Static(f"row {i}")
+"""
+
+TABLE_APP = """
+from textual.app import App
+from textual.widgets import DataTable
+
+class TableApp(App):
+    def compose(self):
+        yield DataTable()
+
+    def on_mount(self):
+        table = self.query_one(DataTable)
+        table.add_columns("id", "name")
+        for i in range(100):
+            table.add_row(str(i), f"item {i}")
+"""
+
+GRID_APP = """
+from textual.app import App
+from textual.containers import Grid
+from textual.widgets import Static
+
+class GridApp(App):
+    CSS = "Grid { grid-size: 4; }"
+
+    def compose(self):
+        with Grid():
+            for i in range(16):
+                yield Static(f"cell {i}")
+"""
+
+
+class TestBenchmarkScroll:
+    """Tests for benchmark_scroll."""
+
+    def test_scroll_modes(self):
+        """Each mode records a frame per step with painted widgets."""
+        result = benchmark_scroll(LONG_LIST_APP, "#rows", steps=3)
+        assert result.success, result.error
+        assert [phase["mode"] for phase in result.phases] == ["line", "page", "end"]
+        line, page, end = result.phases
+        assert line["steps"] == page["steps"] == 3
+        assert end["steps"] == 1
+        assert line["frames"] >= 3
+        assert line["mean_painted"] >= 1
+        assert all(step["frames"] for step in line["step_details"])
+        assert result.descendants == 100
+        assert result.virtual_height == 100
+
+    def test_stops_at_end(self):
+        """Page steps stop once the container is scrolled to the end."""
+        result = benchmark_scroll(LONG_LIST_APP, "#rows", steps=50)
+        assert result.success, result.error
+        page = result.phases[1]
+        assert page["steps"] < 50
+
+    def test_data_table(self):
+        """A DataTable draws its rows itself and is counted when it redraws."""
+        result = benchmark_scroll(TABLE_APP, "DataTable", steps=3)
+        assert result.success, result.error
+        assert result.descendants == 0
+        assert not result.needs_virtualization
+        line = result.phases[0]
+        # The table redraws its lines along with its scrollbar.
+        assert all(step["rendered"] >= 2 for step in line["step_details"])
+
+    def test_nothing_to_scroll(self):
+        """A container that fits on screen is reported."""
+        code = LONG_LIST_APP.replace("range(100)", "range(3)")
+        result = benchmark_scroll(code, "#rows")
+        assert not result.success
+        assert "nothing to scroll" in result.error
+
+    def test_missing_selector(self):
+        """An unknown selector is reported."""
+        result = benchmark_scroll(LONG_LIST_APP, "#missing")
+        assert not result.success
+
+    def test_invalid_steps(self):
+        """Step counts outside the limit are rejected."""
+        result = benchmark_scroll(LONG_LIST_APP, "#rows", steps=0)
+        assert not result.success
+        assert "steps" in result.error
+
+    def test_instrument(self):
+        """Extra probes are reported in metrics; unknown ones are errors."""
+        result = benchmark_scroll(LONG_LIST_APP, "#rows", steps=2, instrument=["gc"])
+        assert result.success, result.error
+        assert list(result.metrics) == ["gc"]
+        result = benchmark_scroll(LONG_LIST_APP, "#rows", instrument=["nope"])
+        assert "Unknown probe" in result.error
+
+
+class TestBenchmarkResize:
+    """Tests for benchmark_resize."""
+
+    def test_burst_is_merged(self):
+        """Resizes posted back to back are applied once, at the last size."""
+        result = benchmark_resize(GRID_APP, sizes=[[60, 20], [50, 18], [70, 22]])
+        assert result.success, result.error
+        assert result.posted == 3
+        assert result.applied == 1
+        assert result.merged == 2
+        assert result.final_size == [70, 22]
+        assert result.resizes[0]["size"] == [70, 22]
+
+    def test_spaced_resizes_are_applied(self):
+        """Resizes spaced further apart than a relayout are each timed."""
+        result = benchmark_resize(GRID_APP, sizes=[[60, 20], [50, 18]], interval_ms=50)
+        assert result.success, result.error
+        assert result.applied == 2
+        assert result.merged == 0
+        for resize in result.resizes:
+            assert resize["relayout_ms"] > 0
+            assert resize["painted"] >= 16
+        assert result.worst_frame["frame_ms"] > 0
+
+    def test_generated_drag(self):
+        """Without sizes the window is dragged down and back up."""
+        result = benchmark_resize(GRID_APP, steps=6, interval_ms=20)
+        assert result.success, result.error
+        assert result.posted == 6
+        assert result.final_size == [80, 24]
+
+    def test_drag_sizes(self):
+        """Generated drags end where they started."""
+        sizes = _drag_sizes((80, 24), (40, 12), 4)
+        assert sizes == [(60, 18), (40, 12), (60, 18), (80, 24)]
+
+    def test_instrument(self):
+        """Probes the benchmark needs anyway can be reported too."""
+        result = benchmark_resize(
+            GRID_APP, sizes=[[60, 20]], interval_ms=20, instrument=["resize"]
+        )
+        assert result.success, result.error
+        assert result.metrics["resize"]["applied"] == 1
+
+    def test_invalid_sizes(self):
+        """Empty or degenerate sizes are rejected."""
+        assert not benchmark_resize(GRID_APP, sizes=[]).success
+        assert not benchmark_resize(GRID_APP, sizes=[[0, 10]]).success
+        assert not benchmark_resize(GRID_APP, steps=0).success
+
+
+class TestBenchmarkScreens:
+    """Tests for benchmark_screens."""
+
+    def test_generated_screen(self):
+        """Screens from generate_screen are measured on a host app."""
+        result = benchmark_screens(generate_screen("Settings"), visits=2)
+        assert result.success, result.error
+        (screen,) = result.screens
+        assert screen["screen"] == "Settings"
+        transitions = screen["transitions"]
+        assert set(transitions) == {"push", "pop", "switch", "installed", "mode"}
+        for timing in transitions.values():
+            assert timing["first_ms"] > 0
+            assert timing["max_ms"] >= timing["later_ms"]
+
+    def test_screens_needing_arguments(self):
+        """Screens that can't be built without arguments report an error."""
+        code = (
+            generate_screen("Settings")
+            + """
+
+class Detail(Screen):
+    def __init__(self, item):
+        super().__init__()
+"""
+        )
+        result = benchmark_screens(code, visits=1)
+        assert result.success, result.error
+        errors = {screen["screen"]: screen.get("error") for screen in result.screens}
+        assert errors["Settings"] is None
+        assert "item" in errors["Detail"]
+
+    def test_app_with_modes(self):
+        """An app's own modes and screens are left alone."""
+        code = """
+from textual.app import App
+from textual.screen import Screen
+from textual.widgets import Static
+
+class Home(Screen):
+    def compose(self):
+        yield Static("home")
+
+class Help(Screen):
+    def compose(self):
+        yield Static("help")
+
+class ModesApp(App):
+    MODES = {"home": Home}
+    DEFAULT_MODE = "home"
+"""
+        result = benchmark_screens(code, screens=["Help"], visits=1)
+        assert result.success, result.error
+        assert [screen["screen"] for screen in result.screens] == ["Help"]
+        assert "error" not in result.screens[0]
+
+    def test_unknown_screen(self):
+        """Names that aren't Screen classes are rejected."""
+        result = benchmark_screens(generate_screen("Settings"), screens=["Nope"])
+        assert not result.success
+        assert "Nope" in result.error
+
+    def test_recommend_caching(self):
+        """Screens that stay slow but are cheap when installed are flagged."""
+
+        def timing(first, later):
+            return {"first_ms": first, "later_ms": later, "max_ms": first}
+
+        slow = {
+            "screen": "Slow",
+            "transitions": {"push": timing(90, 80), "installed": timing(90, 5)},
+        }
+        first_only = {
+            "screen": "Warm",
+            "transitions": {"push": timing(90, 5), "installed": timing(90, 5)},
+        }
+        fast = {
+            "screen": "Fast",
+            "transitions": {"push": timing(5, 5), "installed": timing(5, 5)},
+        }
+        assert "install it (or give it a mode)" in _recommend(slow)
+        assert "install it at startup" in _recommend(first_only)
+        assert _recommend(fast) is None
+
+
+def test_runs_are_tracked():
+    """Every benchmark counts as a run in the server's memory accounting."""
+    before = get_memory_status().runs
+    assert benchmark_scroll(LONG_LIST_APP, "#rows", steps=1).success
+    assert benchmark_resize(GRID_APP, sizes=[[60, 20]]).success
+    assert benchmark_screens(generate_screen("Settings"), visits=1).success
+    assert get_memory_status().runs == before + 3
@@ -0,0 +1,91 @@
+"""Tests for A/B comparison tools."""
+
+from tui_builder.tools.comparisons import _compare_paired, compare_performance
+
+LIST_APP = """
+from textual.app import App
+from textual.widgets import Static
+
+class ListApp(App):
+    BINDINGS = [("r", "relabel")]
+
+    def compose(self):
+        for i in range(ROWS):
+            yield Static(f"row {i}", classes="row")
+
+    def action_relabel(self):
+        for row in self.query(".row"):
+            row.update("relabelled")
+"""
+
+
+class TestComparePaired:
+    """Tests for the paired comparison statistics."""
+
+    def test_consistent_drop_is_improvement(self):
+        """A drop in every pair is a significant improvement."""
+        result = _compare_paired("ms", [10.0, 11.0, 10.5, 10.2], [5.0, 5.4, 5.1, 5.3])
+        assert result["verdict"] == "improved"
+        assert result["significant"]
+        assert result["ci_high"] < 0
+        assert result["delta_pct"] < -45
+
+    def test_noise_is_not_significant(self):
+        """Changes that flip sign between pairs are not significant."""
+        result = _compare_paired(
+            "ms", [10.0, 12.0, 10.0, 12.0], [12.0, 10.0, 12.0, 10.0]
+        )
+        assert result["verdict"] == "not significant"
+        assert result["ci_low"] < 0 < result["ci_high"]
+
+    def test_identical_samples(self):
+        """Identical samples have no change and no significance."""
+        result = _compare_paired("kb", [4.0, 4.0], [4.0, 4.0])
+        assert result["delta"] == 0
+        assert result["verdict"] == "not significant"
+
+
+class TestComparePerformance:
+    """Tests for compare_performance."""
+
+    def test_detects_heavier_version(self):
+        """Mounting many more widgets is reported as a regression."""
+        result = compare_performance(
+            LIST_APP.replace("ROWS", "10"),
+            LIST_APP.replace("ROWS", "300"),
+            script="r",
+            iterations=4,
+        )
+        assert result.success, result.error
+        assert result.scenario == ["keys x1"]
+        metrics = {c["metric"]: c for c in result.comparisons}
+        assert set(metrics) == {
+            "mount_ms",
+            "interaction_ms",
+            "action 0: keys x1 ms",
+            "peak_kb",
+        }
+        assert "mount_ms" in result.regressed
+        assert "peak_kb" in result.regressed
+        assert metrics["mount_ms"]["b_mean"] > metrics["mount_ms"]["a_mean"]
+        assert not result.improved
+
+    def test_rejects_bad_input(self):
+        """Bad iteration counts, code and scripts are reported as errors."""
+        app = LIST_APP.replace("ROWS", "1")
+        assert "iterations" in compare_performance(app, app, iterations=1).error
+        assert "version B" in compare_performance(app, "class (", iterations=2).error
+        result = compare_performance(app, app, script='"unterminated', iterations=2)
+        assert "Invalid key script" in result.error
+        result = compare_performance(app, app, iterations=2, instrument=["nope"])
+        assert "Unknown probe" in result.error
+
+    def test_instrument(self):
+        """Probes report on an extra run of each version."""
+        app = LIST_APP.replace("ROWS", "5")
+        result = compare_performance(
+            app, app, script="r", iterations=2, warmup=0, instrument=["messages"]
+        )
+        assert result.success, result.error
+        assert set(result.metrics) == {"A", "B"}
+        assert "0: keys x1" in result.metrics["B"]["messages"]["by_action"]
@@ -0,0 +1,129 @@
+"""Tests for leak detection tools."""
+
+import sys
+
+from tui_builder.tools.leaks import detect_leaks
+
+DIALOG_SCREEN = """
+from textual.screen import ModalScreen
+from textual.widgets import Static
+
+class Dialog(ModalScreen):
+    def compose(self):
+        yield Static("Are you sure?")
+"""
+
+LEAKY_SCREEN_APP = """
+from textual.app import App
+from textual.screen import Screen
+from textual.widgets import Static
+
+class Dialog(Screen):
+    def compose(self):
+        yield Static("Are you sure?")
+
+    def on_mount(self):
+        self.app.history.append(self)
+
+class HostApp(App):
+    def __init__(self):
+        super().__init__()
+        self.history = []
+"""
+
+LEAKY_WIDGET = """
+from textual.widgets import Static
+
+REGISTRY = {}
+
+class Row(Static):
+    def on_mount(self):
+        REGISTRY[id(self)] = self
+"""
+
+
+class TestDetectLeaks:
+    """Tests for detect_leaks."""
+
+    def test_clean_screen(self):
+        """Pushing and popping a plain modal screen doesn't leak."""
+        result = detect_leaks(DIALOG_SCREEN, cycles=10, warmup=2, trace_memory=False)
+        assert result.success, result.error
+        assert result.target == "temp_app.Dialog"
+        assert not result.leaking
+        assert result.samples[-1]["cycle"] == 10
+        assert result.retained_bytes_per_cycle is None
+
+    def test_leaky_screen(self):
+        """Screens kept alive by the app are reported with their referrers."""
+        result = detect_leaks(LEAKY_SCREEN_APP, cycles=10, warmup=2, trace_memory=False)
+        assert result.success, result.error
+        assert result.leaking
+        leaked = {entry["type"]: entry for entry in result.growth}
+        assert leaked["temp_app.Dialog"]["per_cycle"] == 1
+        assert leaked["temp_app.Dialog"]["leak"]
+        chain = result.referrers["temp_app.Dialog"]
+        assert chain[0] == "temp_app.HostApp.history"
+        assert chain[-1] == "temp_app.Dialog"
+
+    def test_leaky_widget(self):
+        """Widgets kept in a module-level registry are reported."""
+        result = detect_leaks(
+            LEAKY_WIDGET, mode="widget", cycles=10, warmup=2, trace_memory=False
+        )
+        assert result.success, result.error
+        assert result.leaking
+        assert result.referrers["temp_app.Row"][0] == "module temp_app.REGISTRY"
+
+    def test_clean_widget(self):
+        """Mounting and removing a plain widget doesn't leak."""
+        code = LEAKY_WIDGET.replace("REGISTRY[id(self)] = self", "pass")
+        result = detect_leaks(
+            code, mode="widget", cycles=10, warmup=2, trace_memory=False
+        )
+        assert result.success, result.error
+        assert not result.leaking
+
+    def test_traces_memory(self):
+        """With tracing on, retained memory is sampled too."""
+        result = detect_leaks(DIALOG_SCREEN, cycles=2, warmup=0)
+        assert result.success, result.error
+        assert "traced_bytes" in result.samples[0]
+        assert result.retained_bytes_per_cycle is not None
+
+    def test_drops_imported_modules(self, tmp_path, monkeypatch):
+        """Modules imported by the code are dropped like after other pilot runs."""
+        (tmp_path / "dialog_helper.py").write_text("TEXT = 'Are you sure?'\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        code = "import dialog_helper\n" + DIALOG_SCREEN
+        result = detect_leaks(code, cycles=2, warmup=0, trace_memory=False)
+        assert result.success, result.error
+        assert "dialog_helper" not in sys.modules
+
+    def test_instrument(self):
+        """Probes attached to the run are reported in metrics."""
+        result = detect_leaks(
+            DIALOG_SCREEN, cycles=2, warmup=1, trace_memory=False, instrument=["frames"]
+        )
+        assert result.success, result.error
+        actions = {frame["action"] for frame in result.metrics["frames"]["frames"]}
+        assert {"0: warmup", "1: cycles"} <= actions
+
+    def test_named_target(self):
+        """A target that isn't a class of the right kind is an error."""
+        result = detect_leaks(LEAKY_WIDGET, target="REGISTRY", mode="widget")
+        assert not result.success
+        assert "not a Widget class" in result.error
+
+    def test_no_target(self):
+        """Code without a screen to cycle is an error."""
+        result = detect_leaks(LEAKY_WIDGET)
+        assert not result.success
+        assert "No Screen class" in result.error
+
+    def test_invalid_arguments(self):
+        """Mode and cycle counts are validated."""
+        assert not detect_leaks(DIALOG_SCREEN, mode="app").success
+        assert not detect_leaks(DIALOG_SCREEN, cycles=0).success
+        assert not detect_leaks(DIALOG_SCREEN, warmup=-1).success
+        assert "Syntax error" in detect_leaks("class (").error
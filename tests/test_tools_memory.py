@@ -0,0 +1,148 @@
+"""Tests for memory accounting of pilot runs."""
+
+import sys
+import threading
+
+from tui_builder.tools.memory import (
+    MemoryLimits,
+    MemoryMonitor,
+    get_memory_status,
+    rss_bytes,
+)
+from tui_builder.tools.testing import PilotJob, run_app_pilot, run_pilot_batch
+
+IMPORTING_APP = """
+import leaky_helper
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class ImportingApp(App):
+    def compose(self) -> ComposeResult:
+        yield Static(leaky_helper.TEXT)
+"""
+
+
+def test_rss_bytes():
+    """Resident memory is reported in bytes."""
+    assert rss_bytes() > 1024 * 1024
+
+
+def test_run_reports_memory(tmp_path, monkeypatch):
+    """In-process runs report memory and drop modules imported from user code."""
+    (tmp_path / "leaky_helper.py").write_text("TEXT = 'from helper'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    result = run_app_pilot(IMPORTING_APP)
+
+    assert result.success, result.error
+    assert "from helper" in result.output
+    memory = result.metrics["memory"]
+    assert memory["rss_before"] > 0
+    assert memory["rss_delta"] == memory["rss_after"] - memory["rss_before"]
+    assert "leaky_helper" in memory["new_modules"]
+    assert memory["removed_modules"] == ["leaky_helper"]
+    assert "leaky_helper" not in sys.modules
+
+
+SHARING_APP = """
+import shared_helper as FIRST
+import {extra}
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class SharingApp(App):
+    BINDINGS = [("x", "check", "Check")]
+
+    def compose(self) -> ComposeResult:
+        yield Static("waiting", id="status")
+
+    def action_check(self) -> None:
+        import shared_helper
+
+        self.query_one("#status").update(f"same={{shared_helper is FIRST}}")
+"""
+
+
+def test_concurrent_runs_keep_shared_modules(tmp_path, monkeypatch):
+    """A run finishing first doesn't drop modules another run still uses."""
+    (tmp_path / "shared_helper.py").write_text("")
+    (tmp_path / "quick_helper.py").write_text("")
+    (tmp_path / "slow_helper.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    quick, slow = run_pilot_batch(
+        [
+            PilotJob(SHARING_APP.format(extra="quick_helper"), script="x"),
+            PilotJob(SHARING_APP.format(extra="slow_helper"), script="pause*20 x"),
+        ]
+    )
+
+    assert quick.success, quick.error
+    assert slow.success, slow.error
+    assert "same=True" in slow.output
+    assert "slow_helper" not in quick.metrics["memory"]["new_modules"]
+    assert "quick_helper" not in slow.metrics["memory"]["new_modules"]
+    assert slow.metrics["memory"]["overlapped"]
+    assert slow.metrics["memory"]["rss_delta"] is None
+    for name in ("shared_helper", "quick_helper", "slow_helper"):
+        assert name not in sys.modules
+
+
+def test_status_counts_runs():
+    """The status reflects runs made through the pilot tools."""
+    before = get_memory_status().runs
+    run_app_pilot(IMPORTING_APP.replace("import leaky_helper", "import json"))
+    assert get_memory_status().runs == before + 1
+
+
+class TestMemoryMonitor:
+    """Tests for MemoryMonitor."""
+
+    def test_keeps_installed_modules(self):
+        """Modules from the Python installation stay imported."""
+        sys.modules.pop("this", None)
+        monitor = MemoryMonitor()
+        with monitor.track() as memory:
+            import this  # noqa: F401
+        assert "this" in memory.new_modules
+        assert memory.removed_modules == []
+        assert "this" in sys.modules
+
+    def test_cleanup_can_be_disabled(self, tmp_path, monkeypatch):
+        """With cleanup off, user modules are reported but kept."""
+        (tmp_path / "kept_helper.py").write_text("")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monitor = MemoryMonitor(MemoryLimits(cleanup_modules=False))
+        with monitor.track() as memory:
+            import kept_helper  # noqa: F401
+        assert memory.removed_modules == []
+        assert "kept_helper" in sys.modules
+        sys.modules.pop("kept_helper")
+
+    def test_reports_leaked_threads(self):
+        """Threads started during a run that are still alive are reported."""
+        monitor = MemoryMonitor(MemoryLimits(max_leaked_threads=0))
+        stop = threading.Event()
+        with monitor.track() as memory:
+            threading.Thread(target=stop.wait, name="leaked-worker").start()
+        stop.set()
+        assert memory.leaked_threads == ["leaked-worker"]
+        assert "1 threads outlived the run" in memory.warnings[0]
+
+    def test_recycles_over_limit(self):
+        """Crossing the growth limit triggers a recycle and re-arms it."""
+        monitor = MemoryMonitor(MemoryLimits(max_rss_growth_mb=0))
+        monitor.recycle_rss = 0
+        with monitor.track() as memory:
+            pass
+        assert memory.recycled
+        assert monitor.recycles == 1
+        assert monitor.recycle_rss >= monitor.baseline_rss
+
+    def test_configure(self):
+        """configure updates only the limits that are given."""
+        monitor = MemoryMonitor()
+        monitor.configure(max_rss_growth_mb=10, cleanup_modules=None)
+        assert monitor.limits.max_rss_growth_mb == 10
+        assert monitor.limits.cleanup_modules is True
+        assert monitor.recycle_rss == monitor.baseline_rss + 10 * 1024 * 1024
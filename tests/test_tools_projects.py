@@ -0,0 +1,125 @@
+"""Tests for pilot runs against on-disk projects."""
+
+import sys
+import uuid
+
+import pytest
+
+from tui_builder.tools.projects import run_project_pilot
+
+MAIN_MODULE = """
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+from {package}.labels import GREETING
+from {package} import helpers
+
+
+class ProjectApp(App):
+    CSS_PATH = "app.tcss"
+
+    def compose(self) -> ComposeResult:
+        yield Static(GREETING, id="greeting")
+        yield Static(helpers.footer())
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Write a small multi-module project under a unique package name."""
+    package = f"demo_{uuid.uuid4().hex[:8]}"
+    root = tmp_path / package
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "labels.py").write_text('GREETING = "Hello"\n')
+    (root / "helpers.py").write_text('def footer():\n    return "footer"\n')
+    (root / "main.py").write_text(MAIN_MODULE.format(package=package))
+    (root / "app.tcss").write_text("#greeting { display: block; }\n")
+    yield tmp_path, package
+    for name in [name for name in sys.modules if name.startswith(package)]:
+        del sys.modules[name]
+
+
+class TestRunProjectPilot:
+    """Tests for run_project_pilot."""
+
+    def test_runs_target_app(self, project):
+        """The target is imported from the project and its modules recorded."""
+        path, package = project
+        result = run_project_pilot(str(path), f"{package}.main:ProjectApp")
+        assert result.success, result.error
+        assert "Hello" in result.output
+        assert f"{package}.labels" in result.metrics["project"]["imported"]
+
+    def test_reloads_only_changed_modules(self, project):
+        """An edited module and its importers reload; the rest stay warm."""
+        path, package = project
+        run_project_pilot(str(path), f"{package}.main")
+        warm = run_project_pilot(str(path), f"{package}.main")
+        assert warm.metrics["project"]["reloaded"] == []
+        assert warm.metrics["project"]["imported"] == []
+
+        (path / package / "labels.py").write_text('GREETING = "Changed"\n')
+        result = run_project_pilot(str(path), f"{package}.main")
+        assert result.success, result.error
+        assert "Changed" in result.output
+        assert result.metrics["project"]["reloaded"] == [
+            f"{package}.labels",
+            f"{package}.main",
+        ]
+
+    def test_stylesheet_changes_apply_without_reload(self, project):
+        """Edited .tcss files are picked up on the next run."""
+        path, package = project
+        run_project_pilot(str(path), f"{package}.main")
+        (path / package / "app.tcss").write_text("#greeting { display: none; }\n")
+        result = run_project_pilot(str(path), f"{package}.main")
+        assert result.success, result.error
+        assert "Hello" not in result.output
+        assert result.metrics["project"]["reloaded"] == []
+
+    def test_reports_bad_targets(self, project):
+        """Missing modules and classes are reported as errors."""
+        path, package = project
+        missing = run_project_pilot(str(path), f"{package}.nope")
+        assert not missing.success
+        assert "Failed to import" in missing.error
+        no_class = run_project_pilot(str(path), f"{package}.main:Nope")
+        assert not no_class.success
+        assert "no App class 'Nope'" in no_class.error
+
+    def test_leaves_import_path_and_bytecode_alone(self, project):
+        """The project isn't left on sys.path and gets no bytecode caches."""
+        path, package = project
+        run_project_pilot(str(path), f"{package}.main")
+        # Same size and, most likely, the same second as the first version.
+        (path / package / "labels.py").write_text('GREETING = "Howdy"\n')
+        result = run_project_pilot(str(path), f"{package}.main")
+        assert result.success, result.error
+        assert "Howdy" in result.output
+        assert str(path) not in sys.path
+        assert not list(path.rglob("*.pyc"))
+
+    def test_same_named_packages_stay_apart(self, tmp_path):
+        """Two projects with a package of the same name each run their own."""
+        projects = {}
+        for greeting in ("First", "Second"):
+            root = tmp_path / greeting / "shared_app"
+            root.mkdir(parents=True)
+            (root / "__init__.py").write_text("")
+            (root / "main.py").write_text(
+                "from textual.app import App\n"
+                "from textual.widgets import Static\n\n"
+                "class SharedApp(App):\n"
+                "    def compose(self):\n"
+                f"        yield Static({greeting!r})\n"
+            )
+            projects[greeting] = str(tmp_path / greeting)
+        try:
+            for greeting in ("First", "Second", "First"):
+                result = run_project_pilot(projects[greeting], "shared_app.main")
+                assert result.success, result.error
+                assert greeting in result.output
+        finally:
+            for name in [name for name in sys.modules if name.startswith("shared_app")]:
+                del sys.modules[name]
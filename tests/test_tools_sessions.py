@@ -0,0 +1,157 @@
+"""Tests for pilot sessions and live CSS injection."""
+
+import time
+
+import pytest
+
+from tui_builder.tools import sessions
+from tui_builder.tools.memory import get_memory_status
+from tui_builder.tools.sessions import (
+    close_pilot_session,
+    inject_css,
+    start_pilot_session,
+)
+
+STYLED_APP = """
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class StyledApp(App):
+    CSS = "#banner { display: none; }"
+
+    def compose(self) -> ComposeResult:
+        yield Static("banner", id="banner")
+        yield Static("body", classes="row")
+        yield Static("footer", classes="row")
+"""
+
+
+@pytest.fixture
+def session_id():
+    """Start a session for STYLED_APP and close it afterwards."""
+    result = start_pilot_session(STYLED_APP)
+    assert result.success, result.error
+    yield result.session_id
+    close_pilot_session(result.session_id)
+
+
+class TestSessions:
+    """Tests for starting and closing sessions."""
+
+    def test_start_returns_screen(self):
+        """Starting a session mounts the app and returns its screen."""
+        result = start_pilot_session(STYLED_APP)
+        close_pilot_session(result.session_id)
+        assert result.success
+        assert result.session_id
+        assert result.output.splitlines() == ["body", "footer"]
+
+    def test_start_syntax_error(self):
+        """Syntax errors are reported without starting a session."""
+        result = start_pilot_session("class Broken(")
+        assert not result.success
+        assert "Syntax error" in result.error
+
+    def test_start_without_app(self):
+        """Code without an App class fails to start."""
+        result = start_pilot_session("x = 1")
+        assert not result.success
+        assert "No App class" in result.error
+
+    def test_session_is_tracked(self):
+        """A session counts as one run, reported when it is closed."""
+        before = get_memory_status().runs
+        session_id = start_pilot_session(STYLED_APP).session_id
+        closed = close_pilot_session(session_id)
+        assert closed.success, closed.error
+        assert closed.metrics["memory"]["rss_before"] > 0
+        assert get_memory_status().runs == before + 1
+
+    def test_close_twice(self):
+        """A session can only be closed once."""
+        session_id = start_pilot_session(STYLED_APP).session_id
+        assert close_pilot_session(session_id).success
+        assert not close_pilot_session(session_id).success
+
+    def test_crashed_session_is_removed(self):
+        """A session whose app crashes is freed and reports the crash once."""
+        crashing = (
+            STYLED_APP
+            + """
+    def on_mount(self) -> None:
+        self.set_timer(0.05, self.crash)
+
+    def crash(self) -> None:
+        raise RuntimeError("boom")
+"""
+        )
+        session_id = start_pilot_session(crashing).session_id
+        deadline = time.monotonic() + 10
+        while session_id in sessions._sessions and time.monotonic() < deadline:
+            time.sleep(0.05)
+        result = inject_css(session_id, "Static { color: red; }")
+        assert not result.success
+        assert "crashed" in result.error
+        assert "boom" in result.error
+        closed = close_pilot_session(session_id)
+        assert "No session" in closed.error
+
+
+class TestInjectCss:
+    """Tests for inject_css."""
+
+    def test_replaces_app_css(self, session_id):
+        """Replacing the app CSS shows the previously hidden banner."""
+        result = inject_css(session_id, ".row { height: 3; }")
+        assert result.success, result.error
+        assert "banner" in result.output
+        assert result.output.splitlines().index("footer") == 4
+
+    def test_layers_on_app_css(self, session_id):
+        """Without replace, the app's own rules stay in effect."""
+        result = inject_css(session_id, ".row { display: none; }", replace=False)
+        assert result.success, result.error
+        assert "banner" not in result.output
+        assert "body" not in result.output
+
+    def test_injected_css_replaces_previous_injection(self, session_id):
+        """Each injection replaces the last one."""
+        inject_css(session_id, ".row { display: none; }", replace=False)
+        result = inject_css(session_id, "#banner { color: red; }", replace=False)
+        assert "body" in result.output
+
+    def test_reports_timings(self, session_id):
+        """Timings are reported for each phase."""
+        result = inject_css(session_id, ".row { height: 2; }")
+        assert result.total_ms >= result.parse_ms + result.restyle_ms
+        assert result.layout_ms >= 0
+
+    def test_restyles_only_matching_nodes(self, session_id):
+        """Only nodes that a changed rule can match are restyled."""
+        inject_css(session_id, ".row { height: 2; }", replace=False)
+        result = inject_css(session_id, ".row { height: 3; }", replace=False)
+        assert result.nodes == 2
+
+    def test_invalid_css_keeps_styles(self, session_id):
+        """Invalid CSS is reported and the previous styles are kept."""
+        result = inject_css(session_id, "#banner { colr: red; }")
+        assert not result.success
+        assert "line 1" in result.error
+        assert "colr" in result.error
+
+        result = inject_css(session_id, ".row { height: 1; }", replace=False)
+        assert result.success
+        assert "banner" not in result.output
+
+    def test_instrument(self, session_id):
+        """Probes see the restyle done while the CSS is applied."""
+        result = inject_css(session_id, ".row { height: 2; }", instrument=["styles"])
+        assert result.success, result.error
+        styles = result.metrics["styles"]["by_action"]["0: inject_css"]
+        assert styles["restyled"] >= 2
+
+    def test_unknown_session(self):
+        """Unknown sessions are reported as errors."""
+        result = inject_css("missing", "Static { color: red; }")
+        assert not result.success
+        assert "No session" in result.error
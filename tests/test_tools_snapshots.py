@@ -0,0 +1,135 @@
+"""Tests for snapshot suite tools."""
+
+from tui_builder.tools.snapshots import (
+    discover_snapshot_cases,
+    main,
+    run_snapshot_suite,
+)
+
+COUNTER_APP = """
+from textual.app import App
+from textual.widgets import Static
+
+class CounterApp(App):
+    BINDINGS = [("i", "increment")]
+    count = 0
+
+    def compose(self):
+        yield Static("count 0", id="count")
+
+    def action_increment(self):
+        self.count += 1
+        self.query_one("#count").update(f"count {self.count}")
+"""
+
+
+def _write_suite(root, apps=("counter",)):
+    for name in apps:
+        (root / f"{name}.py").write_text(COUNTER_APP)
+    return root
+
+
+class TestDiscoverSnapshotCases:
+    """Tests for discover_snapshot_cases."""
+
+    def test_scenarios_and_baselines(self, tmp_path):
+        """Each key script is a case; apps without scripts get one case."""
+        _write_suite(tmp_path)
+        (tmp_path / "counter.keys").write_text("i")
+        (tmp_path / "counter.three.keys").write_text("i i i")
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / "plain.py").write_text(COUNTER_APP)
+        (tmp_path / "_helpers.py").write_text("")
+        cases = discover_snapshot_cases(tmp_path)
+        assert [case.name for case in cases] == [
+            "counter",
+            "counter.three",
+            "nested/plain",
+        ]
+        assert cases[1].baseline == tmp_path / "counter.three.txt"
+        assert cases[2].script is None
+
+
+class TestRunSnapshotSuite:
+    """Tests for run_snapshot_suite."""
+
+    def test_update_then_pass(self, tmp_path):
+        """Updating writes baselines that a later run matches."""
+        _write_suite(tmp_path)
+        (tmp_path / "counter.three.keys").write_text("i i i")
+        result = run_snapshot_suite(
+            str(tmp_path), workers=2, isolation="process", update=True
+        )
+        assert result.success, result
+        assert result.updated == 1
+        assert "count 3" in (tmp_path / "counter.three.txt").read_text()
+
+        result = run_snapshot_suite(str(tmp_path), workers=2, isolation="process")
+        assert result.success
+        assert result.passed == result.total == 1
+        (case,) = result.cases
+        assert case["status"] == "passed"
+        assert case["duration_ms"] > 0
+        assert result.wall_ms > 0
+
+    def test_reports_diffs_and_missing_baselines(self, tmp_path):
+        """Changed screens fail with a diff; cases without baselines are listed."""
+        _write_suite(tmp_path, ("changed", "new"))
+        (tmp_path / "changed.txt").write_text("count 7\n")
+        result = run_snapshot_suite(str(tmp_path), workers=2, isolation="process")
+        assert not result.success
+        changed, new = result.cases
+        assert changed["status"] == "failed"
+        assert "-count 7" in changed["diff"]
+        assert "+count 0" in changed["diff"]
+        assert new["status"] == "missing"
+        assert (result.failed, result.missing) == (1, 1)
+
+    def test_apps_import_suite_modules(self, tmp_path):
+        """Apps can import helper modules kept in the suite."""
+        (tmp_path / "_labels.py").write_text("LABEL = 'from helper'\n")
+        (tmp_path / "labelled.py").write_text(
+            COUNTER_APP.replace('"count 0"', "LABEL").replace(
+                "from textual.app import App",
+                "from _labels import LABEL\nfrom textual.app import App",
+            )
+        )
+        result = run_snapshot_suite(
+            str(tmp_path), workers=1, isolation="process", update=True
+        )
+        assert result.success, result.cases
+        assert "from helper" in (tmp_path / "labelled.txt").read_text()
+
+    def test_fail_fast_skips_remaining_cases(self, tmp_path):
+        """With fail_fast, cases not yet started are skipped after a failure."""
+        _write_suite(tmp_path, [f"app{n}" for n in range(6)])
+        result = run_snapshot_suite(
+            str(tmp_path), workers=1, isolation="process", fail_fast=True
+        )
+        assert not result.success
+        assert result.missing >= 1
+        assert result.skipped >= 1
+        assert result.missing + result.skipped == result.total
+
+    def test_rejects_bad_arguments(self, tmp_path):
+        """Missing directories and worker counts below one are errors."""
+        missing = run_snapshot_suite(str(tmp_path / "nope"))
+        assert not missing.success
+        assert "Not a directory" in missing.error
+        assert run_snapshot_suite(str(tmp_path), workers=0).error
+        assert run_snapshot_suite(str(tmp_path), isolation="threads").error
+
+
+class TestSnapshotCli:
+    """Tests for the snapshot suite command line."""
+
+    def test_exit_codes(self, tmp_path, capsys):
+        """The CLI exits 1 on failing cases and 0 once baselines match."""
+        _write_suite(tmp_path)
+        assert main([str(tmp_path), "-j", "1", "--isolation", "process"]) == 1
+        assert "MISSING" in capsys.readouterr().out
+        args = [str(tmp_path), "-j", "1", "--isolation", "process", "--update"]
+        assert main(args) == 0
+        assert main(args[:-1]) == 0
+        assert "1 passed" in capsys.readouterr().out
+        assert main([str(tmp_path / "nope")]) == 2
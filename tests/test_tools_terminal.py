@@ -0,0 +1,99 @@
+"""Tests for real-terminal tools."""
+
+import sys
+
+import pytest
+
+from tui_builder.tools.terminal import (
+    TerminalBandwidthResult,
+    _frame_stats,
+    _key_bytes,
+    _split_synchronized_frames,
+    measure_terminal_output,
+)
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Pseudo-terminals require a POSIX platform"
+)
+
+INPUT_APP_CODE = '''
+from textual.app import App, ComposeResult
+from textual.widgets import Input, Static
+
+class EchoApp(App):
+    """An app that echoes its input."""
+
+    def compose(self) -> ComposeResult:
+        yield Input(id="field")
+        yield Static("", id="echo")
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.query_one("#echo", Static).update(event.value)
+'''
+
+
+class TestKeyBytes:
+    """Tests for key name translation."""
+
+    def test_named_key(self):
+        """Named keys map to terminal escape sequences."""
+        assert _key_bytes("up") == b"\x1b[A"
+
+    def test_control_key(self):
+        """ctrl+letter maps to the control character."""
+        assert _key_bytes("ctrl+q") == b"\x11"
+
+    def test_character(self):
+        """Single characters are sent as-is."""
+        assert _key_bytes("x") == b"x"
+
+
+class TestFrameParsing:
+    """Tests for ANSI stream parsing."""
+
+    def test_splits_synchronized_frames(self):
+        """Frames are delimited by synchronized update markers."""
+        stream = b"\x1b[?2026hA\x1b[?2026l junk \x1b[?2026hB\x1b[?2026l"
+        assert len(_split_synchronized_frames(stream)) == 2
+
+    def test_detects_full_repaint(self):
+        """A frame writing every row from the left edge is a full repaint."""
+        frame = b"".join(b"\x1b[%d;1Hline" % row for row in range(1, 4))
+        assert _frame_stats(frame, height=3, frame_time=0).full_repaint is True
+
+    def test_detects_partial_update(self):
+        """A frame touching a few cells is a partial update."""
+        frame = b"\x1b[2;10Hx"
+        stats = _frame_stats(frame, height=3, frame_time=0)
+        assert stats.full_repaint is False
+        assert stats.rows_updated == 1
+
+
+class TestMeasureTerminalOutput:
+    """Tests for measure_terminal_output tool."""
+
+    def test_returns_result(self):
+        """measure_terminal_output returns a TerminalBandwidthResult."""
+        result = measure_terminal_output(INPUT_APP_CODE)
+        assert isinstance(result, TerminalBandwidthResult)
+
+    def test_measures_frames(self):
+        """Startup and input produce measured frames."""
+        result = measure_terminal_output(INPUT_APP_CODE, script='"hello" pause')
+        assert result.success is True
+        assert result.synchronized is True
+        assert result.frame_count > 0
+        assert result.full_repaints >= 1
+        assert result.total_bytes > result.startup_bytes > 0
+        assert result.bytes_per_frame > 0
+
+    def test_invalid_code_reports_failure(self):
+        """Invalid code reports failure."""
+        result = measure_terminal_output("invalid python code {{{")
+        assert result.success is False
+
+    def test_unknown_key_reports_failure(self):
+        """Keys without a terminal sequence are rejected."""
+        result = measure_terminal_output(INPUT_APP_CODE, script="hyper+z")
+        assert result.success is False
+        assert "key script" in result.error
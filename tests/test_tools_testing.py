@@ -1,13 +1,31 @@
 """Tests for testing tools."""
 
+import os
+import subprocess
+import sys
+from ast import literal_eval
+from pathlib import Path
+
+import pytest
+
+import tui_builder
+from tui_builder.tools.generate import generate_screen
 from tui_builder.tools.testing import (
+    KeyScriptError,
+    PilotJob,
     SnapshotResult,
     compare_snapshots,
+    generate_perf_tests,
     generate_test_cases,
+    parse_key_script,
+    repeat_key,
     run_app_pilot,
+    run_key_script,
+    run_pilot_batch,
     simulate_click,
     simulate_keys,
     take_snapshot,
+    type_text,
 )
 
 # Sample app code for testing
@@ -23,6 +41,36 @@ class TestApp(App):
         yield Button("Click Me", id="btn")
 '''
 
+INPUT_APP_TEMPLATE = '''
+from pathlib import Path
+
+from textual.app import App, ComposeResult
+from textual.widgets import Input, TextArea
+
+class InputApp(App):
+    """An app that records its input values whenever they change."""
+
+    def compose(self) -> ComposeResult:
+        yield Input(id="field")
+        yield TextArea(id="area")
+
+    def on_input_changed(self) -> None:
+        self.record()
+
+    def on_text_area_changed(self) -> None:
+        self.record()
+
+    def record(self) -> None:
+        values = (self.query_one(Input).value, self.query_one(TextArea).text)
+        Path({path!r}).write_text(repr(values))
+'''
+
+
+def _input_app(tmp_path):
+    """Return input app code and the path it records its values to."""
+    record_path = tmp_path / "values.txt"
+    return INPUT_APP_TEMPLATE.format(path=str(record_path)), record_path
+
 
 class TestRunAppPilot:
     """Tests for run_app_pilot tool."""
@@ -70,6 +118,25 @@ class TestTakeSnapshot:
         assert result.success is True
         assert len(result.output) > 0
 
+    def test_captures_screen_text(self):
+        """Snapshots contain the text rendered on screen."""
+        result = take_snapshot(SIMPLE_APP_CODE)
+        assert "Hello World" in result.output
+
+    def test_snapshot_respects_size(self):
+        """Snapshots are laid out for the requested size."""
+        result = take_snapshot(SIMPLE_APP_CODE, width=30, height=5)
+        lines = result.output.splitlines()
+        assert len(lines) <= 5
+        assert all(len(line) <= 30 for line in lines)
+
+    def test_snapshots_generated_screen(self):
+        """Screens without an App are hosted in a preview app."""
+        code = generate_screen("SettingsScreen", modal=True)
+        result = take_snapshot(code)
+        assert result.success is True
+        assert "Welcome to SettingsScreen" in result.output
+
 
 class TestSimulateKeys:
     """Tests for simulate_keys tool."""
@@ -123,6 +190,83 @@ class TestGenerateTestCases:
         assert "async" in result  # Textual tests are async
 
 
+PERF_APP_CODE = """
+import time
+from textual.app import App
+from textual.binding import Binding
+from textual.widgets import Static
+
+class PerfApp(App):
+    BINDINGS = [("i", "increment"), Binding("s,S", "stall"), ("q", "quit")]
+    count = 0
+
+    def compose(self):
+        yield Static("0", id="count")
+
+    def action_increment(self):
+        self.count += 1
+        self.query_one("#count").update(str(self.count))
+
+    def action_stall(self):
+        time.sleep(DELAY)
+"""
+
+
+def _run_generated_tests(tmp_path, app_code, test_code):
+    (tmp_path / "perf_app.py").write_text(app_code)
+    (tmp_path / "test_perf.py").write_text(test_code)
+    # The tests import tui_builder.perf, as they would with it installed.
+    source_root = str(Path(tui_builder.__file__).parents[1])
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": source_root},
+    )
+
+
+class TestGeneratePerfTests:
+    """Tests for generate_perf_tests tool."""
+
+    def test_calibrates_budgets_for_bound_keys(self):
+        """Budgets cover startup, every non-quit binding and memory."""
+        result = generate_perf_tests(
+            PERF_APP_CODE.replace("DELAY", "0"), module="perf_app", runs=2
+        )
+        assert result.success, result.error
+        assert list(result.budgets["keys_ms"]) == ["i", "s"]
+        assert len(result.calibration["startup_ms"]) == 2
+        worst = max(result.calibration["startup_ms"])
+        assert result.budgets["startup_ms"] >= worst * 2
+        assert result.budgets["peak_mb"] >= 1.0
+        assert "from perf_app import PerfApp" in result.code
+        assert "from tui_builder.perf import" in result.code
+        compile(result.code, "test_perf.py", "exec")
+
+    def test_generated_tests_catch_regressions(self, tmp_path):
+        """The tests pass for the calibrated app and fail once a key slows."""
+        fast = PERF_APP_CODE.replace("DELAY", "0")
+        result = generate_perf_tests(fast, module="perf_app", keys=["s"], runs=1)
+        assert result.success, result.error
+        passed = _run_generated_tests(tmp_path, fast, result.code)
+        assert passed.returncode == 0, passed.stdout
+        assert "3 passed" in passed.stdout
+
+        slow = PERF_APP_CODE.replace("DELAY", "0.5")
+        failed = _run_generated_tests(tmp_path, slow, result.code)
+        assert failed.returncode == 1
+        assert "test_key_latency" in failed.stdout
+
+    def test_rejects_bad_input(self):
+        """Missing apps, bad modules and bad settings are errors."""
+        app = PERF_APP_CODE.replace("DELAY", "0")
+        assert generate_perf_tests("x = 1").error == "No App class found"
+        assert "module" in generate_perf_tests(app, module="my-app").error
+        assert "runs" in generate_perf_tests(app, runs=0).error
+        assert "headroom" in generate_perf_tests(app, headroom=0.5).error
+
+
 class TestCompareSnapshots:
     """Tests for compare_snapshots tool."""
 
@@ -142,3 +286,165 @@ class TestCompareSnapshots:
         result = compare_snapshots("Hello", "World")
         assert result.diff is not None
         assert len(result.diff) > 0
+
+
+class TestParseKeyScript:
+    """Tests for parse_key_script."""
+
+    def test_merges_adjacent_keys(self):
+        """Adjacent keys become a single burst."""
+        assert parse_key_script("tab enter down") == [("keys", "tab", "enter", "down")]
+
+    def test_repeats_key(self):
+        """A key followed by *N is repeated N times."""
+        assert parse_key_script("down*3") == [("keys", "down", "down", "down")]
+
+    def test_repeats_group(self):
+        """Parenthesised groups can be repeated."""
+        assert parse_key_script('(tab "x")*2') == [
+            ("keys", "tab"),
+            ("type", "x"),
+            ("keys", "tab"),
+            ("type", "x"),
+        ]
+
+    def test_text_escapes(self):
+        """Quoted text resolves escapes."""
+        assert parse_key_script(r'"a\"b\nc"') == [("type", 'a"b\nc')]
+
+    def test_pause_splits_bursts(self):
+        """pause is kept as its own action."""
+        assert parse_key_script("a pause b") == [
+            ("keys", "a"),
+            ("pause",),
+            ("keys", "b"),
+        ]
+
+    def test_unbalanced_group_raises(self):
+        """Unclosed groups are rejected."""
+        with pytest.raises(KeyScriptError):
+            parse_key_script("(tab enter")
+
+    def test_oversized_script_raises(self):
+        """Scripts that expand past the event limit are rejected."""
+        with pytest.raises(KeyScriptError):
+            parse_key_script("(a*1000)*1000")
+
+
+class TestTypeText:
+    """Tests for type_text tool."""
+
+    def test_pastes_into_text_area(self, tmp_path):
+        """Text is inserted into the selected widget in one operation."""
+        code, record_path = _input_app(tmp_path)
+        text = "line one\nline two\n" * 200
+        result = type_text(code, text, selector="#area")
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("", text)
+
+    def test_types_as_keys(self, tmp_path):
+        """as_keys delivers characters as individual key events."""
+        code, record_path = _input_app(tmp_path)
+        result = type_text(code, "abc def!", selector="#field", as_keys=True)
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("abc def!", "")
+
+    def test_types_symbols_and_newlines_as_keys(self, tmp_path):
+        """Characters with key names, and newlines, arrive as typed."""
+        code, record_path = _input_app(tmp_path)
+        result = type_text(code, "1+1=2, ok!", selector="#field", as_keys=True)
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("1+1=2, ok!", "")
+
+        result = type_text(code, "ab\ncd", selector="#area", as_keys=True)
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("", "ab\ncd")
+
+
+class TestRepeatKey:
+    """Tests for repeat_key tool."""
+
+    def test_rejects_invalid_count(self):
+        """Counts outside the allowed range are rejected."""
+        result = repeat_key(SIMPLE_APP_CODE, "down", 0)
+        assert result.success is False
+
+    def test_presses_key_many_times(self, tmp_path):
+        """repeat_key presses a key many times."""
+        code, record_path = _input_app(tmp_path)
+        result = repeat_key(code, "x", 500)
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("x" * 500, "")
+
+
+class TestRunKeyScript:
+    """Tests for run_key_script tool."""
+
+    def test_applies_script(self, tmp_path):
+        """Scripts combine typing, repeats and key presses."""
+        code, record_path = _input_app(tmp_path)
+        result = run_key_script(code, '"hi" (space "x")*3 backspace tab "a\\nb"')
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("hi x x ", "a\nb")
+
+    def test_named_character_keys(self, tmp_path):
+        """Keys named after characters, such as plus, type the character."""
+        code, record_path = _input_app(tmp_path)
+        result = run_key_script(code, "1 plus 1")
+        assert result.success is True
+        assert literal_eval(record_path.read_text()) == ("1+1", "")
+
+    def test_invalid_script_reports_failure(self):
+        """Malformed scripts report an error."""
+        result = run_key_script(SIMPLE_APP_CODE, "tab)")
+        assert result.success is False
+        assert "key script" in result.error
+
+
+SLOW_APP_TEMPLATE = '''
+import asyncio
+
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class SlowApp(App):
+    """An app that waits before showing its name."""
+
+    async def on_mount(self) -> None:
+        await asyncio.sleep(0.3)
+        self.query_one(Static).update("ready-{name}")
+
+    def compose(self) -> ComposeResult:
+        yield Static("loading")
+'''
+
+
+class TestRunPilotBatch:
+    """Tests for run_pilot_batch tool."""
+
+    def test_returns_results_in_order(self):
+        """Each job gets its own result, in order."""
+        jobs = [
+            PilotJob(SLOW_APP_TEMPLATE.format(name=name), script="pause")
+            for name in "abcd"
+        ]
+        results = run_pilot_batch(jobs)
+        assert [result.output.strip() for result in results] == [
+            "ready-a",
+            "ready-b",
+            "ready-c",
+            "ready-d",
+        ]
+
+    def test_reports_failures_per_job(self):
+        """A failing job doesn't affect the others."""
+        results = run_pilot_batch(
+            [PilotJob("invalid python code {{{"), PilotJob(SIMPLE_APP_CODE)]
+        )
+        assert results[0].success is False
+        assert results[1].success is True
+
+    def test_rejects_invalid_concurrency(self):
+        """Concurrency limits below one are rejected."""
+        results = run_pilot_batch([PilotJob(SIMPLE_APP_CODE)], max_concurrency=0)
+        assert results[0].success is False
@@ -62,6 +62,33 @@ class TestValidateCss:
         result = validate_css(css)
         assert result.valid is True
 
+    def test_pseudo_classes_are_not_properties(self):
+        """Selectors with pseudo-classes, nested or not, raise no warnings."""
+        css = "Button:hover { color: red; &:focus { tint: $accent 10%; } }"
+        result = validate_css(css)
+        assert result.valid is True
+        assert result.warnings == []
+
+    def test_errors_have_positions(self):
+        """Errors give the line and column where the problem is."""
+        css = "Screen {\n    color: red\n    background: blue;\n}\n}"
+        result = validate_css(css)
+        assert result.valid is False
+        assert result.errors == [
+            "line 3, column 15: Unexpected ':' in value of 'color'; missing ';'?",
+            "line 5, column 1: Unexpected '}'",
+        ]
+
+    def test_reports_unclosed_rule_position(self):
+        """An unclosed block is reported where its rule starts."""
+        result = validate_css("A { color: red; }\n  B {\n  color: blue;")
+        assert result.errors == ["line 2, column 3: Unclosed '{' for 'B'"]
+
+    def test_unknown_property_position(self):
+        """Unknown property warnings include their position."""
+        result = validate_css("A {\n  colour: red;\n}")
+        assert result.warnings == ["line 2, column 3: Unknown CSS property: colour"]
+
 
 class TestLintWidget:
     """Tests for lint_widget tool."""
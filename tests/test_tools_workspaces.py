@@ -0,0 +1,200 @@
+"""Tests for workspaces referenced by ID."""
+
+import pytest
+
+from tui_builder.tools.benchmarks import benchmark_resize
+from tui_builder.tools.comparisons import compare_performance
+from tui_builder.tools.snapshots import run_snapshot_suite
+from tui_builder.tools.terminal import measure_terminal_output
+from tui_builder.tools.testing import PilotJob, run_app_pilot, run_pilot_batch
+from tui_builder.tools.validate import validate_css
+from tui_builder.tools.workspaces import (
+    content_hash,
+    create_workspace,
+    delete_workspace,
+    get_workspace,
+    update_workspace,
+)
+
+APP_CODE = """
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+class HelloApp(App):
+    def compose(self) -> ComposeResult:
+        yield Static("Hello")
+"""
+
+GREETING_APP = """
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+from helpers import GREETING
+
+class GreetingApp(App):
+    CSS_PATH = "app.tcss"
+
+    def compose(self) -> ComposeResult:
+        yield Static(GREETING)
+        yield Static("secret", id="secret")
+"""
+
+
+def _greeting_workspace(greeting: str = "Hi there") -> str:
+    result = create_workspace(
+        {
+            "app.py": GREETING_APP,
+            "helpers.py": f"GREETING = {greeting!r}\n",
+            "app.tcss": "#secret { display: none; }",
+        }
+    )
+    assert result.success, result.error
+    return result.workspace_id
+
+
+@pytest.fixture
+def greeting_id():
+    """Create a workspace whose app imports a module and loads a stylesheet."""
+    workspace_id = _greeting_workspace()
+    yield workspace_id
+    delete_workspace(workspace_id)
+
+
+@pytest.fixture
+def workspace_id():
+    """Create a workspace with an app and a stylesheet, deleting it afterwards."""
+    result = create_workspace({"app.py": APP_CODE, "styles/app.tcss": "Static {}"})
+    assert result.success, result.error
+    yield result.workspace_id
+    delete_workspace(result.workspace_id)
+
+
+class TestWorkspaces:
+    """Tests for creating and changing workspaces."""
+
+    def test_create_returns_hashes(self, workspace_id):
+        """Files are listed with their SHA-256 and app.py is the entry."""
+        result = get_workspace(workspace_id)
+        assert result.entry == "app.py"
+        assert result.files["app.py"] == content_hash(APP_CODE)
+        assert set(result.files) == {"app.py", "styles/app.tcss"}
+
+    def test_edit_reports_changed_paths(self, workspace_id):
+        """An edit changes only the hash of the file it touches."""
+        before = get_workspace(workspace_id).files
+        result = update_workspace(
+            workspace_id, edits=[{"path": "app.py", "old": '"Hello"', "new": '"Bye"'}]
+        )
+        assert result.success, result.error
+        assert result.changed == ["app.py"]
+        assert result.files["styles/app.tcss"] == before["styles/app.tcss"]
+        assert result.files["app.py"] != before["app.py"]
+
+    def test_failed_update_changes_nothing(self, workspace_id):
+        """A batch with one invalid edit is rejected as a whole."""
+        before = get_workspace(workspace_id).files
+        result = update_workspace(
+            workspace_id,
+            files={"extra.py": "x = 1"},
+            edits=[{"path": "app.py", "old": "missing", "new": ""}],
+        )
+        assert not result.success
+        assert "exactly once" in result.error
+        assert get_workspace(workspace_id).files == before
+
+    def test_rejects_paths_outside_workspace(self):
+        """Paths that climb out of the workspace are refused."""
+        result = create_workspace({"../app.py": APP_CODE})
+        assert not result.success
+        assert "Invalid workspace path" in result.error
+
+
+class TestWorkspaceReferences:
+    """Tests for passing workspace references to other tools."""
+
+    def test_pilot_runs_entry_file(self, workspace_id):
+        """run_app_pilot runs the workspace's entry file."""
+        result = run_app_pilot(f"workspace://{workspace_id}")
+        assert result.success, result.error
+        assert "Hello" in result.output
+
+    def test_batch_resolves_each_job(self, workspace_id):
+        """Batch jobs are resolved individually, with errors kept per job."""
+        results = run_pilot_batch(
+            [PilotJob(f"workspace://{workspace_id}"), PilotJob("workspace://nope")]
+        )
+        assert results[0].success, results[0].error
+        assert not results[1].success
+        assert "No workspace" in results[1].error
+
+    def test_validate_css_file(self, workspace_id):
+        """Validation reads a referenced file and reflects later updates."""
+        reference = f"workspace://{workspace_id}/styles/app.tcss"
+        assert validate_css(reference).valid
+        update_workspace(workspace_id, files={"styles/app.tcss": "Static {"})
+        result = validate_css(reference)
+        assert not result.valid
+        assert validate_css(f"workspace://{workspace_id}/missing.tcss").errors
+
+
+class TestWorkspaceFiles:
+    """Tests for running apps beside the other files of their workspace."""
+
+    def test_imports_modules_and_loads_css(self, greeting_id):
+        """The entry file imports its siblings and resolves CSS_PATH."""
+        for isolation in ("none", "process"):
+            result = run_app_pilot(f"workspace://{greeting_id}", isolation=isolation)
+            assert result.success, result.error
+            assert "Hi there" in result.output
+            assert "secret" not in result.output
+
+    def test_same_named_modules_stay_apart(self, greeting_id):
+        """Concurrent runs of two workspaces each import their own helpers."""
+        other_id = _greeting_workspace("Goodbye")
+        try:
+            first, second = run_pilot_batch(
+                [
+                    PilotJob(f"workspace://{greeting_id}"),
+                    PilotJob(f"workspace://{other_id}"),
+                ]
+            )
+            assert "Hi there" in first.output
+            assert "Goodbye" in second.output
+            comparison = compare_performance(
+                f"workspace://{greeting_id}", f"workspace://{other_id}", iterations=2
+            )
+            assert comparison.success, comparison.error
+        finally:
+            delete_workspace(other_id)
+
+    def test_run_tools_accept_references(self, greeting_id):
+        """Benchmarks and terminal measurements take workspace references."""
+        reference = f"workspace://{greeting_id}"
+        resize = benchmark_resize(reference, sizes=[[60, 20]])
+        assert resize.success, resize.error
+        terminal = measure_terminal_output(reference, script="ctrl+q")
+        assert terminal.success, terminal.error
+        assert not benchmark_resize("workspace://nope").success
+
+    def test_snapshot_suite_in_workspace(self):
+        """A workspace can be a snapshot suite, with baselines saved back."""
+        workspace_id = create_workspace(
+            {
+                "suite/greeting.py": GREETING_APP.replace("helpers", "_helpers"),
+                "suite/_helpers.py": "GREETING = 'Hi there'\n",
+                "suite/app.tcss": "#secret { display: none; }",
+            }
+        ).workspace_id
+        reference = f"workspace://{workspace_id}/suite"
+        try:
+            result = run_snapshot_suite(reference, isolation="process", update=True)
+            assert result.success, result.cases
+            assert result.directory == reference
+            assert "suite/greeting.txt" in get_workspace(workspace_id).files
+
+            result = run_snapshot_suite(reference, isolation="process")
+            assert result.success, result.cases
+            assert result.passed == 1
+            assert not run_snapshot_suite(f"workspace://{workspace_id}/nope").success
+        finally:
+            delete_workspace(workspace_id)